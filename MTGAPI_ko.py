@@ -1,33 +1,154 @@
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, g
 import requests
+import functools
+import glob
+import gzip
+import hashlib
+import hmac
 import json
+import os
+import sys
+import threading
+import tempfile
+import time
+from contextlib import contextmanager
+from urllib.parse import quote
+
+from api_metrics import Metrics
+from card_attributes import INDEXED_FIELDS, AttributeIndex, bit_positions
+from card_records import CompactRecords
+from card_search import SearchIndex
+from card_snapshot import CardSnapshot, encode_record
+
+try:
+    import brotli
+except ImportError:  # brotli가 없으면 gzip만 제공
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:  # Windows에서는 원격 JSON 다운로드를 프로세스 간에 잠그지 않음
+    fcntl = None
 
 api = Flask(__name__)
 
-def load_translations():
-    local_file = "cached_translations.json"
+# 응답 캐시 설정: "lazy"는 요청된 카드만 LRU로 보관, "eager"는 로드 시 전체 레코드를 미리 직렬화
+RESPONSE_CACHE_MODE = os.environ.get("MTGAPI_RESPONSE_CACHE", "lazy")
+RESPONSE_CACHE_SIZE = int(os.environ.get("MTGAPI_RESPONSE_CACHE_SIZE", "4096"))
+# 배치 요청 한 번에 받을 수 있는 최대 키 수 (search_value + card_name + faces 합계)
+MAX_BATCH_SIZE = int(os.environ.get("MTGAPI_MAX_BATCH_SIZE", "500"))
+# 요청 본문 최대 크기(바이트). 넘으면 JSON으로 읽기 전에 413
+MAX_BODY_BYTES = int(os.environ.get("MTGAPI_MAX_BODY_BYTES", str(256 * 1024)))
+api.config["MAX_CONTENT_LENGTH"] = MAX_BODY_BYTES
+BATCH_FIELDS = ("search_value", "card_name", "faces")
+# 분할·모험 카드 이름에서 면을 나누는 구분자 ("Fire // Ice")
+FACE_SEPARATOR = "//"
+# data_modifier.py가 만드는 바이너리 스냅샷. 파일이 있으면 JSON 대신 mmap으로 사용
+SNAPSHOT_FILE = os.environ.get("MTGAPI_SNAPSHOT", "cards_data_for_api.bin")
+# 위 파일의 언어. 다른 언어는 data_modifier.py --locales가 만든 cards_data_for_api.<언어>.bin을 ?lang=<언어>로 제공
+# MTGAPI_LANGS(쉼표 구분)를 주면 그 언어만 읽고, 없으면 SNAPSHOT_FILE 옆에 있는 언어별 스냅샷을 모두 읽는다
+DEFAULT_LANG = os.environ.get("MTGAPI_DEFAULT_LANG", "koKR")
+LANGS = [lang for lang in os.environ.get("MTGAPI_LANGS", "").split(",") if lang]
+LOCAL_FILE = "cached_translations.json"
+REMOTE_URL = "https://github.com/deabbo/MTGAPI_Ko/raw/main/cards_data_for_api.json"
+# 핫 리로드: 몇 초마다 데이터 변경을 확인할지 (0이면 끔), "local"은 로컬 파일 감시, "remote"는 원격 URL 폴링
+RELOAD_INTERVAL = float(os.environ.get("MTGAPI_RELOAD_INTERVAL", "60"))
+RELOAD_SOURCE = os.environ.get("MTGAPI_RELOAD_SOURCE", "local")
+# import할 때 리로더 스레드를 바로 시작할지. gunicorn.conf.py(preload)는 0으로 두고 워커마다 post_fork에서 시작한다
+RELOADER_AUTOSTART = os.environ.get("MTGAPI_RELOADER_AUTOSTART", "1") != "0"
+# /admin/* 접근 토큰 (X-Admin-Token 헤더). 설정하지 않으면 /admin/*은 꺼짐 (403)
+# MTGAPI_ADMIN_ALLOW_LOCALHOST=1이면 토큰이 없을 때 로컬호스트 요청을 허용한다.
+# 같은 호스트의 리버스 프록시(nginx 등) 뒤에서는 모든 요청이 127.0.0.1로 보이므로 켜지 말 것
+ADMIN_TOKEN = os.environ.get("MTGAPI_ADMIN_TOKEN")
+ADMIN_ALLOW_LOCALHOST = os.environ.get("MTGAPI_ADMIN_ALLOW_LOCALHOST", "0") == "1"
+# /search 결과 최대 개수와 /translate?fuzzy=1 대체 결과로 인정할 최소 점수
+SEARCH_MAX_LIMIT = int(os.environ.get("MTGAPI_SEARCH_MAX_LIMIT", "50"))
+FUZZY_MIN_SCORE = float(os.environ.get("MTGAPI_FUZZY_MIN_SCORE", "0.6"))
+# /cards 한 페이지의 기본·최대 카드 수
+CARDS_DEFAULT_LIMIT = int(os.environ.get("MTGAPI_CARDS_DEFAULT_LIMIT", "50"))
+CARDS_MAX_LIMIT = int(os.environ.get("MTGAPI_CARDS_MAX_LIMIT", "500"))
+# 응답 압축: 이보다 작은 본문은 압축하지 않음. 레코드 응답은 한 번 압축해 캐시하므로 최고 압축률을 기본값으로 사용
+COMPRESS_MIN_SIZE = int(os.environ.get("MTGAPI_COMPRESS_MIN_SIZE", "256"))
+GZIP_LEVEL = int(os.environ.get("MTGAPI_GZIP_LEVEL", "9"))
+BROTLI_QUALITY = int(os.environ.get("MTGAPI_BROTLI_QUALITY", "11"))
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+# Cache-Control max-age (초): 버전 없는 요청은 CACHE_MAX_AGE, ?v=<현재 데이터 버전> 요청은 1년 + immutable
+CACHE_MAX_AGE = int(os.environ.get("MTGAPI_CACHE_MAX_AGE", "3600"))
+VERSIONED_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+# /metrics: 인기 키 근사에 세는 키 수와 그중 내보낼 상위 키 수
+METRICS_HOT_KEYS = int(os.environ.get("MTGAPI_METRICS_HOT_KEYS", "200"))
+METRICS_HOT_KEYS_EXPORTED = int(os.environ.get("MTGAPI_METRICS_HOT_KEYS_EXPORTED", "20"))
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@contextmanager
+def download_lock(path):
+    """
+    path를 받아 쓰는 동안 잡는 프로세스 간 잠금 (path + ".lock" 파일의 flock).
+    여러 워커가 동시에 시작하거나 폴링해도 원격 파일을 받는 프로세스는 하나뿐이고, 나머지는 기다렸다가 받은 파일을 읽는다.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_file_atomic(path, content):
+    """같은 디렉터리의 임시 파일에 다 쓴 뒤 os.replace로 바꿔 끼운다 (읽는 쪽은 이전 파일이나 새 파일 전체만 봄)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_file = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, path)
+    except BaseException:
+        try:
+            os.unlink(temp_file)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def read_local_translations(object_pairs_hook=None):
+    with open(LOCAL_FILE, "r", encoding="utf-8") as f:
+        return json.load(f, object_pairs_hook=object_pairs_hook)
+
+
+def load_translations(object_pairs_hook=None):
+    """object_pairs_hook은 json.load에 그대로 넘긴다 (load_compact_translations 참고)."""
     try:
         # 파일이 이미 로컬에 있다면 캐시된 데이터를 사용
-        with open(local_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return read_local_translations(object_pairs_hook)
     except FileNotFoundError:
-        # 로컬에 없으면 원격에서 가져옴
-        url = "https://github.com/deabbo/MTGAPI_Ko/raw/main/cards_data_for_api.json"  
+        pass
+
+    # 로컬에 없으면 원격에서 가져옴. 잠금을 기다리는 동안 다른 프로세스가 받아 두었으면 그 파일을 읽음
+    with download_lock(LOCAL_FILE):
+        try:
+            return read_local_translations(object_pairs_hook)
+        except FileNotFoundError:
+            pass
+
+        url = REMOTE_URL
         headers = {
             "User-Agent": "Mozilla/5.0 (compatible; MyAPI/1.0)"
         }
         response = requests.get(url, headers=headers)
-        
+
         if response.status_code != 200:
             print(f"JSON 파일을 불러오는데 실패했습니다. 에러코드: {response.status_code}")
             return {}
-        
+
         try:
-            response.encoding = 'utf-8'
-            data = response.json()
-            # JSON 데이터를 로컬에 저장
-            with open(local_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
+            data = json.loads(response.content.decode("utf-8", "replace"), object_pairs_hook=object_pairs_hook)
+            # 받은 JSON 바이트를 다시 들여쓰기 하지 않고 그대로 로컬에 저장
+            write_file_atomic(LOCAL_FILE, response.content)
             return data
         except json.JSONDecodeError as e:
             print(f"JSON decode error: {e}")
@@ -35,8 +156,899 @@ def load_translations():
             return {}
 
 
+def load_compact_translations():
+    """
+    load_translations()의 레코드를 CompactRecords로 받는다. 파싱하면서 바로 열에 넣으므로 레코드 dict 목록을 만들지 않는다.
+    레코드 안에 객체가 중첩되어 있으면(레코드 수가 맞지 않음) 일반 dict로 다시 읽어서 바꾼다.
+    """
+    records = CompactRecords()
+    data = load_translations(object_pairs_hook=records.append_pairs)
+    if not isinstance(data, list):
+        return CompactRecords.from_records([])
+    if len(data) != len(records):
+        return CompactRecords.from_records(load_translations())
+    records.seal()
+    return records
+
+
+class TranslationIndex:
+    """
+    translations 레코드 위에 한 번만 만들어 두는 조회용 해시 인덱스.
+    - by_search_value: 소문자화한 search_value → 레코드 위치
+    - by_card_name: card_name(정확히 일치) → 레코드 위치
+    같은 키가 여러 번 나오면 가장 앞의 레코드만 남겨 기존 선형 탐색의 "첫 매칭 우선" 규칙을 유지한다.
+    레코드는 CompactRecords로 보관하고(dict 목록을 주면 바꿈), 응답을 만들 때만 dict로 꺼낸다.
+    """
+
+    def __init__(self, records):
+        started = time.perf_counter()
+        if not isinstance(records, CompactRecords):
+            records = CompactRecords.from_records(records)
+        self.records = records
+        self.by_search_value = {}
+        self.by_card_name = {}
+
+        search_values = records.field("search_value")
+        card_names = records.field("card_name")
+        for position, (item_search_value, item_card_name) in enumerate(zip(search_values, card_names)):
+            if item_search_value:
+                self.by_search_value.setdefault(item_search_value.lower(), position)
+            if item_card_name:
+                self.by_card_name.setdefault(item_card_name, position)
+
+        self.build_seconds = time.perf_counter() - started
+
+    def find(self, search_value=None, card_name=None):
+        """
+        search_value(소문자화해서 비교)와 card_name 중 하나라도 맞는 레코드의 위치를 돌려준다.
+        둘 다 맞으면 리스트에서 더 앞에 있는 레코드가 이긴다. 없으면 None.
+        """
+        positions = []
+        if search_value:
+            position = self.by_search_value.get(search_value.lower())
+            if position is not None:
+                positions.append(position)
+        if card_name:
+            position = self.by_card_name.get(card_name)
+            if position is not None:
+                positions.append(position)
+        return min(positions) if positions else None
+
+    def lookup(self, search_value=None, card_name=None):
+        position = self.find(search_value, card_name)
+        return self.records[position] if position is not None else None
+
+    def __len__(self):
+        return len(self.records)
+
+    def record(self, position):
+        return self.records[position]
+
+    def record_body(self, position):
+        return encode_record(self.records[position])
+
+    def key_counts(self):
+        return len(self.by_search_value), len(self.by_card_name)
+
+    def columns(self, keys):
+        """keys마다 모든 레코드의 값 목록 (AttributeIndex용)."""
+        return {key: self.records.field(key) for key in keys}
+
+    def attribute_index(self):
+        return AttributeIndex.from_columns(self.columns(INDEXED_FIELDS), len(self))
+
+    def keys(self):
+        for key, position in self.by_search_value.items():
+            yield "search_value", key, position
+        for key, position in self.by_card_name.items():
+            yield "card_name", key, position
+
+    def memory_bytes(self):
+        """인덱스 dict와 키 문자열, 위치 정수, CompactRecords가 차지하는 대략적인 바이트 수."""
+        total = self.records.memory_bytes()
+        for table in (self.by_search_value, self.by_card_name):
+            total += sys.getsizeof(table)
+            for key, position in table.items():
+                total += sys.getsizeof(key) + sys.getsizeof(position)
+        return total
+
+
+class SnapshotIndex:
+    """
+    TranslationIndex와 같은 조회 인터페이스를 CardSnapshot(mmap) 위에 제공한다.
+    키 테이블은 파일 안에 정렬돼 있어 이분 탐색으로 찾고, 레코드는 응답할 때만 읽는다.
+    """
+
+    def __init__(self, path):
+        started = time.perf_counter()
+        self.snapshot = CardSnapshot(path)
+        self.build_seconds = time.perf_counter() - started
+
+    def find(self, search_value=None, card_name=None):
+        positions = []
+        if search_value:
+            position = self.snapshot.find_search_value(search_value)
+            if position is not None:
+                positions.append(position)
+        if card_name:
+            position = self.snapshot.find_card_name(card_name)
+            if position is not None:
+                positions.append(position)
+        return min(positions) if positions else None
+
+    def lookup(self, search_value=None, card_name=None):
+        position = self.find(search_value, card_name)
+        return self.snapshot.record(position) if position is not None else None
+
+    def __len__(self):
+        return len(self.snapshot)
+
+    def record(self, position):
+        return self.snapshot.record(position)
+
+    def record_body(self, position):
+        return self.snapshot.record_body(position)
+
+    def key_counts(self):
+        return self.snapshot.search_count, self.snapshot.name_count
+
+    def columns(self, keys):
+        """keys마다 모든 레코드의 값 목록. 스냅샷에는 열이 없으므로 레코드를 한 번씩 파싱한다 (느림)."""
+        columns = {key: [] for key in keys}
+        for position in range(len(self)):
+            record = self.snapshot.record(position)
+            for key, column in columns.items():
+                column.append(record.get(key))
+        return columns
+
+    def attribute_index(self):
+        """빌드할 때 스냅샷에 넣어 둔 속성 인덱스를 읽는다. 예전(버전 1) 스냅샷만 레코드를 파싱해 만든다."""
+        attributes = self.snapshot.attributes()
+        if attributes is None:
+            print("스냅샷에 속성 인덱스가 없어 레코드를 읽어 만듭니다. data_modifier.py로 다시 빌드하면 빨라집니다.")
+            attributes = AttributeIndex.from_columns(self.columns(INDEXED_FIELDS), len(self))
+        return attributes
+
+    def keys(self):
+        return self.snapshot.iter_keys()
+
+    def memory_bytes(self):
+        """
+        파일은 페이지 캐시에 공유되므로 조회 인덱스가 워커 힙에 차지하는 것은 없다.
+        검색·속성 인덱스는 힙에 있으며 따로 잰다 (TranslationData.search_memory_bytes, attributes_memory_bytes).
+        """
+        return 0
+
+
+def report_index(index, source):
+    search_keys, name_keys = index.key_counts()
+    print(
+        f"번역 인덱스 생성 완료({source}): 레코드 {len(index)}개, "
+        f"search_value 키 {search_keys}개, card_name 키 {name_keys}개, "
+        f"{index.build_seconds * 1000:.1f}ms, 약 {index.memory_bytes() / 1024:.1f}KiB"
+    )
+
+
+def build_translation_index(records):
+    index = TranslationIndex(records)
+    report_index(index, "JSON")
+    return index
+
+
+def load_translation_index():
+    """
+    스냅샷 파일이 있으면 mmap으로 열고, 없으면 기존처럼 JSON을 읽어 인덱스를 만든다.
+    (인덱스, 데이터를 읽은 파일 경로)를 돌려준다.
+    """
+    if os.path.exists(SNAPSHOT_FILE):
+        try:
+            index = SnapshotIndex(SNAPSHOT_FILE)
+            report_index(index, SNAPSHOT_FILE)
+            return index, SNAPSHOT_FILE
+        except (OSError, ValueError) as e:
+            print(f"스냅샷을 읽지 못해 JSON으로 대신합니다: {e}")
+    return build_translation_index(load_compact_translations()), LOCAL_FILE
+
+
+def locale_snapshot_files():
+    """SNAPSHOT_FILE 옆의 언어별 스냅샷. {언어: 경로}"""
+    stem, extension = os.path.splitext(SNAPSHOT_FILE)
+    files = {}
+    for path in sorted(glob.glob(f"{glob.escape(stem)}.*{extension}")):
+        lang = path[len(stem) + 1:len(path) - len(extension)]
+        if lang and "." not in lang and lang != DEFAULT_LANG and (not LANGS or lang in LANGS):
+            files[lang] = path
+    return files
+
+
+def compress_body(body, encoding, fast=False):
+    """body를 encoding("gzip" 또는 "br")으로 압축한다. fast는 요청마다 새로 만드는 본문(배치 응답)용."""
+    if encoding == "br":
+        return brotli.compress(body, quality=5 if fast else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=6 if fast else GZIP_LEVEL, mtime=0)
+
+
+def negotiate_encoding(accept_encoding):
+    """Accept-Encoding 헤더에서 q 값이 가장 높은 지원 인코딩 (같으면 br 우선). 없으면 None (압축 안 함)."""
+    qualities = {}
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class EncodedResponse(tuple):
+    """
+    (본문 바이트, ETag) 쌍. Content-Encoding별 압축본은 처음 요청될 때 만들어 본문 옆(compressed)에 보관하므로
+    응답 캐시에 들어 있는 동안 레코드마다 인코딩당 한 번만 압축한다.
+    """
+
+    def __new__(cls, body, etag):
+        encoded = super().__new__(cls, (body, etag))
+        encoded.compressed = {}
+        return encoded
+
+    def variant(self, encoding):
+        """encoding(None, "gzip", "br")으로 보낼 (본문, ETag, Content-Encoding). 작은 본문은 압축하지 않는다."""
+        body, etag = self
+        if encoding is None or len(body) < COMPRESS_MIN_SIZE:
+            return body, etag, None
+        compressed = self.compressed.get(encoding)
+        if compressed is None:
+            compressed = self.compressed[encoding] = compress_body(body, encoding)
+        # 표현(인코딩)마다 바이트가 다르므로 강한 ETag도 달라야 한다
+        return compressed, f"{etag}-{encoding}", encoding
+
+
+def response_from_body(body):
+    """응답 본문(UTF-8 JSON 바이트)에 강한 ETag를 붙인다."""
+    body = bytes(body)
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return EncodedResponse(body, etag)
+
+
+def encode_response(data):
+    return response_from_body(encode_record(data))
+
+
+NOT_FOUND_RESPONSE = encode_response({"error": "카드를 찾을 수 없습니다."})
+
+
+class ResponseCache:
+    """
+    레코드 위치 → EncodedResponse(본문 바이트, ETag + 압축본) 캐시. translations는 로드 이후 바뀌지 않으므로
+    레코드마다 한 번만 json.dumps(와 압축) 하면 된다.
+    """
+
+    def __init__(self, index, mode=RESPONSE_CACHE_MODE, size=RESPONSE_CACHE_SIZE):
+        self.index = index
+        self.mode = mode
+        if mode == "eager":
+            started = time.perf_counter()
+            self._encoded = [self._encode(position) for position in range(len(index))]
+            # 압축본도 미리 만들어 둔다 (요청 경로에서는 압축하지 않음)
+            for encoded in self._encoded:
+                for encoding in SUPPORTED_ENCODINGS:
+                    encoded.variant(encoding)
+            self.get = self._encoded.__getitem__
+            print(
+                f"응답 캐시 미리 생성 완료: {len(self._encoded)}개, "
+                f"{(time.perf_counter() - started) * 1000:.1f}ms, "
+                f"약 {sum(len(body) for body, _ in self._encoded) / 1024:.1f}KiB "
+                f"(압축본 {sum(len(body) for encoded in self._encoded for body in encoded.compressed.values()) / 1024:.1f}KiB)"
+            )
+        elif mode == "lazy":
+            self.get = functools.lru_cache(maxsize=size)(self._encode)
+        else:
+            raise ValueError(f"알 수 없는 응답 캐시 모드: {mode}")
+
+    def _encode(self, position):
+        return response_from_body(self.index.record_body(position))
+
+
+def cache_headers(requested_version=None, data=None):
+    """
+    /translate 응답의 캐시 헤더. 응답 내용은 데이터 버전이 같으면 바뀌지 않으므로
+    ?v=<현재 데이터 버전> 요청은 엣지/브라우저가 오래 캐시해도 되고, 버전이 다르면(리로드 이전 버전) 캐시하지 않는다.
+    data는 요청 언어의 데이터 (기본 언어면 None).
+    """
+    version = (data or translation_data).version
+    if requested_version == version:
+        cache_control = f"public, max-age={VERSIONED_CACHE_MAX_AGE}, immutable"
+    elif requested_version:
+        cache_control = "no-cache"
+    else:
+        cache_control = f"public, max-age={CACHE_MAX_AGE}"
+    return [("Cache-Control", cache_control), ("Vary", "Accept-Encoding"), ("X-Data-Version", version)]
+
+
+def matching_etag(encoded, etag):
+    """
+    If-None-Match와 맞는 ETag (보낼 표현의 ETag를 먼저, 다음으로 압축 전 본문의 ETag를 확인, 없으면 None).
+    304에는 맞은 ETag를 그대로 돌려준다. 압축 전 본문을 캐시한 클라이언트에 압축본의 ETag를 주면 안 되기 때문이다.
+    """
+    for candidate in (etag, encoded[1]):
+        if request.if_none_match.contains_weak(candidate):
+            return candidate
+    return None
+
+
+def cached_json_response(encoded, data=None):
+    """
+    미리 인코딩된 본문(Accept-Encoding에 맞는 압축본)을 그대로 보내고, If-None-Match가 맞으면 304로 응답한다.
+    """
+    body, etag, content_encoding = encoded.variant(negotiate_encoding(request.headers.get("Accept-Encoding")))
+    matched = matching_etag(encoded, etag)
+    if matched is not None:
+        response = Response(status=304)
+        response.set_etag(matched)
+    else:
+        response = Response(response=body, mimetype='application/json')
+        if content_encoding:
+            response.headers["Content-Encoding"] = content_encoding
+        response.set_etag(etag)
+    for name, value in cache_headers(request.args.get("v"), data):
+        response.headers[name] = value
+    return response
+
+
+def compressed_json_response(body):
+    """요청마다 새로 만드는 본문(배치 응답)은 캐시 없이 빠른 설정으로 압축해서 보낸다."""
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+    response = Response(mimetype='application/json')
+    if encoding and len(body) >= COMPRESS_MIN_SIZE:
+        body = compress_body(body, encoding, fast=True)
+        response.headers["Content-Encoding"] = encoding
+    response.set_data(body)
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+def file_version(path):
+    """데이터 버전 = 파일 내용의 해시 (파일이 없으면 "empty")."""
+    try:
+        digest = hashlib.blake2b(digest_size=8)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except FileNotFoundError:
+        return "empty"
+
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class TranslationData:
+    """
+    한 시점의 번역 데이터 묶음 (인덱스 + 응답 캐시 + 버전 정보).
+    리로드할 때는 새 묶음을 요청 경로 밖에서 다 만든 뒤 전역 참조 하나만 바꿔 끼운다.
+    요청 처리 중에는 시작할 때 잡은 묶음 하나만 사용한다.
+    검색 인덱스(search)는 /search나 /translate?fuzzy=1이 처음 쓸 때 만든다.
+    """
+
+    def __init__(self, index, source, load_seconds):
+        self.index = index
+        self.cache = ResponseCache(index)
+        # 면별 응답도 키마다 한 번만 만들고 압축본과 함께 보관
+        self.faces = functools.lru_cache(maxsize=RESPONSE_CACHE_SIZE)(self._build_faces)
+        self._search = None
+        self._search_lock = threading.Lock()
+        self.index_memory_bytes = index.memory_bytes()
+        self.search_memory_bytes = None
+        self.attributes = index.attribute_index()
+        self.attributes_memory_bytes = self.attributes.memory_bytes()
+        print(
+            f"속성 인덱스 생성 완료: {self.attributes.build_seconds * 1000:.1f}ms, "
+            f"약 {self.attributes_memory_bytes / 1024:.1f}KiB"
+        )
+        self.source = source
+        self.signature = file_signature(source)
+        self.version = file_version(source)
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+
+    def _build_faces(self, search_value):
+        return build_faces_response(self, search_value)
+
+    @property
+    def search(self):
+        if self._search is None:
+            with self._search_lock:
+                if self._search is None:
+                    search = SearchIndex(self.index)
+                    self.search_memory_bytes = search.memory_bytes()
+                    print(
+                        f"검색 인덱스 생성 완료: 키 {len(search.terms)}개, {search.build_seconds * 1000:.1f}ms, "
+                        f"약 {self.search_memory_bytes / 1024:.1f}KiB"
+                    )
+                    self._search = search
+        return self._search
+
+
+def load_translation_data():
+    started = time.perf_counter()
+    index, source = load_translation_index()
+    return TranslationData(index, source, time.perf_counter() - started)
+
+
+def load_locale_data(path):
+    """언어별 스냅샷 하나 (JSON 대체 없음)."""
+    started = time.perf_counter()
+    index = SnapshotIndex(path)
+    report_index(index, path)
+    return TranslationData(index, path, time.perf_counter() - started)
+
+
+def load_all_locale_data():
+    locales = {}
+    for lang, path in locale_snapshot_files().items():
+        try:
+            locales[lang] = load_locale_data(path)
+        except (OSError, ValueError) as e:
+            print(f"{lang} 스냅샷을 읽지 못했습니다: {e}")
+    return locales
+
+
+def data_for_lang(lang):
+    """?lang= 값에 해당하는 번역 데이터. 없거나 기본 언어면 기본 데이터, 모르는 언어면 RequestError."""
+    if not lang or lang == DEFAULT_LANG:
+        return translation_data
+    data = locale_data.get(lang)
+    if data is None:
+        raise RequestError(f"지원하지 않는 언어입니다: {lang} (가능: {', '.join(available_langs())})")
+    return data
+
+
+def available_langs():
+    return [DEFAULT_LANG, *locale_data]
+
+
+class TranslationReloader:
+    """
+    백그라운드 스레드에서 주기적으로 데이터 변경을 확인하고, 바뀌었으면 새 TranslationData로 교체한다.
+    - local: 사용 중인 파일(스냅샷 또는 cached_translations.json)과 언어별 스냅샷의 mtime/크기 변화를 감시
+      (새로 생긴 언어별 스냅샷도 읽음)
+    - remote: REMOTE_URL을 ETag/Last-Modified 조건부 요청으로 폴링해서 바뀌면 로컬 파일을 갱신
+      (스냅샷 파일을 쓰는 중이면 원격 JSON 갱신은 스냅샷이 없어질 때까지 반영되지 않음)
+    """
+
+    def __init__(self, interval=RELOAD_INTERVAL, source=RELOAD_SOURCE):
+        self.interval = interval
+        self.source = source
+        self.lock = threading.Lock()
+        self.reload_count = 0
+        self.last_reload_at = None
+        self.last_reload_seconds = None
+        self.last_error = None
+        self._failed_signatures = {}
+        self._remote_validators = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        if self.source == "remote" and translation_data.source == SNAPSHOT_FILE:
+            print(f"경고: {SNAPSHOT_FILE}를 사용 중이라 원격 JSON 변경은 반영되지 않습니다")
+        self._thread = threading.Thread(target=self._run, name="translation-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if self.source == "remote":
+                    self.poll_remote()
+                for lang, signature in self.changed_langs():
+                    try:
+                        self.reload(lang)
+                    except Exception:
+                        # 같은 (깨진) 파일로 매번 다시 시도하지 않도록 기억해 둠
+                        self._failed_signatures[lang] = signature
+                        raise
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"번역 데이터 리로드 확인 실패: {e}")
+
+    def changed_langs(self):
+        """파일이 바뀌었거나 새로 생긴 언어와 그 파일 시그니처."""
+        sources = {DEFAULT_LANG: translation_data.source}
+        sources.update(locale_snapshot_files())
+        changed = []
+        for lang, source in sources.items():
+            data = translation_data if lang == DEFAULT_LANG else locale_data.get(lang)
+            signature = file_signature(source)
+            if signature == self._failed_signatures.get(lang):
+                continue
+            if data is None or signature != data.signature:
+                changed.append((lang, signature))
+        return changed
+
+    def poll_remote(self):
+        """원격 JSON이 바뀌었으면 LOCAL_FILE을 원자적으로 교체한다 (리로드는 파일 감시가 처리)."""
+        headers = {"User-Agent": "Mozilla/5.0 (compatible; MyAPI/1.0)"}
+        if "etag" in self._remote_validators:
+            headers["If-None-Match"] = self._remote_validators["etag"]
+        if "last_modified" in self._remote_validators:
+            headers["If-Modified-Since"] = self._remote_validators["last_modified"]
+
+        response = requests.get(REMOTE_URL, headers=headers, timeout=30)
+        if response.status_code == 304:
+            return
+        if response.status_code != 200:
+            raise RuntimeError(f"원격 데이터 요청 실패: {response.status_code}")
+
+        json.loads(response.content)  # 깨진 파일로 교체하지 않도록 먼저 검증
+        if response.headers.get("ETag"):
+            self._remote_validators["etag"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            self._remote_validators["last_modified"] = response.headers["Last-Modified"]
+
+        with download_lock(LOCAL_FILE):
+            if hashlib.blake2b(response.content, digest_size=8).hexdigest() == file_version(LOCAL_FILE):
+                return
+            write_file_atomic(LOCAL_FILE, response.content)
+
+    def reload(self, lang=None):
+        """
+        새 데이터를 읽어 인덱스를 만든 뒤 전역 translation_data(다른 언어면 locale_data의 그 언어)를 교체한다.
+        lang이 없으면 기본 언어를 다시 읽고 언어별 스냅샷 목록도 다시 확인한다.
+        """
+        global translation_data, locale_data
+        with self.lock:
+            if lang is None or lang == DEFAULT_LANG:
+                new_data = load_translation_data()
+                old_data = translation_data
+            else:
+                new_data = load_locale_data(locale_snapshot_files()[lang])
+                old_data = locale_data.get(lang)
+            if old_data is not None and len(new_data.index) == 0 and len(old_data.index) > 0:
+                raise RuntimeError("새 데이터가 비어 있어 교체하지 않았습니다")
+            new_locale_data = load_all_locale_data() if lang is None else {}
+            # 검색 인덱스는 교체 전에 이 스레드에서 만든다 (교체 뒤 첫 /search가 만드느라 멈추지 않도록)
+            for data in (new_data, *new_locale_data.values()):
+                data.search
+            if lang is None or lang == DEFAULT_LANG:
+                translation_data = new_data
+                if lang is None:
+                    locale_data = new_locale_data
+            else:
+                # 요청 중인 스레드가 보고 있는 사전은 건드리지 않고 새 사전으로 바꿔 끼운다
+                locale_data = {**locale_data, lang: new_data}
+            self.reload_count += 1
+            self.last_reload_at = new_data.loaded_at
+            self.last_reload_seconds = new_data.load_seconds
+            self.last_error = None
+            print(f"번역 데이터 리로드 완료({lang or DEFAULT_LANG}): 버전 {new_data.version}, {new_data.load_seconds * 1000:.1f}ms")
+        return new_data
+
+    def status(self):
+        data = translation_data
+        return {
+            "default_lang": DEFAULT_LANG,
+            "languages": {
+                lang: {"data_version": other.version, "record_count": len(other.index), "source": other.source}
+                for lang, other in locale_data.items()
+            },
+            "data_version": data.version,
+            "record_count": len(data.index),
+            "source": data.source,
+            "loaded_at": data.loaded_at,
+            "load_seconds": data.load_seconds,
+            "reload_count": self.reload_count,
+            "last_reload_at": self.last_reload_at,
+            "last_reload_seconds": self.last_reload_seconds,
+            "last_error": self.last_error,
+            "reload_interval": self.interval,
+            "reload_source": self.source,
+        }
+
+
+def admin_allowed(token, remote_addr):
+    """/admin/* 요청 허용 여부 (Flask·ASGI 공용). 토큰도 로컬호스트 허용 설정도 없으면 항상 거부."""
+    if ADMIN_TOKEN:
+        return token is not None and hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+    return ADMIN_ALLOW_LOCALHOST and remote_addr in ("127.0.0.1", "::1")
+
+
+def is_admin_request():
+    return admin_allowed(request.headers.get("X-Admin-Token"), request.remote_addr)
+
+
+translation_data = load_translation_data()
+locale_data = load_all_locale_data()
+reloader = TranslationReloader()
+if RELOADER_AUTOSTART:
+    reloader.start()
+metrics = Metrics(METRICS_HOT_KEYS, METRICS_HOT_KEYS_EXPORTED)
+
+
+def lookup_field(search_value, card_name):
+    if search_value and card_name:
+        return "both"
+    return "search_value" if search_value else "card_name"
+
+
+def metrics_gauges():
+    """/metrics 수집 시점에 읽는 값: 인덱스 크기, 응답 캐시 적중률, 데이터 버전."""
+    data = translation_data
+    search_keys, name_keys = data.index.key_counts()
+    gauges = [
+        ("mtgapi_index_records", "Number of card records in the loaded index.", [((), len(data.index))]),
+        ("mtgapi_index_keys", "Number of lookup keys by field.",
+         [((("field", "search_value"),), search_keys), ((("field", "card_name"),), name_keys)]),
+        ("mtgapi_index_memory_bytes", "Approximate heap size of the lookup index.", [((), data.index_memory_bytes)]),
+        ("mtgapi_aux_index_memory_bytes", "Approximate heap size of the search and /cards attribute indexes.",
+         [((("index", "attributes"),), data.attributes_memory_bytes)]
+         + ([((("index", "search"),), data.search_memory_bytes)] if data.search_memory_bytes is not None else [])),
+        ("mtgapi_data_info", "Loaded data version and source.",
+         [((("version", data.version), ("source", data.source)), 1)]),
+        ("mtgapi_lang_index_records", "Number of card records per language.",
+         [((("lang", DEFAULT_LANG),), len(data.index))]
+         + [((("lang", lang),), len(other.index)) for lang, other in locale_data.items()]),
+        ("mtgapi_data_loaded_timestamp_seconds", "When the loaded data was swapped in.", [((), data.loaded_at)]),
+    ]
+    if data.cache.mode == "lazy":
+        info = data.cache.get.cache_info()
+        gauges.append(("mtgapi_response_cache", "Serialized response cache statistics since the last reload.", [
+            ((("stat", "hits"),), info.hits),
+            ((("stat", "misses"),), info.misses),
+            ((("stat", "size"),), info.currsize),
+        ]))
+    return gauges
+
+class RequestError(ValueError):
+    """잘못된 요청. 메시지는 {"error": ...} 본문으로 400과 함께 돌려준다."""
+
+
+def find_translation(search_value=None, card_name=None, data=None):
+    """
+    단건 조회: 찾은 레코드(또는 "찾을 수 없음")의 (본문 바이트, ETag).
+    "A // B" 형태의 search_value가 그대로 일치하지 않으면 면별 응답(find_faces)으로 대신한다.
+    data는 data_for_lang()으로 고른 언어의 데이터 (None이면 기본 언어). 아래 조회 함수들도 같다.
+    """
+    data = data or translation_data
+    started = time.perf_counter()
+    position = data.index.find(search_value, card_name)
+    looked_up = time.perf_counter()
+    metrics.observe_stage("lookup", looked_up - started)
+    metrics.record_lookup(lookup_field(search_value, card_name), position is not None, search_value or card_name)
+    if position is not None:
+        encoded = data.cache.get(position)
+        metrics.observe_stage("serialize", time.perf_counter() - looked_up)
+        return encoded
+    if search_value and FACE_SEPARATOR in search_value:
+        return find_faces(search_value, data)
+    return NOT_FOUND_RESPONSE
+
+
+def face_positions(data, search_value):
+    """
+    search_value에 해당하는 카드의 면별 레코드 위치 목록 (없는 면은 None).
+    - 레코드에 linked_faces가 있으면: 그 카드 + 연결된 면들 (분할 카드의 "A // B" 레코드 자신과
+      다른 면에 연결된 "A // B" 레코드는 면이 아니므로 뺀다)
+    - "A // B" 형태면: 이름을 나눠 각 면을 찾는다
+    """
+    position = data.index.find(search_value=search_value)
+    if position is not None:
+        linked_faces = [name for name in data.index.record(position).get("linked_faces", []) if FACE_SEPARATOR not in name]
+        if linked_faces:
+            own = [] if FACE_SEPARATOR in search_value else [position]
+            return own + [data.index.find(search_value=name) for name in linked_faces]
+    if FACE_SEPARATOR in search_value:
+        return [data.index.find(search_value=name.strip()) for name in search_value.split(FACE_SEPARATOR)]
+    return [position]
+
+
+def find_faces(search_value, data=None):
+    """
+    양면·분할·모험 카드의 모든 면을 한 응답으로: {"search_value": ..., "faces": [면 레코드, ...]}
+    각 면은 /translate 단건 응답과 같은 본문이며, 면을 하나도 찾지 못하면 "찾을 수 없음" 응답.
+    """
+    return (data or translation_data).faces(search_value)
+
+
+def build_faces_response(data, search_value):
+    positions = face_positions(data, search_value)
+    if all(position is None for position in positions):
+        return NOT_FOUND_RESPONSE
+    faces = [data.cache.get(position)[0] if position is not None else NOT_FOUND_RESPONSE[0] for position in positions]
+    return response_from_body(
+        b'{"search_value":' + json.dumps(search_value, ensure_ascii=False).encode("utf-8")
+        + b',"faces":[' + b",".join(faces) + b"]}"
+    )
+
+
+def find_translation_fuzzy(search_value=None, card_name=None, data=None):
+    """
+    정확히 일치하는 카드가 없으면 /search의 최상위 후보(점수 FUZZY_MIN_SCORE 이상)로 대신한다.
+    ((본문 바이트, ETag), 대신 사용한 키 또는 None)을 돌려준다.
+    """
+    data = data or translation_data
+    position = data.index.find(search_value, card_name)
+    if position is not None:
+        return data.cache.get(position), None
+    for query, field in ((search_value, "search_value"), (card_name, "card_name")):
+        if not query:
+            continue
+        candidates = data.search.search(query, limit=1, field=field)
+        if candidates and candidates[0]["score"] >= FUZZY_MIN_SCORE:
+            return data.cache.get(candidates[0]["position"]), candidates[0]["matched"]
+    return NOT_FOUND_RESPONSE, None
+
+
+def search_translations(query, limit=10, field=None, data=None):
+    """/search 응답 본문: 후보마다 점수와 매칭 방식, search_value/card_name을 담는다."""
+    if field not in (None, "search_value", "card_name"):
+        raise RequestError("field는 search_value 또는 card_name이어야 합니다")
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+
+    data = data or translation_data
+    results = []
+    for candidate in data.search.search(query, limit=limit, field=field):
+        record = data.index.record(candidate.pop("position"))
+        candidate["search_value"] = record.get("search_value")
+        candidate["card_name"] = record.get("card_name")
+        results.append(candidate)
+    return json.dumps({"query": query, "results": results}, ensure_ascii=False).encode("utf-8")
+
+
+def split_values(text):
+    return [value.strip() for value in text.split(",") if value.strip()]
+
+
+def parse_number(name, text):
+    try:
+        number = float(text)
+    except ValueError:
+        raise RequestError(f"{name}는 숫자여야 합니다") from None
+    return int(number) if number.is_integer() else number
+
+
+def parse_cards_request(params):
+    """
+    /cards 쿼리 파라미터(이름 → 값 문자열)를 (필터, offset, limit)으로 정리한다.
+    - color, rarity: 값이 같은 카드 (쉼표로 여러 값을 주면 그중 하나)
+    - type, sub_type: 값에 그 문자열이 들어 있는 카드
+    - mana_value(쉼표로 여러 값), mana_value_min, mana_value_max: 마나 값
+    - arena_id: 쉼표로 여러 개
+    """
+    filters = {}
+    for field in ("color", "rarity"):
+        if split_values(params.get(field) or ""):
+            filters[field] = split_values(params[field])
+    for field in ("type", "sub_type"):
+        if (params.get(field) or "").strip():
+            filters[field] = params[field]
+    if split_values(params.get("mana_value") or ""):
+        filters["mana_value"] = {parse_number("mana_value", value) for value in split_values(params["mana_value"])}
+    for name in ("mana_value_min", "mana_value_max"):
+        if (params.get(name) or "").strip():
+            filters[name] = parse_number(name, params[name])
+    if split_values(params.get("arena_id") or ""):
+        arena_ids = split_values(params["arena_id"])
+        if len(arena_ids) > CARDS_MAX_LIMIT:
+            raise RequestError(f"arena_id는 한 번에 최대 {CARDS_MAX_LIMIT}개까지 요청할 수 있습니다")
+        try:
+            filters["arena_id"] = [int(arena_id) for arena_id in arena_ids]
+        except ValueError:
+            raise RequestError("arena_id는 정수여야 합니다") from None
+
+    try:
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or CARDS_DEFAULT_LIMIT)
+    except ValueError:
+        raise RequestError("offset과 limit은 정수여야 합니다") from None
+    if offset < 0:
+        raise RequestError("offset은 0 이상이어야 합니다")
+    return filters, offset, max(1, min(limit, CARDS_MAX_LIMIT))
+
+
+def query_cards(filters, offset=0, limit=CARDS_DEFAULT_LIMIT, data=None):
+    """
+    /cards 응답 본문: 필터를 모두 만족하는 카드를 레코드 순서로 offset번째부터 limit개.
+    {"data_version": ..., "total": 전체 개수, "offset": ..., "limit": ..., "next_offset": 다음 페이지 offset 또는 null, "cards": [...]}
+    각 카드는 /translate 단건 응답과 같은 본문이다.
+    """
+    data = data or translation_data
+    bitmap = data.attributes.select(filters)
+    total = bitmap.bit_count()
+    positions = bit_positions(bitmap, offset, limit) if offset < total else []
+    next_offset = offset + len(positions) if offset + len(positions) < total else None
+    header = json.dumps({
+        "data_version": data.version, "total": total, "offset": offset, "limit": limit, "next_offset": next_offset,
+    }).encode("utf-8")
+    return header[:-1] + b', "cards": [' + b",".join(data.index.record_body(position) for position in positions) + b"]}"
+
+
+def version_body(lang=None):
+    """/version 응답 본문: 그 언어의 현재 데이터 버전 (모르는 언어면 RequestError)."""
+    data = data_for_lang(lang)
+    return json.dumps({"lang": lang or DEFAULT_LANG, "data_version": data.version}).encode("utf-8")
+
+
+def parse_batch_request(payload):
+    """배치 요청 본문을 {"search_value": [...], "card_name": [...], "faces": [...]} (중복·빈 값 제거)으로 정리한다."""
+    if not isinstance(payload, dict):
+        raise RequestError("요청 형식 오류")
+
+    groups = {}
+    for field in BATCH_FIELDS:
+        keys = payload.get(field) or []
+        if not isinstance(keys, list) or not all(isinstance(key, str) for key in keys):
+            raise RequestError(f"{field}는 문자열 목록이어야 합니다")
+        groups[field] = list(dict.fromkeys(key for key in keys if key))
+
+    total = sum(len(keys) for keys in groups.values())
+    if total == 0:
+        raise RequestError("텍스트 입력없음")
+    if total > MAX_BATCH_SIZE:
+        raise RequestError(f"한 번에 최대 {MAX_BATCH_SIZE}개까지 요청할 수 있습니다")
+    return groups
+
+
+def build_batch_body(groups, data=None):
+    """
+    각 키의 캐시된 단건 응답 본문을 이어 붙여 배치 응답 JSON을 만든다.
+    클라이언트가 결과를 캐시해 둘 수 있도록 응답을 만든 데이터 버전(data_version)도 함께 담는다.
+    """
+    data = data or translation_data
+    parts = [b'{"data_version":' + json.dumps(data.version).encode("utf-8")]
+    for field, keys in groups.items():
+        parts.append(b"," + json.dumps(field).encode("utf-8") + b":{")
+        for key_number, key in enumerate(keys):
+            if field == "faces":
+                body, _ = find_faces(key, data)
+            else:
+                if field == "search_value":
+                    position = data.index.find(search_value=key)
+                else:
+                    position = data.index.find(card_name=key)
+                metrics.record_lookup(field, position is not None, key)
+                body, _ = data.cache.get(position) if position is not None else NOT_FOUND_RESPONSE
+            if key_number:
+                parts.append(b",")
+            parts.append(json.dumps(key, ensure_ascii=False).encode("utf-8") + b":" + body)
+        parts.append(b"}")
+    parts.append(b"}")
+    return b"".join(parts)
+
+
+@api.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@api.after_request
+def observe_request(response):
+    started = g.get("request_started")
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        metrics.observe_request(endpoint, response.status_code, time.perf_counter() - started)
+    return response
 
-translations = load_translations()
 
 @api.route('/translate', methods=['GET'])
 def translate():
@@ -46,36 +1058,125 @@ def translate():
     # 입력값 검증: 둘 다 없을 때만 에러 반환
     if not search_value and not card_name:
         return jsonify({"error": "텍스트 입력없음"}), 400
+    try:
+        data = data_for_lang(request.args.get('lang'))
+    except RequestError as e:
+        return jsonify({"error": str(e)}), 400
 
-    # 입력값을 소문자로 변환
-    search_value = search_value.lower() if search_value else None
-    card_name = card_name if card_name else None
-
-    # 데이터 매칭
-    matching_data = None
-    for item in translations:
-        # 데이터의 값을 소문자로 변환
-        item_search_value = item.get("search_value", "").lower()
-        item_card_name = item.get("card_name", "")
-
-        if search_value and item_search_value == search_value:
-            matching_data = item
-            break
-        elif card_name and item_card_name == card_name:
-            matching_data = item
-            break
-
-    # 결과 반환
-    if matching_data:
-        response_data = matching_data
-    else:
-        response_data = {"error": "카드를 찾을 수 없습니다."}
+    # 데이터 매칭 (인덱스 조회, search_value는 인덱스 안에서 소문자로 비교)
+    # 결과 반환 (직렬화된 본문은 캐시에서 재사용)
+    if request.args.get('faces') == '1':
+        # 양면·분할·모험 카드의 모든 면을 한 번에
+        if not search_value:
+            return jsonify({"error": "faces는 search_value와 함께 사용해야 합니다"}), 400
+        return cached_json_response(find_faces(search_value, data), data)
+    if request.args.get('fuzzy') == '1':
+        # 정확히 일치하지 않으면 가장 비슷한 카드로 대신 응답
+        encoded, fuzzy_key = find_translation_fuzzy(search_value, card_name, data)
+        response = cached_json_response(encoded, data)
+        if fuzzy_key is not None:
+            response.headers['X-Fuzzy-Match'] = quote(fuzzy_key)
+        return response
+    return cached_json_response(find_translation(search_value, card_name, data), data)
+
+
+@api.route('/search', methods=['GET'])
+def search():
+    """
+    접두어·토큰·오타 허용 카드 이름 검색.
+    /search?q=lightning bolt&limit=10&field=search_value&lang=jaJP
+    """
+    query = request.args.get('q', '')
+    if not query.strip():
+        return jsonify({"error": "텍스트 입력없음"}), 400
+    try:
+        data = data_for_lang(request.args.get('lang'))
+        body = search_translations(query, request.args.get('limit', 10, type=int), request.args.get('field'), data)
+    except RequestError as e:
+        return jsonify({"error": str(e)}), 400
+    return Response(response=body, mimetype='application/json')
+
+
+@api.route('/translate/batch', methods=['POST'])
+def translate_batch():
+    """
+    여러 카드를 한 번에 번역한다.
+    요청: {"search_value": ["Opt", ...], "card_name": ["선택", ...], "faces": ["Fire // Ice", ...]}
+    응답: {"data_version": "...", "search_value": {"Opt": {...카드...}, "Nope": {"error": ...}}, "card_name": {...}, "faces": {...}}
+    각 결과는 /translate 단건 응답(faces는 /translate?faces=1 응답)과 같은 본문이며, 캐시된 바이트를 그대로 이어 붙인다.
+    언어는 /translate와 같이 ?lang=으로 고른다.
+    """
+    try:
+        groups = parse_batch_request(request.get_json(silent=True))
+        data = data_for_lang(request.args.get('lang'))
+    except RequestError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return compressed_json_response(build_batch_body(groups, data))
+
+
+@api.errorhandler(413)
+def request_too_large(e):
+    """본문이 MAX_BODY_BYTES를 넘는 요청 (api.config["MAX_CONTENT_LENGTH"])."""
+    return jsonify({"error": f"요청 본문은 최대 {MAX_BODY_BYTES}바이트입니다"}), 413
 
-    return Response(
-        response=json.dumps(response_data, ensure_ascii=False),
-        mimetype='application/json'
-    )
 
+@api.route('/cards', methods=['GET'])
+def cards():
+    """
+    속성으로 카드 목록을 조회한다 (로드할 때 만든 속성 인덱스의 비트맵 교집합, 레코드를 훑지 않음).
+    /cards?color=적색,녹색&rarity=레어&mana_value_min=2&mana_value_max=4&type=생물&limit=50&offset=0&lang=jaJP
+    /cards?arena_id=68230,68231
+    """
+    try:
+        data = data_for_lang(request.args.get('lang'))
+        filters, offset, limit = parse_cards_request(request.args)
+    except RequestError as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = compressed_json_response(query_cards(filters, offset, limit, data))
+    response.headers["X-Data-Version"] = data.version
+    return response
+
+
+@api.route('/version', methods=['GET'])
+def version():
+    """
+    현재 데이터 버전. 클라이언트(TTS 스크립트)가 저장해 둔 번역 캐시를 계속 써도 되는지 확인하는 용도라 캐시하지 않는다.
+    /version?lang=jaJP
+    """
+    try:
+        body = version_body(request.args.get('lang'))
+    except RequestError as e:
+        return jsonify({"error": str(e)}), 400
+    response = Response(response=body, mimetype='application/json')
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@api.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus 텍스트 형식 계측값 (워커 프로세스마다 따로 집계됨)."""
+    return Response(response=metrics.render(metrics_gauges()), content_type=METRICS_CONTENT_TYPE)
+
+
+@api.route('/admin/status', methods=['GET'])
+def admin_status():
+    if not is_admin_request():
+        return jsonify({"error": "권한 없음"}), 403
+    return jsonify(reloader.status())
+
+
+@api.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    if not is_admin_request():
+        return jsonify({"error": "권한 없음"}), 403
+    try:
+        reloader.reload()
+    except Exception as e:
+        reloader.last_error = str(e)
+        return jsonify({"error": f"리로드 실패: {e}", **reloader.status()}), 500
+    return jsonify(reloader.status())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,333 @@
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs, quote
+
+import MTGAPI_ko as core
+
+# MTGAPI_ko.py와 같은 인덱스/응답 캐시/리로더를 그대로 쓰는 ASGI 진입점
+# 실행 예: gunicorn -k uvicorn.workers.UvicornWorker -w 4 -b 0.0.0.0:8080 MTGAPI_ko_asgi:app (README 참고)
+# keep-alive와 HTTP/1.1 파이프라이닝(요청 순서대로 응답)은 uvicorn(h11/httptools)이 처리한다.
+# 검색·/cards·배치처럼 요청마다 CPU를 쓰는 처리(압축 포함)는 asyncio.to_thread로 돌려 이벤트 루프를 막지 않는다.
+
+JSON_CONTENT_TYPE = (b"content-type", b"application/json")
+
+
+def error_body(message):
+    return json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match 헤더 값에 etag가 들어 있는지 (약한 비교, "*" 포함)."""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate.strip('"') == etag:
+            return True
+    return False
+
+
+def matching_etag(if_none_match, encoded, etag):
+    """core.matching_etag와 같음: 보낼 표현의 ETag, 압축 전 본문의 ETag 순으로 맞는 것 (없으면 None)."""
+    if not if_none_match:
+        return None
+    for candidate in (etag, encoded[1]):
+        if etag_matches(if_none_match, candidate):
+            return candidate
+    return None
+
+
+def request_header(scope, name):
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def read_body(receive, limit):
+    """요청 본문. limit 바이트를 넘으면 더 읽지 않고 None."""
+    body = bytearray()
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > limit:
+            return None
+        if not message.get("more_body", False):
+            return bytes(body)
+
+
+async def send_response(send, status, body=b"", headers=()):
+    # 304에는 본문이 없으므로 content-length를 보내지 않는다 (보내려면 200일 때의 길이여야 함)
+    if status != 304:
+        headers = [(b"content-length", str(len(body)).encode("ascii")), *headers]
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": list(headers),
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def parse_query(scope):
+    """
+    쿼리 문자열 → {이름: [값, ...]} (bytes). parse_qs에 bytes를 그대로 넘기면 한글처럼 ASCII가 아닌 값
+    (%ED%95%9C...)에서 UnicodeEncodeError가 나므로, latin-1로 풀어 퍼센트 디코딩한 바이트를 그대로 돌려준다.
+    """
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"), encoding="latin-1")
+    return {name.encode("latin-1"): [value.encode("latin-1") for value in values] for name, values in query.items()}
+
+
+def query_lang(query):
+    """?lang= 값에 해당하는 번역 데이터 (모르는 언어면 core.RequestError)."""
+    return core.data_for_lang(query.get(b"lang", [b""])[0].decode("utf-8", "replace") or None)
+
+
+def compressed_body(build, args, encoding):
+    """build(*args)로 본문을 만들고 encoding으로 압축한다 (스레드에서 실행). (본문, content-encoding 또는 None)"""
+    body = build(*args)
+    if encoding and len(body) >= core.COMPRESS_MIN_SIZE:
+        return core.compress_body(body, encoding, fast=True), encoding
+    return body, None
+
+
+async def translate(scope, send):
+    query = parse_query(scope)
+    search_value = query.get(b"search_value", [b""])[0].decode("utf-8", "replace")
+    card_name = query.get(b"card_name", [b""])[0].decode("utf-8", "replace")
+
+    # 입력값 검증: 둘 다 없을 때만 에러 반환
+    if not search_value and not card_name:
+        await send_response(send, 400, error_body("텍스트 입력없음"), [JSON_CONTENT_TYPE])
+        return
+    try:
+        data = query_lang(query)
+    except core.RequestError as e:
+        await send_response(send, 400, error_body(str(e)), [JSON_CONTENT_TYPE])
+        return
+
+    extra_headers = []
+    if query.get(b"faces", [b""])[0] == b"1":
+        # 양면·분할·모험 카드의 모든 면을 한 번에
+        if not search_value:
+            await send_response(send, 400, error_body("faces는 search_value와 함께 사용해야 합니다"), [JSON_CONTENT_TYPE])
+            return
+        encoded = core.find_faces(search_value, data)
+    elif query.get(b"fuzzy", [b""])[0] == b"1":
+        # 정확히 맞는 키가 없으면 검색 인덱스로 찾는다
+        encoded, fuzzy_key = await asyncio.to_thread(
+            core.find_translation_fuzzy, search_value or None, card_name or None, data
+        )
+        if fuzzy_key is not None:
+            extra_headers.append((b"x-fuzzy-match", quote(fuzzy_key).encode("ascii")))
+    else:
+        encoded = core.find_translation(search_value or None, card_name or None, data)
+
+    # 압축본은 응답 캐시 항목(EncodedResponse)에 함께 보관된다
+    body, etag, content_encoding = encoded.variant(core.negotiate_encoding(request_header(scope, b"accept-encoding")))
+    requested_version = query.get(b"v", [b""])[0].decode("utf-8", "replace") or None
+    extra_headers.extend(
+        (name.lower().encode("ascii"), value.encode("latin-1")) for name, value in core.cache_headers(requested_version, data)
+    )
+    matched = matching_etag(request_header(scope, b"if-none-match"), encoded, etag)
+    if matched is not None:
+        # 304에는 클라이언트가 가진 표현의 ETag(맞은 것)를 돌려준다
+        extra_headers.append((b"etag", f'"{matched}"'.encode("ascii")))
+        await send_response(send, 304, headers=extra_headers)
+    else:
+        extra_headers.append((b"etag", f'"{etag}"'.encode("ascii")))
+        if content_encoding:
+            extra_headers.append((b"content-encoding", content_encoding.encode("ascii")))
+        await send_response(send, 200, body, [JSON_CONTENT_TYPE, *extra_headers])
+
+
+async def search(scope, send):
+    query = parse_query(scope)
+    text = query.get(b"q", [b""])[0].decode("utf-8", "replace")
+    field = query.get(b"field", [b""])[0].decode("utf-8", "replace") or None
+    if not text.strip():
+        await send_response(send, 400, error_body("텍스트 입력없음"), [JSON_CONTENT_TYPE])
+        return
+    try:
+        limit = int(query.get(b"limit", [b"10"])[0])
+    except ValueError:
+        limit = 10
+
+    try:
+        body = await asyncio.to_thread(core.search_translations, text, limit, field, query_lang(query))
+    except core.RequestError as e:
+        await send_response(send, 400, error_body(str(e)), [JSON_CONTENT_TYPE])
+        return
+    await send_response(send, 200, body, [JSON_CONTENT_TYPE])
+
+
+async def cards(scope, send):
+    query = parse_query(scope)
+    params = {name.decode("utf-8", "replace"): values[0].decode("utf-8", "replace") for name, values in query.items()}
+    try:
+        data = query_lang(query)
+        filters, offset, limit = core.parse_cards_request(params)
+    except core.RequestError as e:
+        await send_response(send, 400, error_body(str(e)), [JSON_CONTENT_TYPE])
+        return
+
+    encoding = core.negotiate_encoding(request_header(scope, b"accept-encoding"))
+    body, content_encoding = await asyncio.to_thread(
+        compressed_body, core.query_cards, (filters, offset, limit, data), encoding
+    )
+    headers = [JSON_CONTENT_TYPE, (b"vary", b"Accept-Encoding"), (b"x-data-version", data.version.encode("ascii"))]
+    if content_encoding:
+        headers.append((b"content-encoding", content_encoding.encode("ascii")))
+    await send_response(send, 200, body, headers)
+
+
+async def version(scope, send):
+    query = parse_query(scope)
+    try:
+        body = core.version_body(query.get(b"lang", [b""])[0].decode("utf-8", "replace") or None)
+    except core.RequestError as e:
+        await send_response(send, 400, error_body(str(e)), [JSON_CONTENT_TYPE])
+        return
+    await send_response(send, 200, body, [JSON_CONTENT_TYPE, (b"cache-control", b"no-cache")])
+
+
+async def translate_batch(scope, receive, send):
+    query = parse_query(scope)
+    content_length = request_header(scope, b"content-length")
+    body = None
+    if not (content_length and content_length.isdigit() and int(content_length) > core.MAX_BODY_BYTES):
+        body = await read_body(receive, core.MAX_BODY_BYTES)
+    if body is None:
+        await send_response(send, 413, error_body(f"요청 본문은 최대 {core.MAX_BODY_BYTES}바이트입니다"), [JSON_CONTENT_TYPE])
+        return
+    try:
+        payload = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        payload = None
+
+    try:
+        groups = core.parse_batch_request(payload)
+        data = query_lang(query)
+    except core.RequestError as e:
+        await send_response(send, 400, error_body(str(e)), [JSON_CONTENT_TYPE])
+        return
+
+    encoding = core.negotiate_encoding(request_header(scope, b"accept-encoding"))
+    body, content_encoding = await asyncio.to_thread(compressed_body, core.build_batch_body, (groups, data), encoding)
+    headers = [JSON_CONTENT_TYPE, (b"vary", b"Accept-Encoding")]
+    if content_encoding:
+        headers.append((b"content-encoding", content_encoding.encode("ascii")))
+    await send_response(send, 200, body, headers)
+
+
+def is_admin_request(scope):
+    client = scope.get("client")
+    return core.admin_allowed(request_header(scope, b"x-admin-token"), client[0] if client else None)
+
+
+def json_body(value):
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+async def admin_status(scope, send):
+    if not is_admin_request(scope):
+        await send_response(send, 403, error_body("권한 없음"), [JSON_CONTENT_TYPE])
+        return
+    await send_response(send, 200, json_body(core.reloader.status()), [JSON_CONTENT_TYPE])
+
+
+async def admin_reload(scope, send):
+    if not is_admin_request(scope):
+        await send_response(send, 403, error_body("권한 없음"), [JSON_CONTENT_TYPE])
+        return
+    try:
+        # 데이터를 읽는 동안 이벤트 루프가 다른 요청을 계속 처리하도록 스레드에서 실행
+        await asyncio.to_thread(core.reloader.reload)
+    except Exception as e:
+        core.reloader.last_error = str(e)
+        body = json_body({"error": f"리로드 실패: {e}", **core.reloader.status()})
+        await send_response(send, 500, body, [JSON_CONTENT_TYPE])
+        return
+    await send_response(send, 200, json_body(core.reloader.status()), [JSON_CONTENT_TYPE])
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            core.reloader.stop()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+class StatusRecorder:
+    """send를 감싸 응답 상태 코드를 기억한다 (요청 지연 히스토그램 레이블용)."""
+
+    def __init__(self, send):
+        self.send = send
+        self.status = 500
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        await self.send(message)
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    started = time.perf_counter()
+    send = StatusRecorder(send)
+    endpoint = await dispatch(scope, receive, send)
+    core.metrics.observe_request(endpoint, send.status, time.perf_counter() - started)
+
+
+async def dispatch(scope, receive, send):
+    """경로에 맞는 핸들러를 부르고 계측용 엔드포인트 이름을 돌려준다."""
+    path = scope["path"]
+    method = scope["method"]
+    if path == "/translate":
+        if method in ("GET", "HEAD"):
+            await translate(scope, send)
+            return path
+    elif path == "/translate/batch":
+        if method == "POST":
+            await translate_batch(scope, receive, send)
+            return path
+    elif path == "/search":
+        if method in ("GET", "HEAD"):
+            await search(scope, send)
+            return path
+    elif path == "/cards":
+        if method in ("GET", "HEAD"):
+            await cards(scope, send)
+            return path
+    elif path == "/version":
+        if method in ("GET", "HEAD"):
+            await version(scope, send)
+            return path
+    elif path == "/admin/status":
+        if method in ("GET", "HEAD"):
+            await admin_status(scope, send)
+            return path
+    elif path == "/admin/reload":
+        if method == "POST":
+            await admin_reload(scope, send)
+            return path
+    elif path == "/metrics":
+        if method in ("GET", "HEAD"):
+            body = core.metrics.render(core.metrics_gauges()).encode("utf-8")
+            await send_response(send, 200, body, [(b"content-type", core.METRICS_CONTENT_TYPE.encode("ascii"))])
+            return path
+    else:
+        await send_response(send, 404, error_body("없는 경로입니다"), [JSON_CONTENT_TYPE])
+        return "unmatched"
+
+    await send_response(send, 405, error_body("허용되지 않는 메서드입니다"), [JSON_CONTENT_TYPE])
+    return path
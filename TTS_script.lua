@@ -1,13 +1,132 @@
 local translationStatus = {}
-local dfcQueue = {}
-local isProcessingDFC = false
-
-
-function onLoad()
+local pendingRequests = {}
+local isFlushScheduled = false
+
+-- 서버 응답 캐시: "종류:정규화한 이름" → 서버가 돌려준 결과 (찾을 수 없음 응답 포함)
+-- 저장할 때(onSave) 서버 데이터 버전과 함께 보관하고, 버전이 바뀌었을 때만 비운다
+local translationCache = {}
+local cacheUsed = {}
+local dataVersion = nil
+-- 이번 세션에서 본 데이터 버전. 아직 리로드하지 않은 서버 워커가 예전 버전을 돌려줘도 캐시를 다시 비우지 않는다
+local seenVersions = {}
+-- 응답을 기다리는 중인 키 → 같은 키를 기다리는 요청 목록 (같은 카드 여러 장도 요청은 한 번)
+local inFlight = {}
+
+local API_URL = "https://mtgapi-ko.lhs00900.workers.dev"
+local BATCH_SIZE = 50
+-- 동시에 보내는 배치 요청 수, 실패(연결 오류·5xx) 시 재시도 횟수와 첫 재시도 대기 시간(초, 매번 2배)
+local MAX_IN_FLIGHT = 2
+local MAX_ATTEMPTS = 4
+local RETRY_DELAY = 1
+-- 배치 응답에서 새 데이터 버전을 보고 전체를 다시 번역하는 최소 간격(초)
+local RETRANSLATE_INTERVAL = 30
+local lastRetranslate = nil
+local isRetranslateScheduled = false
+-- 서버나 프록시가 POST /translate/batch를 지원하지 않으면(404/405 등) 이번 세션은 카드마다 GET /translate로 보냄
+local batchSupported = true
+
+-- 보낼 배치 요청 (손에 든 카드가 든 배치는 priorityBatches로 먼저 보냄)
+local priorityBatches = {}
+local queuedBatches = {}
+local inFlightBatches = 0
+local progress = { done = 0, total = 0 }
+
+
+function onLoad(saved_data)
     -- 오브젝트 로드시
+    restoreCache(saved_data)
     createTranslateButton()
     print("번역 시작")
+    -- 캐시에 있는 카드는 요청 없이 바로 적용되고, 서버 데이터가 바뀌었을 때만 다시 번역
     translateObjects()
+    checkDataVersion(function(changed)
+        if changed then
+            translationStatus = {}
+            translateObjects()
+        end
+    end)
+end
+
+function onSave()
+    -- 이번 세션에서 쓴 캐시 항목만 저장 (저장 데이터가 계속 커지지 않도록)
+    local cache = {}
+    for key in pairs(cacheUsed) do
+        cache[key] = translationCache[key]
+    end
+    return JSON.encode({ data_version = dataVersion, cache = cache })
+end
+
+function restoreCache(saved_data)
+    if not saved_data or saved_data == "" then
+        return
+    end
+    local saved = JSON.decode(saved_data)
+    if type(saved) == "table" and type(saved.cache) == "table" then
+        translationCache = saved.cache
+        dataVersion = saved.data_version
+        if dataVersion then
+            seenVersions[dataVersion] = true
+        end
+    end
+end
+
+function checkDataVersion(callback)
+    -- 서버의 현재 데이터 버전 확인. 저장된 캐시의 버전과 다르면 캐시를 비우고 callback(true)
+    -- 서버에 연결할 수 없으면 캐시를 그대로 쓴다
+    WebRequest.get(API_URL .. "/version", function(request)
+        local changed = false
+        if request.is_done and not request.is_error then
+            local result = JSON.decode(request.text)
+            if type(result) == "table" and result.data_version then
+                changed = setDataVersion(result.data_version)
+            end
+        end
+        callback(changed)
+    end)
+end
+
+function setDataVersion(version)
+    -- 처음 보는 버전이면 캐시를 비운다. 이전 버전의 캐시가 있었으면 true
+    -- 버전은 해시라 앞뒤를 알 수 없으므로, 이번 세션에서 이미 본 버전으로는 돌아가지 않는다
+    if version == dataVersion or seenVersions[version] then
+        return false
+    end
+    seenVersions[version] = true
+    local hadCache = dataVersion ~= nil and next(translationCache) ~= nil
+    dataVersion = version
+    translationCache = {}
+    cacheUsed = {}
+    return hadCache
+end
+
+function scheduleRetranslate()
+    -- 배치 응답에 처음 보는 버전이 왔을 때: /version으로 확인해서 바뀌었으면 전체를 다시 번역
+    -- 워커마다 버전이 잠깐 다를 수 있으므로 RETRANSLATE_INTERVAL초에 한 번까지만
+    if isRetranslateScheduled then
+        return
+    end
+    isRetranslateScheduled = true
+    local function check()
+        checkDataVersion(function(changed)
+            isRetranslateScheduled = false
+            if changed then
+                lastRetranslate = os.time()
+                translationStatus = {}
+                translateObjects()
+            end
+        end)
+    end
+    local delay = lastRetranslate and (lastRetranslate + RETRANSLATE_INTERVAL - os.time()) or 0
+    if delay > 0 then
+        Wait.time(check, delay)
+    else
+        check()
+    end
+end
+
+function normalizeName(name)
+    -- 캐시 키용 이름: 공백 정리 + 소문자 (서버도 search_value를 소문자로 비교)
+    return (name:gsub("%s+", " "):gsub("^ ", ""):gsub(" $", ""):lower())
 end
 
 function createTranslateButton()
@@ -27,14 +146,13 @@ end
 function onReTranslateButtonClicked(playerColor)
     print("재번역중...")
     
-    -- 캐시와 상태 초기화
-    translationCache = {}
+    -- 상태 초기화 (캐시는 서버 데이터 버전이 바뀌었을 때만 비움)
     translationStatus = {}
-    dfcQueue = {}
-    isProcessingDFC = false
 
     -- 번역 다시 시작
-    translateObjects()
+    checkDataVersion(function()
+        translateObjects()
+    end)
 end
 
 function urlencode(str)
@@ -93,23 +211,6 @@ function safeSetState(obj, id, delay)
     end
 end
 
-function enqueueDFCTranslation(name, obj, args)
-    table.insert(dfcQueue, { name = name, obj = obj, args = args })
-    processNextDFC()
-end
-
-function processNextDFC()
-    if isProcessingDFC or #dfcQueue == 0 then return end
-    isProcessingDFC = true
-
-    local item = table.remove(dfcQueue, 1)
-    translateDFC(item.name, item.obj, item.args, function()
-        isProcessingDFC = false
-        Wait.time(processNextDFC, 0.3)  -- 다음 카드로 약간의 딜레이 후 진행
-    end)
-end
-
-
 function translateObjects()
     --메인로직
     for _, obj in ipairs(getAllObjects()) do
@@ -125,7 +226,7 @@ function translateObjects()
                         -- 줄바꿈 이전의 데이터만 다음 함수로 보냄
                         local value = name:match("^[^\n]*"):gsub("^%s*(.-)%s*$", "%1")
                         -- print("DFC 카드")
-                        enqueueDFCTranslation(value, obj, "search_value")
+                        translateDFC(value, obj)
                     else
                         -- Single 카드와 Split 카드 처리
                         local value = name:match("^[^\n]*"):gsub("^%s*(.-)%s*$", "%1")
@@ -138,86 +239,36 @@ function translateObjects()
     end
 end
 
-function translateDFC(name, obj, args, onComplete)
+function translateDFC(name, obj)
     --양면카드 로직
-    -- print("translateDFC 호출됨")
+    -- 현재 면의 이름으로 한 번만 요청하면 서버가 [현재 면, 반대 면] 순서로 모든 면을 돌려줌
     local objID = obj.getGUID()
-    -- GUID 기준으로 오브젝트 가져옴
-    if obj.getStateId() ~= 1 then
-        safeSetState(obj, 1)
-        Wait.time(function()
-            -- 상태가 바뀐 후 다시 큐에 넣기 (중복 방지용 플래그 필요시 추가 가능)
-            enqueueDFCTranslation(name, obj, args)
-            if onComplete then onComplete() end
-        end, 0.5)
+    translationStatus[objID] = { translationCount = 0, totalTranslations = 1, data1 = nil, data2 = nil }
+    requestTranslation(name, obj, "dfc", nil, "faces")
+end
+
+function applyDFCTranslation(obj, faces)
+    local front = faces[1]
+    local back = faces[2]
+    if front and not front.error then
+        applySingleTranslation(obj, front)
+    end
+    if not back or back.error then
         return
     end
 
-    local alreadyProcessed = {}
-
-    translationStatus[objID] = { translationCount = 0, totalTranslations = 0, data1 = nil, data2 = nil }
-    --비동기 처리를 위한 변수생성 및 초기화
-
-    local function onTranslationDone(version)
-        -- print("onTranslationDone 호출됨".. tostring(version))
-        local status = translationStatus[objID]
-        if status then
-            status.translationCount = status.translationCount + 1
-            --비동기 처리를 위한 번역 횟수 추가 
-            if status.translationCount == status.totalTranslations then
-                -- 1번 상태의 번역이 완료 되었다면 해당 로직 실행
-
-                if obj and obj.setState then
-                    obj.setState(2)
-                    -- print("[DFC] Switching to state 2...")
-                end
-                -- 오브젝트에 상태가 정상적으로 있는지 검사 후 상태 변경
-
-                for _, obj2 in ipairs(getObjects()) do
-                    if obj2 then
-                        local guid = obj2.getGUID()
-                        local name2 = obj2.getName()
-
-                        if not alreadyProcessed[guid]
-                            and name2 and name2 ~= ""
-                            and not hasKorean(name2)
-                            and obj2.getStateId() == 2 then
-
-                            alreadyProcessed[guid] = true
-
-                            local search_value2 = name2:match("^[^\n]*"):gsub("^%s*(.-)%s*$", "%1")
-                            translateSingleOrSplitCard(search_value2, obj2, "search_value")
-
-                            if obj2 and obj2.setState and obj2.getStates then
-                                local states = obj2.getStates()
-                                local hasState1 = states and (states["1"] or states[1])
-                                safeSetState(obj2, 1, 0.6)
-                            end
-                            if onComplete then onComplete() end
-                        end
-                    end
-                end
-                -- 다시 오브젝트를 가져와서 검사 이후 번역 
-            end
-        end
+    -- 반대 면으로 바꿔서 번역을 적용한 뒤 원래 면으로 되돌림
+    local currentId = obj.getStateId()
+    local otherId = currentId == 1 and 2 or 1
+    local states = obj.getStates()
+    if not states or not (states[tostring(otherId)] or states[otherId]) then
+        return
     end
 
-    if obj.getStateId() == 1 then
-        -- 1번상태일때 번역 로직 
-        if name:find(" // ") then
-            local data1, data2 = name:match("^(.-) // (.-)$")
-            if data1 and data2 then
-                translationStatus[objID].totalTranslations = 2
-                -- 비동기 처리를 위해 변수 세팅
-                requestTranslation(data1, obj, "data1", function() onTranslationDone("data1") end, args)
-                requestTranslation(data2, obj, "data2", function() onTranslationDone("data2") end, args)
-                -- 콜백함수 호출
-            end
-        else
-            -- Single card translation request
-            translationStatus[objID].totalTranslations = 1
-            requestTranslation(name, obj, "single", function() onTranslationDone("single") end, args)
-        end
+    local obj2 = obj.setState(otherId)
+    if obj2 then
+        applySingleTranslation(obj2, back)
+        safeSetState(obj2, currentId, 0.6)
     end
 end
 
@@ -226,13 +277,9 @@ function translateSingleOrSplitCard(name, obj, args)
     translationStatus[objID] = { translationCount = 0, totalTranslations = 0, data1 = nil, data2 = nil }
 
     if name:find(" // ") then
-        -- Handle Split/Adventure cards
-        local data1, data2 = name:match("^(.-) // (.-)$")
-        if data1 and data2 then
-            translationStatus[objID].totalTranslations = 2
-            requestTranslation(data1, obj, "data1", function() applySplitTranslation(obj) end, args)
-            requestTranslation(data2, obj, "data2", function() applySplitTranslation(obj) end, args)
-        end
+        -- Handle Split/Adventure cards (서버가 "A // B"를 면별로 나눠서 한 번에 응답)
+        translationStatus[objID].totalTranslations = 1
+        requestTranslation(name, obj, "faces", nil, "faces")
     else
         -- Single card translation request
         translationStatus[objID].totalTranslations = 1
@@ -241,36 +288,239 @@ function translateSingleOrSplitCard(name, obj, args)
 end
 
 function requestTranslation(name, obj, version, callback, args)
-    local url = "https://mtgapi-ko.lhs00900.workers.dev/translate?".. args .."=" .. urlencode(name)
-    -- print("요청URL"..tostring(url))
-    WebRequest.get(url, function(request)
-        handleResponse(request, obj, version, callback)
+    -- 바로 요청하지 않고 큐에 모아 두었다가 다음 프레임에 배치로 한 번에 보냄
+    table.insert(pendingRequests, { name = name, obj = obj, version = version, callback = callback, args = args })
+    if not isFlushScheduled then
+        isFlushScheduled = true
+        Wait.frames(flushTranslationRequests, 1)
+    end
+end
+
+function flushTranslationRequests()
+    isFlushScheduled = false
+    local queued = {}
+
+    -- 캐시에 있으면 바로 적용, 이미 요청 중인 키면 그 응답을 같이 기다림, 아니면 키마다 한 번만 요청
+    for _, item in ipairs(pendingRequests) do
+        item.key = item.args .. ":" .. normalizeName(item.name)
+        local cached = translationCache[item.key]
+        if cached ~= nil then
+            cacheUsed[item.key] = true
+            handleResponse(cached, item.obj, item.version, item.callback)
+        elseif inFlight[item.key] then
+            table.insert(inFlight[item.key], item)
+        else
+            inFlight[item.key] = { item }
+            table.insert(queued, item)
+        end
+    end
+    pendingRequests = {}
+
+    -- 손에 든 카드를 먼저, BATCH_SIZE 단위로 잘라서 스케줄러에 넘김
+    local inHand = handObjectGuids()
+    local handItems = {}
+    local otherItems = {}
+    for _, item in ipairs(queued) do
+        table.insert(inHand[item.obj.getGUID()] and handItems or otherItems, item)
+    end
+    enqueueBatches(handItems, priorityBatches)
+    enqueueBatches(otherItems, queuedBatches)
+    progress.total = progress.total + #queued
+    updateProgress()
+    pumpBatches()
+end
+
+function handObjectGuids()
+    local guids = {}
+    for _, player in ipairs(Player.getPlayers()) do
+        for _, obj in ipairs(player.getHandObjects() or {}) do
+            guids[obj.getGUID()] = true
+        end
+    end
+    return guids
+end
+
+function enqueueBatches(items, queue)
+    for first = 1, #items, BATCH_SIZE do
+        local batch = {}
+        for i = first, math.min(first + BATCH_SIZE - 1, #items) do
+            table.insert(batch, items[i])
+        end
+        table.insert(queue, { items = batch, attempt = 1 })
+    end
+end
+
+function pumpBatches()
+    -- 응답을 기다리는 배치가 MAX_IN_FLIGHT개가 될 때까지 다음 배치를 보냄
+    -- (전체 번역 시간은 고정 대기 없이 서버가 응답하는 속도만큼 걸림)
+    while inFlightBatches < MAX_IN_FLIGHT do
+        local batch = table.remove(priorityBatches, 1) or table.remove(queuedBatches, 1)
+        if not batch then
+            return
+        end
+        sendTranslationBatch(batch)
+    end
+end
+
+function updateProgress()
+    -- 재번역 버튼에 진행 상황 표시 (요청한 카드 이름 기준)
+    if progress.done >= progress.total then
+        if progress.total > 0 then
+            print("번역 완료 (" .. progress.total .. "개 요청)")
+        end
+        progress = { done = 0, total = 0 }
+        self.editButton({ index = 0, label = "재번역" })
+    else
+        self.editButton({ index = 0, label = "번역 중 " .. progress.done .. "/" .. progress.total })
+    end
+end
+
+function sendTranslationBatch(batch)
+    if not batchSupported then
+        sendSingleRequests(batch)
+        return
+    end
+    local body = { search_value = {}, card_name = {}, faces = {} }
+    for _, item in ipairs(batch.items) do
+        table.insert(body[item.args], item.name)
+    end
+
+    inFlightBatches = inFlightBatches + 1
+    local headers = { ["Content-Type"] = "application/json" }
+    WebRequest.custom(API_URL .. "/translate/batch", "POST", true, JSON.encode(body), headers, function(request)
+        inFlightBatches = inFlightBatches - 1
+        local code = request.response_code or 0
+        local results = nil
+        if request.is_done and code < 500 then
+            results = JSON.decode(request.text)
+        end
+        if code == 404 or code == 405 or (type(results) == "table" and not isBatchResult(results)) then
+            -- /translate/batch가 아직 배포되지 않은 서버나 프록시: 오류 본문을 결과로 읽지 않고 카드별 요청으로 다시 보냄
+            print("서버가 일괄 번역을 지원하지 않아 카드별로 요청합니다.")
+            batchSupported = false
+            sendSingleRequests(batch)
+            return
+        end
+
+        local failed = not request.is_done or request.is_error or code >= 500
+        if failed and batch.attempt < MAX_ATTEMPTS then
+            retryBatch(batch)
+            return
+        end
+        if failed then
+            results = nil
+        end
+        finishBatch(batch, results)
     end)
 end
 
-function handleResponse(request, obj, version, callback)
-    local objID = obj.getGUID()
-    if request.is_done and not request.is_error then
-        local data = JSON.decode(request.text)
-        if data and not data.error then
-            local status = translationStatus[objID]
-            if status then
-                if version == "single" then
-                    applySingleTranslation(obj, data)
-                elseif version == "data1" or version == "data2" then
-                    status[version] = data
-                    if status.data1 and status.data2 then
-                        applySplitTranslation(obj)
-                        translationStatus[objID] = nil -- Clear results for next object
-                    end
-                end
-                if callback then
-                    callback()
+function isBatchResult(results)
+    -- 배치 응답에는 요청한 종류(search_value/card_name/faces) 중 하나 이상이 들어 있음
+    return results.search_value ~= nil or results.card_name ~= nil or results.faces ~= nil
+end
+
+function retryBatch(batch)
+    -- 대기하는 동안 다른 배치가 그 자리를 씀
+    local delay = RETRY_DELAY * 2 ^ (batch.attempt - 1)
+    batch.attempt = batch.attempt + 1
+    Wait.time(function()
+        table.insert(priorityBatches, 1, batch)
+        pumpBatches()
+    end, delay)
+    pumpBatches()
+end
+
+function sendSingleRequests(batch)
+    -- 배치 대신 카드마다 GET /translate (faces는 faces=1)를 보내고, 모두 끝나면 배치 응답과 같은 모양으로 모아 처리
+    -- 한 배치가 MAX_IN_FLIGHT 자리 하나를 차지하는 것은 배치 요청과 같음
+    inFlightBatches = inFlightBatches + 1
+    local results = { search_value = {}, card_name = {}, faces = {} }
+    local remaining = #batch.items
+    for _, item in ipairs(batch.items) do
+        local url
+        if item.args == "faces" then
+            url = API_URL .. "/translate?search_value=" .. urlencode(item.name) .. "&faces=1"
+        else
+            url = API_URL .. "/translate?" .. item.args .. "=" .. urlencode(item.name)
+        end
+        WebRequest.get(url, function(request)
+            -- 찾을 수 없음(404 + error 본문)은 배치 응답처럼 결과로 받고, 연결 오류·5xx는 결과 없음
+            if request.is_done and (request.response_code or 0) < 500 then
+                local data = JSON.decode(request.text)
+                if type(data) == "table" then
+                    results[item.args][item.name] = data
                 end
             end
-        end
-    else
+            remaining = remaining - 1
+            if remaining == 0 then
+                inFlightBatches = inFlightBatches - 1
+                finishBatch(batch, results)
+            end
+        end)
+    end
+end
+
+function finishBatch(batch, results)
+    if type(results) ~= "table" then
         print("서버에 응답이 없습니다.")
+        results = nil
+    elseif results.data_version and dataVersion == nil then
+        -- 아직 버전을 모름(첫 실행에 /version 응답 전): 비울 캐시가 없으니 그대로 받아들임
+        setDataVersion(results.data_version)
+    end
+    local current = results == nil or results.data_version == nil or results.data_version == dataVersion
+    handleBatchResults(batch.items, results, current)
+    progress.done = progress.done + #batch.items
+    updateProgress()
+    if not current and not seenVersions[results.data_version] then
+        -- 번역 중에 서버 데이터가 바뀌었을 수 있음: 캐시는 /version 응답을 보고 비운다
+        scheduleRetranslate()
+    end
+    pumpBatches()
+end
+
+function handleBatchResults(batch, results, cacheable)
+    -- 배치 응답을 캐시에 넣고, 같은 키를 기다리던 요청 모두에 적용 (results가 nil이면 실패)
+    -- cacheable이 아니면(지금 캐시와 다른 버전의 응답) 적용만 하고 캐시하지 않는다
+    for _, item in ipairs(batch) do
+        local waiting = inFlight[item.key] or { item }
+        inFlight[item.key] = nil
+        local data = nil
+        if results then
+            data = (results[item.args] or {})[item.name]
+            if data ~= nil and cacheable then
+                -- 실패한 요청은 캐시하지 않으므로 다음 번역 때 다시 요청됨
+                translationCache[item.key] = data
+                cacheUsed[item.key] = true
+            end
+        end
+        for _, waiter in ipairs(waiting) do
+            handleResponse(data, waiter.obj, waiter.version, waiter.callback)
+        end
+    end
+end
+
+function handleResponse(data, obj, version, callback)
+    local objID = obj.getGUID()
+    if data and not data.error then
+        local status = translationStatus[objID]
+        if status then
+            if version == "single" then
+                applySingleTranslation(obj, data)
+            elseif version == "faces" then
+                local faces = data.faces or {}
+                if faces[1] and not faces[1].error then status.data1 = faces[1] end
+                if faces[2] and not faces[2].error then status.data2 = faces[2] end
+                applySplitTranslation(obj)
+                translationStatus[objID] = nil -- Clear results for next object
+            elseif version == "dfc" then
+                translationStatus[objID] = nil
+                applyDFCTranslation(obj, data.faces or {})
+            end
+            if callback then
+                callback()
+            end
+        end
     end
 end
 
@@ -0,0 +1,176 @@
+import bisect
+import threading
+
+# /metrics용 가벼운 계측 (Prometheus 텍스트 형식)
+# 요청마다 하는 일은 bisect 한 번과 정수 몇 개 증가뿐이고, 문자열 생성은 수집(render) 때만 한다.
+# 값은 프로세스(워커)마다 따로 쌓인다.
+
+REQUEST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+STAGE_BUCKETS = (0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005)
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in labels) + "}"
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """누적이 아닌 버킷별 개수로 보관하고 render에서 누적값으로 바꾼다."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels((*labels, ('le', format_value(bound))))} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {self.sum!r}")
+        lines.append(f"{name}_count{format_labels(labels)} {self.count}")
+        return lines
+
+
+class SpaceSaving:
+    """
+    상위 N개 인기 키 근사(Space-Saving). capacity개 키만 세고, 꽉 차면 가장 적게 센 키를 새 키로 바꾼다.
+    counts[key] - errors[key]가 실제 요청 수의 하한이다.
+    개수별로 키를 묶어 두고(_buckets) 최소 개수를 따라가므로 add는 키 수와 상관없이 O(1)이다.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._buckets = {}
+        self._min_count = 0
+
+    def _move(self, key, old_count, new_count):
+        bucket = self._buckets[old_count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[old_count]
+            if self._min_count == old_count:
+                self._min_count = new_count
+        self._buckets.setdefault(new_count, {})[key] = None
+        self.counts[key] = new_count
+
+    def add(self, key):
+        count = self.counts.get(key)
+        if count is not None:
+            self._move(key, count, count + 1)
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = 1
+            self.errors[key] = 0
+            self._buckets.setdefault(1, {})[key] = None
+            self._min_count = 1
+        else:
+            floor = self._min_count
+            victim = next(iter(self._buckets[floor]))
+            del self.counts[victim]
+            del self.errors[victim]
+            self._buckets[floor][key] = self._buckets[floor].pop(victim)
+            self.counts[key] = floor
+            self.errors[key] = floor
+            self._move(key, floor, floor + 1)
+
+    def top(self, limit):
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+class Metrics:
+    """요청 지연 히스토그램, 조회 hit/miss 카운터, 조회·직렬화 단계 시간, 인기 키."""
+
+    def __init__(self, hot_keys=100, hot_keys_exported=20):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.lookups = {}
+        self.stages = {}
+        self.hot_keys = SpaceSaving(hot_keys)
+        self.hot_keys_exported = hot_keys_exported
+
+    def observe_request(self, endpoint, status, seconds):
+        with self._lock:
+            histogram = self.requests.get((endpoint, status))
+            if histogram is None:
+                histogram = self.requests[(endpoint, status)] = Histogram(REQUEST_BUCKETS)
+            histogram.observe(seconds)
+
+    def record_lookup(self, field, hit, key):
+        with self._lock:
+            self.lookups[(field, hit)] = self.lookups.get((field, hit), 0) + 1
+            self.hot_keys.add(key)
+
+    def observe_stage(self, stage, seconds):
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram(STAGE_BUCKETS)
+            histogram.observe(seconds)
+
+    def render(self, gauges=()):
+        """
+        Prometheus 텍스트 형식 본문.
+        gauges: (이름, 설명, [(레이블 튜플, 값), ...]) 목록 — 인덱스 크기처럼 수집할 때 읽는 값.
+        """
+        with self._lock:
+            lines = [
+                "# HELP mtgapi_request_duration_seconds Request latency by endpoint and status.",
+                "# TYPE mtgapi_request_duration_seconds histogram",
+            ]
+            for (endpoint, status), histogram in sorted(self.requests.items()):
+                lines += histogram.render("mtgapi_request_duration_seconds", (("endpoint", endpoint), ("status", status)))
+
+            lines += [
+                "# HELP mtgapi_lookups_total Translation lookups by key field and result.",
+                "# TYPE mtgapi_lookups_total counter",
+            ]
+            for (field, hit), count in sorted(self.lookups.items()):
+                lines.append(f"mtgapi_lookups_total{format_labels((('field', field), ('result', 'hit' if hit else 'miss')))} {count}")
+
+            lines += [
+                "# HELP mtgapi_translate_stage_seconds Time spent in index lookup versus response serialization.",
+                "# TYPE mtgapi_translate_stage_seconds histogram",
+            ]
+            for stage, histogram in sorted(self.stages.items()):
+                lines += histogram.render("mtgapi_translate_stage_seconds", (("stage", stage),))
+
+            lines += [
+                "# HELP mtgapi_hot_key_requests Approximate request count of the most requested keys (Space-Saving).",
+                "# TYPE mtgapi_hot_key_requests gauge",
+            ]
+            hot_keys = self.hot_keys.top(self.hot_keys_exported)
+            for key, count in hot_keys:
+                lines.append(f"mtgapi_hot_key_requests{format_labels((('key', key),))} {count}")
+            lines += [
+                "# HELP mtgapi_hot_key_error Upper bound of overcounting in mtgapi_hot_key_requests.",
+                "# TYPE mtgapi_hot_key_error gauge",
+            ]
+            for key, _ in hot_keys:
+                lines.append(f"mtgapi_hot_key_error{format_labels((('key', key),))} {self.hot_keys.errors[key]}")
+
+        for name, help_text, samples in gauges:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,86 @@
+import argparse
+import json
+import sys
+
+# 두 벤치마크 결과(bench/run.py 출력)를 지표별로 비교한다.
+# 시간 지표(_s, _ms, _us)는 작을수록, 처리량(rps)은 클수록 좋다. 기준보다 threshold 이상 나빠지면 종료 코드 1.
+# 예: python bench/compare.py bench/results/before.json bench/results/after.json --threshold 0.1
+
+LOWER_IS_BETTER = ("_s", "_ms", "_us")
+HIGHER_IS_BETTER = ("rps",)
+
+
+def flatten(value, prefix=""):
+    """중첩된 결과를 {"build.phase_s.card scan": 1.23, ...} 형태로 편다. meta는 제외한다."""
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        # http 결과처럼 목록이면 동시 접속 수로 구분
+        items = ((f"c{item.get('concurrency', index)}", item) for index, item in enumerate(value))
+    else:
+        return {prefix: value} if isinstance(value, (int, float)) and not isinstance(value, bool) else {}
+
+    flat = {}
+    for key, item in items:
+        if not prefix and key == "meta":
+            continue
+        flat.update(flatten(item, f"{prefix}.{key}" if prefix else key))
+    return flat
+
+
+def direction(metric):
+    """1: 클수록 좋음, -1: 작을수록 좋음, 0: 비교만 (개수 등)."""
+    for segment in reversed(metric.split(".")):
+        if segment.endswith(HIGHER_IS_BETTER):
+            return 1
+        if segment.endswith(LOWER_IS_BETTER):
+            return -1
+    return 0
+
+
+def compare(baseline, current, threshold):
+    rows = []
+    current = flatten(current)
+    for metric, old in flatten(baseline).items():
+        new = current.get(metric)
+        if new is None:
+            continue
+        change = (new - old) / old if old else 0.0
+        better = direction(metric)
+        if better == 0 and new == old:
+            continue  # 입력 개수 같은 값은 바뀌었을 때만 보여 준다
+        regressed = better != 0 and -better * change > threshold
+        rows.append((metric, old, new, change, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1, help="회귀로 볼 변화율 (기본 0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+
+    for label, result in (("baseline", baseline), ("current", current)):
+        meta = result.get("meta", {})
+        print(f"{label}: commit {meta.get('commit')}, cards {meta.get('cards')}, {meta.get('created_at')}")
+    if baseline.get("meta", {}).get("cards") != current.get("meta", {}).get("cards"):
+        print("경고: 두 결과의 카드 수가 다릅니다")
+
+    rows = compare(baseline, current, args.threshold)
+    width = max((len(metric) for metric, *_ in rows), default=10)
+    regressions = 0
+    for metric, old, new, change, regressed in rows:
+        regressions += regressed
+        print(f"{metric:<{width}}  {old:>12.4g}  {new:>12.4g}  {change:>+8.1%}{'  REGRESSION' if regressed else ''}")
+    print(f"{regressions}개 지표가 {args.threshold:.0%} 넘게 나빠졌습니다" if regressions else "회귀 없음")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import argparse
+import os
+import random
+import sqlite3
+import sys
+
+# 벤치마크용 합성 데이터 생성기
+# Raw_CardDatabase_*.mtga / Raw_ClientLocalization_*.mtga와 같은 모양(data_modifier.py가 읽는 테이블·컬럼)의
+# SQLite 파일을 원하는 카드 수로 만든다. 같은 --seed면 같은 파일이 나온다.
+# 예: python bench/fixture.py --cards 50k --output bench/data/50k
+
+SCALES = {"10k": 10_000, "50k": 50_000, "200k": 200_000}
+
+KEYWORDS = [
+    ("Flying", "비행"), ("Trample", "돌진"), ("Deathtouch", "치명타"), ("Lifelink", "생명연결"),
+    ("Vigilance", "경계"), ("Haste", "신속"), ("Menace", "위협"), ("Reach", "도달"),
+    ("First strike", "선제공격"), ("Double strike", "이단공격"), ("Hexproof", "방호"), ("Flash", "섬광"),
+    ("Defender", "방어자"), ("Ward {2}", "보호 {2}"), ("Crew 3", "탑승 3"), ("Amass Orcs 2", "집결 오크 2"),
+    ("Scry 1", "점술 1"), ("Cycling {2}", "순환 {2}"), ("Convoke", "소집"), ("Kicker {1}{R}", "추가비용 {1}{R}"),
+]
+ABILITY_WORDS = [("Landfall", "상륙"), ("Raid", "습격"), ("Constellation", "별자리"), ("Morbid", "병적")]
+TYPES = [
+    ("Creature", "생물"), ("Instant", "순간마법"), ("Sorcery", "집중마법"), ("Enchantment", "부여마법"),
+    ("Artifact", "마법물체"), ("Planeswalker", "플레인즈워커"), ("Land", "대지"), ("Legendary Creature", "전설적 생물"),
+]
+SUBTYPES = [("Elf Warrior", "엘프 전사"), ("Human Wizard", "인간 마법사"), ("Dragon", "용"), ("Saga", "서사시"), ("Equipment", "장비")]
+SPRITES = ["xT", "xWU", "x3", "xR", "xP{color}", "x{color}", "{manaType0}", "{manaCombined}"]
+NAME_WORDS = ["Ancient", "Storm", "Shadow", "Ember", "Tide", "Grave", "Sky", "Iron", "Wild", "Silent",
+              "Oracle", "Titan", "Warden", "Serpent", "Blade", "Harbinger", "Bloom", "Rune", "Vault", "Crown"]
+NAME_WORDS_KO = ["고대", "폭풍", "그림자", "잉걸", "조류", "무덤", "하늘", "강철", "야생", "침묵",
+                 "신탁", "거인", "감시자", "뱀", "칼날", "전령", "개화", "룬", "금고", "왕관"]
+PRELUDE_LOC_ID = 614628
+SAGA_SUBTYPE = "347"
+
+
+def parse_card_count(value):
+    """"10k", "200k" 또는 숫자."""
+    if value in SCALES:
+        return SCALES[value]
+    if value.lower().endswith("k"):
+        return int(float(value[:-1]) * 1000)
+    return int(value)
+
+
+class LocalizationWriter:
+    """Localizations_enUS / Localizations_koKR 행을 모아 두었다가 한 번에 넣는다."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.next_id = 1000
+        self.enus = []
+        self.kokr = []
+
+    def add(self, enus, kokr):
+        self.next_id += 1
+        loc_id = self.next_id
+        self.enus.append((loc_id, 0, enus))
+        self.kokr.append((loc_id, 0, kokr))
+        # 실제 DB처럼 Formatted 변형과 잘못된 값(Formatted = 2, '#' 접두)이 섞여 있다
+        roll = self.rng.random()
+        if roll < 0.05:
+            self.kokr.append((loc_id, 2, "#" + kokr))
+        elif roll < 0.10:
+            self.kokr.append((loc_id, 1, kokr + " "))
+        return loc_id
+
+
+def ability_text(rng, number):
+    """(enUS, koKR) 능력 문장. 절반 정도는 키워드로 시작하고 koKR에는 스프라이트 태그와 {oX} 비용이 섞인다."""
+    sprite = rng.choice(SPRITES)
+    cost = rng.choice(["{oW}", "{oU}", "{o2}", "{oT}", "{oBR}", ""])
+    if rng.random() < 0.5:
+        enus_keyword, kokr_keyword = rng.choice(KEYWORDS)
+    else:
+        enus_keyword, kokr_keyword = rng.choice(ABILITY_WORDS)
+        enus_keyword += " — Whenever a land enters"
+        kokr_keyword += " — 대지가 전장에 들어올 때마다"
+    enus = f"{enus_keyword} {cost} <i>this</i> deals {number % 7} damage to any target."
+    kokr = (
+        f"{kokr_keyword} {cost} <b>이</b> 생물은 아무 목표에게 피해 {number % 7}점을 입힌다. "
+        f'<sprite="SpriteSheet_MiscIcons" name="{sprite}"> #{number}'
+    )
+    return enus, kokr
+
+
+def generate_card_database(path, card_count, rng):
+    loc = LocalizationWriter(rng)
+    types = [loc.add(en, ko) for en, ko in TYPES]
+    subtypes = [loc.add(en, ko) for en, ko in SUBTYPES]
+    saga_subtype = subtypes[3]
+
+    abilities = []
+    ability_rows = []
+    for number in range(max(200, card_count // 2)):
+        text_id = loc.add(*ability_text(rng, number))
+        loyalty_cost = rng.choice(["+1", "-2", "-7"]) if rng.random() < 0.05 else None
+        ability_rows.append((number + 1, text_id, loyalty_cost))
+        abilities.append((number + 1, text_id))
+    loc.enus.append((PRELUDE_LOC_ID, 0, "(As this Saga enters and after your draw step, add a lore counter.)"))
+    loc.kokr.append((PRELUDE_LOC_ID, 0, "(이 서사시가 전장에 들어올 때와 당신의 뽑기단 후에, 전승 카운터 한 개를 추가한다.)"))
+
+    # 재판 카드처럼 같은 이름이 여러 GrpId에 나오도록 이름 수는 카드 수보다 적게
+    names = []
+    for number in range(max(1, card_count * 3 // 4)):
+        first, second = rng.randrange(len(NAME_WORDS)), rng.randrange(len(NAME_WORDS))
+        names.append((f"{NAME_WORDS[first]} {NAME_WORDS[second]} {number}", f"{NAME_WORDS_KO[first]} {NAME_WORDS_KO[second]} {number}"))
+
+    cards = []
+    grp_id = 11
+    for number in range(card_count):
+        title_id = loc.add(*rng.choice(names))
+        flavor_id = loc.add(f"Flavor text {number}.", f"플레이버 텍스트 {number}.") if rng.random() < 0.5 else None
+        subtype_id = rng.choice(subtypes + [None, None])
+        selected = rng.sample(abilities, rng.randint(0, 4))
+        ability_ids = ",".join(f"{ability_id}:{text_id}" for ability_id, text_id in selected)
+        if subtype_id == saga_subtype and ability_ids and rng.random() < 0.5:
+            ability_ids = f"{PRELUDE_LOC_ID}," + ability_ids
+        cards.append([
+            grp_id, title_id, rng.choice(types), subtype_id, rng.randint(0, 9),
+            rng.choice(["", "1", "2", "3", "5"]), rng.choice(["", "1", "2", "4", "6"]), flavor_id,
+            ability_ids or None, SAGA_SUBTYPE if subtype_id == saga_subtype else rng.choice(["", "12", "12,45"]),
+            rng.choice([None, 0, 1, 2, 3, 4]), rng.choice([None, "", "1", "2", "3", "4", "5", "1,2", "3,5"]),
+            0, "",
+        ])
+        grp_id += 1
+
+    # 약 5%는 양면 카드: 이웃한 두 GrpId를 서로 연결
+    for number in range(0, card_count - 1, 20):
+        front, back = cards[number], cards[number + 1]
+        front[12], front[13] = 1, str(back[0])
+        back[12], back[13] = 2, str(front[0])
+
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE Cards (GrpId INTEGER, TitleId INTEGER, TypeTextId INTEGER, SubtypeTextId INTEGER, "
+        "Order_CMCWithXLast INTEGER, Power TEXT, Toughness TEXT, FlavorTextId INTEGER, AbilityIds TEXT, "
+        "Subtypes TEXT, Order_MythicToCommon INTEGER, Colors TEXT, LinkedFaceType INTEGER, LinkedFaceGrpIds TEXT)"
+    )
+    conn.execute("CREATE TABLE Abilities (Id INTEGER, TextId INTEGER, LoyaltyCost TEXT)")
+    for lang in ("enUS", "koKR"):
+        conn.execute(f"CREATE TABLE Localizations_{lang} (LocId INTEGER, Formatted INTEGER, Loc TEXT)")
+    conn.executemany("INSERT INTO Cards VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)", cards)
+    conn.executemany("INSERT INTO Abilities VALUES (?,?,?)", ability_rows)
+    conn.executemany("INSERT INTO Localizations_enUS VALUES (?,?,?)", loc.enus)
+    conn.executemany("INSERT INTO Localizations_koKR VALUES (?,?,?)", loc.kokr)
+    conn.commit()
+    conn.close()
+    return len(cards), len(ability_rows), len(loc.enus)
+
+
+def generate_client_localization(path):
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE loc (Key TEXT, enUS TEXT, koKR TEXT)")
+    rows = []
+    for enus, kokr in KEYWORDS:
+        base = enus.split(" {")[0].replace(" ", "")
+        rows.append((f"AbilityHanger/Keyword/{base}_Title", enus, kokr))
+        rows.append((
+            f"AbilityHanger/Keyword/{base}_Body",
+            f"{enus} reminder text {{abilityCost}}",
+            f'{kokr} 설명 {{abilityCost}}, {{oT}} <sprite="SpriteSheet_MiscIcons" name="xT"> o2',
+        ))
+    for enus, kokr in ABILITY_WORDS:
+        rows.append((f"AbilityHanger/AbilityWord/{enus}", f"{enus} — ability word", f"{kokr} — 능력어"))
+    rows.append(("AbilityHanger/Reminder/Flying", "reminder", "알림"))
+    rows.append(("MainNav/Home", "Home", "홈"))
+    conn.executemany("INSERT INTO loc VALUES (?,?,?)", rows)
+    conn.commit()
+    conn.close()
+    return len(rows)
+
+
+def generate(output, card_count, seed=1):
+    """output 디렉터리에 Raw_CardDatabase_bench.mtga와 Raw_ClientLocalization_bench.mtga를 만든다."""
+    os.makedirs(output, exist_ok=True)
+    rng = random.Random(seed)
+    cards, abilities, localizations = generate_card_database(
+        os.path.join(output, "Raw_CardDatabase_bench.mtga"), card_count, rng
+    )
+    loc_rows = generate_client_localization(os.path.join(output, "Raw_ClientLocalization_bench.mtga"))
+    return {"cards": cards, "abilities": abilities, "localizations": localizations, "loc_rows": loc_rows, "seed": seed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic MTG Arena SQLite files for benchmarks.")
+    parser.add_argument("--cards", default="10k", help="카드 수 (10k, 50k, 200k 또는 숫자)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="출력 디렉터리 (기본 bench/data/<카드 수>)")
+    args = parser.parse_args(argv)
+
+    card_count = parse_card_count(args.cards)
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", args.cards)
+    print(f"{output}: {generate(output, card_count, args.seed)}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from urllib.parse import quote, urlsplit
+
+# /translate HTTP 부하 생성기 (표준 라이브러리만 사용)
+# 동시 접속 수(--concurrency)만큼 keep-alive 연결을 열고, 연결마다 --pipeline개씩 요청을 몰아 보낸 뒤 응답을 읽는다.
+# 예: python bench/http_load.py http://127.0.0.1:8080 --concurrency 1 100 1000 --duration 10 --keys cards_data_for_api.json
+
+
+def load_keys(path, limit):
+    if not path:
+        return ["ping"]
+    with open(path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    keys = [record["search_value"] for record in records if record.get("search_value")]
+    random.shuffle(keys)
+    return keys[:limit] if limit else keys
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def read_response(reader):
+    """응답 하나를 읽고 상태 코드를 돌려준다 (Content-Length 응답만 지원)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("서버가 연결을 닫았습니다")
+    status = int(status_line.split()[1])
+    content_length = 0
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            content_length = int(value)
+        elif name == "connection" and value.strip().lower() == "close":
+            keep_alive = False
+    if content_length:
+        await reader.readexactly(content_length)
+    return status, keep_alive
+
+
+async def client(host, port, base_path, keys, deadline, pipeline, latencies, counters):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            batch = [random.choice(keys) for _ in range(pipeline)]
+            request = b"".join(
+                f"GET {base_path}/translate?search_value={quote(key)} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("ascii")
+                for key in batch
+            )
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            for _ in batch:
+                status, keep_alive = await read_response(reader)
+                latencies.append(time.perf_counter() - started)
+                counters["ok" if status == 200 else "errors"] += 1
+            if not keep_alive:
+                writer.close()
+                reader = writer = None
+                counters["reconnects"] += 1
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            counters["errors"] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def run_level(url, keys, concurrency, duration, pipeline):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    latencies = []
+    counters = {"ok": 0, "errors": 0, "reconnects": 0}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        client(host, port, parts.path.rstrip("/"), keys, deadline, pipeline, latencies, counters)
+        for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "pipeline": pipeline,
+        "duration_s": round(elapsed, 3),
+        "requests": counters["ok"],
+        "errors": counters["errors"],
+        "reconnects": counters["reconnects"],
+        "rps": round(counters["ok"] / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the /translate endpoint.")
+    parser.add_argument("url", help="서버 주소 (예: http://127.0.0.1:8080)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--duration", type=float, default=10.0, help="동시 접속 수 단계마다 측정할 시간(초)")
+    parser.add_argument("--pipeline", type=int, default=1, help="연결마다 한 번에 보낼 요청 수 (HTTP/1.1 파이프라이닝)")
+    parser.add_argument("--keys", help="search_value를 뽑을 카드 JSON 파일 (없으면 ping만 요청)")
+    parser.add_argument("--key-limit", type=int, default=0)
+    parser.add_argument("--label", default="", help="결과에 함께 기록할 설정 이름")
+    parser.add_argument("--output", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    keys = load_keys(args.keys, args.key_limit)
+    results = []
+    for concurrency in args.concurrency:
+        result = asyncio.run(run_level(args.url, keys, concurrency, args.duration, args.pipeline))
+        result["label"] = args.label
+        results.append(result)
+        print(json.dumps(result, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=4)
+    return results
+
+
+if __name__ == "__main__":
+    sys.exit(main() and 0)
@@ -0,0 +1,329 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import fixture
+
+# 벤치마크 실행기: 합성 데이터로 빌드 단계(build), 핫 함수(micro), /translate 요청 경로(api)를 재고
+# 결과를 JSON 하나로 남긴다. 두 결과 파일은 bench/compare.py로 비교한다.
+# 예: python bench/run.py --cards 10k --output bench/results/10k.json
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def measure(func, items, repeat):
+    """items 각각에 func를 한 번씩 부르는 것을 repeat번 반복해 연산당 시간(µs)을 잰다."""
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            func(item)
+        rounds.append((time.perf_counter() - started) / len(items) * 1e6)
+    return {
+        "ops": len(items),
+        "best_us": round(min(rounds), 3),
+        "median_us": round(statistics.median(rounds), 3),
+    }
+
+
+def run_build(data_modifier, workers, repeat, stream=False):
+    """
+    fetch_data_and_create_json 전체와 단계별 소요 시간. 여러 번 돌리면 단계마다 가장 짧은 값을 남긴다.
+    stream이면 --stream 빌드 (단계가 'stream cards' 하나로 합쳐짐).
+    """
+    database = fixture_database()
+    best = None
+    for _ in range(repeat):
+        # 주석 사전은 모듈 전역에 누적되므로 매번 비운다
+        data_modifier.ANNOTATION_DATA_DETAILED = {}
+        for path in (data_modifier.OUTPUT_FILE, data_modifier.MANIFEST_FILE, data_modifier.DIFF_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            phase_times = data_modifier.fetch_data_and_create_json(database, workers=workers, stream=stream)
+        if phase_times is None:
+            raise RuntimeError("빌드 실패")
+        if best is None:
+            best = dict(phase_times)
+        else:
+            best = {name: min(best[name], seconds) for name, seconds in phase_times.items()}
+
+    with open(data_modifier.OUTPUT_FILE, "r", encoding="utf-8") as f:
+        records = len(json.load(f))
+    return {
+        "workers": workers,
+        "stream": stream,
+        "records": records,
+        "total_s": round(sum(best.values()), 4),
+        "phase_s": {name: round(seconds, 4) for name, seconds in best.items()},
+        "output_bytes": os.path.getsize(data_modifier.OUTPUT_FILE),
+    }
+
+
+def fixture_database():
+    return next(name for name in os.listdir(".") if name.startswith("Raw_CardDatabase_"))
+
+
+def run_micro(data_modifier, samples, repeat, rng):
+    """
+    get_ability_annotation, replace_sprite_tags, process_ability_ids 연산당 시간과
+    koKR 지역화 정리(기존 clean_localizations_koKR / TextNormalizer, 메모 없이) 연산당 시간.
+    """
+    conn = data_modifier.connect_read_only(fixture_database())
+    try:
+        cursor = conn.cursor()
+        tables = data_modifier.preload_card_tables(cursor)
+        cursor.execute("SELECT TextId FROM Abilities")
+        ability_texts = [tables["enUS"][text_id] for (text_id,) in cursor.fetchall() if text_id in tables["enUS"]]
+        cursor.execute("SELECT Loc FROM Localizations_koKR WHERE Loc LIKE '%<sprite%'")
+        sprite_texts = [loc for (loc,) in cursor.fetchall()]
+        cursor.execute("SELECT Loc FROM Localizations_koKR WHERE Loc IS NOT NULL")
+        kokr_texts = [loc for (loc,) in cursor.fetchall()]
+        cursor.execute("SELECT AbilityIds, Subtypes FROM Cards WHERE AbilityIds IS NOT NULL AND AbilityIds != ''")
+        ability_rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    if data_modifier.ANNOTATION_MATCHER is None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            data_modifier.build_annotation_dictionary_from_file()
+
+    def sample(values):
+        return [rng.choice(values) for _ in range(samples)] if values else []
+
+    ability_texts = sample(ability_texts)
+    kokr_texts = sample(kokr_texts)
+    results = {
+        "get_ability_annotation": measure(
+            lambda text: data_modifier.get_ability_annotation(text, set()), ability_texts, repeat
+        ),
+        "get_ability_annotation_linear": measure(
+            lambda text: data_modifier.get_ability_annotation_linear(text, set()), ability_texts[:max(1, samples // 10)], repeat
+        ),
+        "replace_sprite_tags": measure(data_modifier.replace_sprite_tags, sample(sprite_texts), repeat),
+        "clean_localizations_koKR": measure(data_modifier.clean_localizations_koKR, kokr_texts, repeat),
+        "text_normalizer": measure(data_modifier.TextNormalizer(cache_size=0).clean_localization, kokr_texts, repeat),
+        "process_ability_ids": measure(
+            lambda row: data_modifier.process_ability_ids(tables, row[0], row[1]), sample(ability_rows), repeat
+        ),
+    }
+    return results
+
+
+def request_latencies(client, requests, method="get"):
+    """(args, kwargs) 요청 목록을 차례로 보내 요청당 지연 분포를 잰다."""
+    latencies = []
+    for args in requests:
+        started = time.perf_counter()
+        response = getattr(client, method)(*args[0], **args[1])
+        response.get_data()
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / total, 1),
+        "p50_us": round(percentile(latencies, 0.50) * 1e6, 1),
+        "p99_us": round(percentile(latencies, 0.99) * 1e6, 1),
+    }
+
+
+def run_api(requests_per_case, batch_size, rng):
+    """
+    Flask 앱을 테스트 클라이언트로 직접 호출해 /translate 요청 하나의 처리 시간을 잰다 (네트워크 제외).
+    실제 서버 부하는 --url로 bench/http_load.py를 함께 돌린다.
+    """
+    os.environ.setdefault("MTGAPI_RELOAD_INTERVAL", "0")
+    with contextlib.redirect_stdout(io.StringIO()):
+        import MTGAPI_ko
+    client = MTGAPI_ko.api.test_client()
+    keys = [key for field, key, _ in MTGAPI_ko.translation_data.index.keys() if field == "search_value"]
+
+    def picks():
+        return [rng.choice(keys) for _ in range(requests_per_case)]
+
+    def typo(key):
+        position = rng.randrange(len(key))
+        return key[:position] + key[position + 1:]
+
+    def gets(values, extra=None, headers=None):
+        return [
+            (("/translate",), {"query_string": {"search_value": value, **(extra or {})}, "headers": headers or {}})
+            for value in values
+        ]
+
+    # 첫 요청의 캐시 채우기 비용이 섞이지 않도록 한 번 미리 돈다
+    for value in keys[:requests_per_case]:
+        client.get("/translate", query_string={"search_value": value})
+
+    results = {
+        "translate_hit": request_latencies(client, gets(picks())),
+        "translate_miss": request_latencies(client, gets([f"{key} (missing)" for key in picks()])),
+        "translate_gzip": request_latencies(client, gets(picks(), headers={"Accept-Encoding": "gzip"})),
+        "translate_fuzzy": request_latencies(client, gets([typo(key) for key in picks()[:requests_per_case // 10 or 1]], {"fuzzy": "1"})),
+        f"batch_{batch_size}": request_latencies(
+            client,
+            [(("/translate/batch",), {"json": {"search_value": [rng.choice(keys) for _ in range(batch_size)]}})
+             for _ in range(max(1, requests_per_case // batch_size))],
+            method="post",
+        ),
+    }
+    results.update(run_cards(MTGAPI_ko, client, requests_per_case, rng))
+    MTGAPI_ko.reloader.stop()
+    return results
+
+
+def run_cards(MTGAPI_ko, client, requests_per_case, rng):
+    """
+    /cards 필터 조합별 요청당 지연(cards_*)과, 응답 없이 속성 인덱스의 교집합 + 첫 페이지만 잰 연산당 시간(cards_select_*).
+    cards_scan은 같은 세 필터 교집합을 레코드 값 목록을 훑어서 구할 때의 시간 (인덱스와 비교용).
+    """
+    data = MTGAPI_ko.translation_data
+    attributes = data.attributes
+    colors, rarities, types = attributes.distinct("color"), attributes.distinct("rarity"), attributes.distinct("type")
+    mana_values = attributes.distinct("mana_value") or [0]
+    arena_ids = [arena_id for arena_id in data.index.columns(("arena_id",))["arena_id"] if arena_id is not None]
+
+    def color_rarity():
+        return {"color": rng.choice(colors), "rarity": rng.choice(rarities)}
+
+    def color_rarity_mana():
+        low = rng.choice(mana_values)
+        return {**color_rarity(), "mana_value_min": low, "mana_value_max": low + 2}
+
+    def type_mana():
+        return {"type": rng.choice(types).split()[-1], "mana_value_max": rng.choice(mana_values)}
+
+    queries = {
+        "color": lambda: {"color": rng.choice(colors)},
+        "color_rarity": color_rarity,
+        "color_rarity_mana": color_rarity_mana,
+        "type_mana": type_mana,
+        "deep_page": lambda: {**color_rarity(), "offset": rng.randrange(1000)},
+        "arena_id": lambda: {"arena_id": ",".join(str(rng.choice(arena_ids)) for _ in range(20))},
+    }
+    count = max(1, requests_per_case // 10)
+    results = {}
+    for name, make_query in queries.items():
+        results[f"cards_{name}"] = request_latencies(
+            client, [(("/cards",), {"query_string": make_query()}) for _ in range(count)]
+        )
+
+    def select(query):
+        filters, offset, limit = MTGAPI_ko.parse_cards_request({name: str(value) for name, value in query.items()})
+        MTGAPI_ko.bit_positions(attributes.select(filters), offset, limit)
+
+    for name in ("color_rarity", "color_rarity_mana", "type_mana"):
+        results[f"cards_select_{name}"] = measure(select, [queries[name]() for _ in range(count)], 3)
+
+    columns = data.index.columns(("color", "rarity", "mana_value"))
+    rows = list(zip(columns["color"], columns["rarity"], columns["mana_value"]))
+
+    def scan(query):
+        low, high = query["mana_value_min"], query["mana_value_max"]
+        return [
+            position for position, (color, rarity, mana_value) in enumerate(rows)
+            if color == query["color"] and rarity == query["rarity"] and mana_value is not None and low <= mana_value <= high
+        ]
+
+    results["cards_scan"] = measure(scan, [color_rarity_mana() for _ in range(max(1, count // 10))], 3)
+    return results
+
+
+def run_http(url, concurrency, duration):
+    import asyncio
+    import http_load
+
+    keys = http_load.load_keys("cards_data_for_api.json", 0)
+    return [asyncio.run(http_load.run_level(url, keys, level, duration, 1)) for level in concurrency]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the build pipeline and the translation API.")
+    parser.add_argument("--cards", default="10k", help="합성 데이터 카드 수 (10k, 50k, 200k 또는 숫자)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--data-dir", help="합성 데이터 디렉터리 (기본 bench/data/<카드 수>, 없으면 생성)")
+    parser.add_argument("--suite", nargs="+", choices=["build", "micro", "api"], default=["build", "micro", "api"])
+    parser.add_argument("--workers", type=int, default=1, help="빌드에 쓸 프로세스 수")
+    parser.add_argument("--stream", action="store_true", help="빌드를 --stream 모드로 잰다")
+    parser.add_argument("--repeat", type=int, default=3, help="빌드·마이크로 벤치마크 반복 횟수 (가장 좋은 값 사용)")
+    parser.add_argument("--samples", type=int, default=5000, help="마이크로 벤치마크 입력 수")
+    parser.add_argument("--requests", type=int, default=2000, help="API 케이스마다 보낼 요청 수")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--url", help="실행 중인 서버 주소. 주면 bench/http_load.py 부하도 함께 잰다")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--output", help="결과 JSON 파일")
+    args = parser.parse_args(argv)
+
+    card_count = fixture.parse_card_count(args.cards)
+    data_dir = os.path.abspath(args.data_dir or os.path.join(REPO_ROOT, "bench", "data", args.cards))
+    output = os.path.abspath(args.output) if args.output else None
+    if not os.path.exists(os.path.join(data_dir, "Raw_CardDatabase_bench.mtga")):
+        print(f"합성 데이터 생성: {data_dir}")
+        fixture.generate(data_dir, card_count, args.seed)
+
+    rng = random.Random(args.seed)
+    os.chdir(data_dir)
+    import data_modifier
+
+    results = {
+        "meta": {
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "cards": card_count,
+            "seed": args.seed,
+        },
+    }
+    # api 단계는 빌드 결과(스냅샷)를 읽으므로 빌드를 건너뛰어도 출력 파일이 없으면 한 번은 만든다
+    if "build" in args.suite or ("api" in args.suite and not os.path.exists(data_modifier.SNAPSHOT_OUTPUT_FILE)):
+        results["build"] = run_build(
+            data_modifier, args.workers, args.repeat if "build" in args.suite else 1, args.stream
+        )
+        print(f"build: {json.dumps(results['build'], ensure_ascii=False)}")
+    if "micro" in args.suite:
+        results["micro"] = run_micro(data_modifier, args.samples, args.repeat, rng)
+        print(f"micro: {json.dumps(results['micro'], ensure_ascii=False)}")
+    if "api" in args.suite:
+        results["api"] = run_api(args.requests, args.batch_size, rng)
+        print(f"api: {json.dumps(results['api'], ensure_ascii=False)}")
+    if args.url:
+        results["http"] = run_http(args.url, args.concurrency, args.duration)
+        print(f"http: {json.dumps(results['http'], ensure_ascii=False)}")
+
+    if output:
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=4)
+        print(f"결과 저장: {output}")
+    return results
+
+
+if __name__ == "__main__":
+    sys.exit(main() and 0)
@@ -0,0 +1,179 @@
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+# gunicorn 워커 수에 따른 서버 메모리 측정 (Linux 전용, /proc/<pid>/smaps_rollup 사용)
+# 워커 수마다 gunicorn을 띄워 모든 워커가 데이터를 읽을 때까지 기다리고, /translate 요청으로 데워 둔 뒤
+# 마스터와 워커의 PSS(공유 페이지를 나눠 센 값)와 USS(그 프로세스에만 있는 페이지)를 잰다.
+# - preload: 저장소의 gunicorn.conf.py (마스터에서 한 번 로드 + gc.freeze)
+# - plain: 설정 없이 워커마다 로드
+# 예: python bench/worker_memory.py --data-dir /srv/mtgapi --workers 1 2 4 8 --output bench/results/memory.json
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from card_snapshot import CardSnapshot
+
+# TranslationData를 하나 만들 때마다 서버가 마지막으로 찍는 줄
+LOADED_MARKER = "속성 인덱스 생성 완료"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def sample_keys(data_dir, limit):
+    """스냅샷이 있으면 스냅샷에서, 없으면 cached_translations.json에서 search_value를 뽑는다."""
+    snapshot_path = os.path.join(data_dir, "cards_data_for_api.bin")
+    if os.path.exists(snapshot_path):
+        snapshot = CardSnapshot(snapshot_path)
+        keys = [key for field, key, _ in snapshot.iter_keys() if field == "search_value"]
+    else:
+        with open(os.path.join(data_dir, "cached_translations.json"), "r", encoding="utf-8") as f:
+            keys = [record["search_value"] for record in json.load(f) if record.get("search_value")]
+    step = max(1, len(keys) // limit) if limit else 1
+    return keys[::step][:limit] if limit else keys
+
+
+def memory_kib(pid):
+    """smaps_rollup의 Rss, Pss, USS(Private_Clean + Private_Dirty) (KiB)."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def child_pids(pid):
+    with open(f"/proc/{pid}/task/{pid}/children", "r") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def warm_up(port, keys):
+    """키마다 /translate 한 번 (sync 워커는 요청마다 연결을 닫으므로 요청마다 새 연결)."""
+    failures = 0
+    for key in keys:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        try:
+            connection.request("GET", f"/translate?search_value={quote(key)}", headers={"Accept-Encoding": "gzip"})
+            response = connection.getresponse()
+            response.read()
+            failures += response.status != 200
+        finally:
+            connection.close()
+    return failures
+
+
+def measure(mode, workers, args, keys):
+    port = free_port()
+    if mode == "preload":
+        config = os.path.join(REPO_ROOT, "gunicorn.conf.py")
+    else:
+        # 빈 설정 파일: 현재 디렉터리의 gunicorn.conf.py를 읽지 않도록
+        config = os.path.join(tempfile.gettempdir(), "mtgapi_plain.conf.py")
+        open(config, "w").close()
+    command = [
+        sys.executable, "-m", "gunicorn", "-c", config, "-w", str(workers), "-b", f"127.0.0.1:{port}",
+        "--chdir", args.data_dir, "--pythonpath", REPO_ROOT,
+    ]
+    if args.worker_class:
+        command += ["-k", args.worker_class]
+    command.append(args.app)
+
+    env = {**os.environ, "PYTHONUNBUFFERED": "1", "MTGAPI_RELOAD_INTERVAL": "0"}
+    process = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    loaded = threading.Semaphore(0)
+
+    def read_output():
+        for line in process.stdout:
+            if LOADED_MARKER in line:
+                loaded.release()
+
+    threading.Thread(target=read_output, daemon=True).start()
+    try:
+        started = time.perf_counter()
+        deadline = time.monotonic() + args.timeout
+        for _ in range(1 if mode == "preload" else workers):
+            if not loaded.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                raise RuntimeError(f"{mode} 워커 {workers}개: 데이터 로드를 기다리다 시간 초과")
+        while len(child_pids(process.pid)) < workers:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{mode} 워커 {workers}개: 워커가 모두 뜨지 않았습니다")
+            time.sleep(0.1)
+        ready_seconds = time.perf_counter() - started
+        failures = warm_up(port, keys)
+        time.sleep(args.settle)
+
+        master = memory_kib(process.pid)
+        worker_memory = [memory_kib(pid) for pid in child_pids(process.pid)]
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def mib(kib):
+        return round(kib / 1024, 1)
+
+    return {
+        "mode": mode,
+        "workers": workers,
+        "ready_seconds": round(ready_seconds, 2),
+        "warm_up_requests": len(keys),
+        "warm_up_failures": failures,
+        "total_pss_mib": mib(master["pss"] + sum(item["pss"] for item in worker_memory)),
+        "total_rss_mib": mib(master["rss"] + sum(item["rss"] for item in worker_memory)),
+        "master_pss_mib": mib(master["pss"]),
+        "worker_uss_mib": [mib(item["uss"]) for item in worker_memory],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure gunicorn server memory by worker count.")
+    parser.add_argument("--data-dir", default=REPO_ROOT, help="cards_data_for_api.bin 또는 cached_translations.json이 있는 디렉터리")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--mode", nargs="+", choices=["preload", "plain"], default=["preload", "plain"])
+    parser.add_argument("--app", default="MTGAPI_ko:api", help="예: MTGAPI_ko_asgi:app (--worker-class uvicorn.workers.UvicornWorker)")
+    parser.add_argument("--worker-class")
+    parser.add_argument("--requests", type=int, default=2000, help="측정 전에 보낼 /translate 요청 수")
+    parser.add_argument("--settle", type=float, default=1.0, help="요청을 보낸 뒤 측정까지 기다릴 시간(초)")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="결과 JSON 파일")
+    args = parser.parse_args(argv)
+    args.data_dir = os.path.abspath(args.data_dir)
+
+    keys = sample_keys(args.data_dir, args.requests)
+    results = []
+    for mode in args.mode:
+        for workers in args.workers:
+            result = measure(mode, workers, args, keys)
+            print(json.dumps(result, ensure_ascii=False))
+            results.append(result)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+import bisect
+import json
+import struct
+import sys
+import time
+from array import array
+
+from card_search import normalize_key
+
+# /cards용 보조 인덱스: 속성 값마다 그 값을 가진 레코드 위치 집합
+# - 레코드가 많은 값(전체의 1/32 이상)은 비트맵(파이썬 int, 레코드 수 / 8바이트)
+# - 나머지 값은 정렬된 위치 목록 array('I') (위치당 4바이트) — 어느 쪽이든 더 작은 쪽으로 보관
+# 필터끼리는 비트맵 AND로 교집합을 구하고, 페이지는 결과 비트맵에서 offset번째 1 비트부터 limit개를 꺼낸다.
+# data_modifier.py가 스냅샷을 쓸 때 이 인덱스도 함께 만들어 넣으므로(to_bytes), 서버는 레코드를 파싱하지 않고 읽기만 한다(from_buffer).
+
+# 값이 정확히 같은 레코드 (정규화해서 비교, 쉼표로 여러 값 → OR)
+EQUAL_FIELDS = ("rarity", "color")
+# 값에 주어진 문자열이 들어 있는 레코드 ("생물"은 "전설적 생물"과도 맞음)
+CONTAINS_FIELDS = ("type", "sub_type")
+NUMBER_FIELD = "mana_value"
+ID_FIELD = "arena_id"
+INDEXED_FIELDS = (*EQUAL_FIELDS, *CONTAINS_FIELDS, NUMBER_FIELD, ID_FIELD)
+DENSE_FRACTION = 32
+# 스냅샷 안의 속성 인덱스 영역: 설명 JSON 길이(u32) + 설명 JSON + 비트맵·위치 목록·arena_id 배열 (모두 little-endian)
+SECTION_HEADER = struct.Struct("<I")
+
+
+def read_array(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def array_bytes(values):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def bit_positions(bitmap, offset, limit):
+    """bitmap에서 offset번째(0부터) 1 비트부터 최대 limit개의 비트 위치."""
+    shift = 0
+    if offset:
+        # 아래 m비트의 1 개수가 offset 이하인 가장 큰 m = offset번째 1 비트의 위치
+        low, high = 0, bitmap.bit_length()
+        while low < high:
+            middle = (low + high + 1) // 2
+            if (bitmap & ((1 << middle) - 1)).bit_count() <= offset:
+                low = middle
+            else:
+                high = middle - 1
+        shift = low
+    # 큰 int에서 비트를 하나씩 떼면 매번 int 전체를 복사하므로, 64비트 단어 배열로 바꿔 필요한 단어만 읽는다
+    first_word = shift // 64
+    words = array("Q")
+    words.frombytes((bitmap >> (first_word * 64)).to_bytes((bitmap.bit_length() - first_word * 64 + 63) // 64 * 8, "little"))
+    if sys.byteorder == "big":
+        words.byteswap()
+    positions = []
+    for word_number, word in enumerate(words, first_word):
+        if word_number == first_word:
+            word &= ~((1 << (shift % 64)) - 1)
+        while word:
+            lowest = word & -word
+            positions.append(word_number * 64 + lowest.bit_length() - 1)
+            if len(positions) == limit:
+                return positions
+            word ^= lowest
+    return positions
+
+
+class AttributeIndex:
+    """
+    레코드 속성(rarity, color, type, sub_type, mana_value, arena_id) 인덱스.
+    postings[필드][정규화한 값] = 비트맵(int) 또는 위치 목록(array)
+    """
+
+    def __init__(self, record_count):
+        self.record_count = record_count
+        self.all_bitmap = (1 << record_count) - 1
+        self._bitmap_bytes = (record_count + 7) // 8
+        self.postings = {}
+        self.labels = {}
+        self.mana_values = []
+        self.arena_id_keys = array("q")
+        self.arena_id_positions = array("I")
+        self.build_seconds = 0.0
+
+    @classmethod
+    def from_columns(cls, columns, record_count):
+        """columns: INDEXED_FIELDS마다 레코드 순서대로의 값 목록 (TranslationIndex.columns 참고)."""
+        started = time.perf_counter()
+        attributes = cls(record_count)
+        for field in (*EQUAL_FIELDS, *CONTAINS_FIELDS, NUMBER_FIELD):
+            groups = {}
+            labels = {}
+            for position, value in enumerate(columns[field]):
+                if value is None or value == "":
+                    continue
+                if field == NUMBER_FIELD:
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        continue
+                    key = value
+                else:
+                    key = normalize_key(str(value))
+                    labels.setdefault(key, value)
+                postings = groups.get(key)
+                if postings is None:
+                    postings = groups[key] = array("I")
+                postings.append(position)
+            attributes.postings[field] = {key: attributes._compact(postings) for key, postings in groups.items()}
+            attributes.labels[field] = labels
+        attributes.mana_values = sorted(attributes.postings[NUMBER_FIELD])
+
+        # arena_id는 카드마다 하나이므로 정렬한 arena_id 배열 + 같은 순서의 레코드 위치 배열 (이분 탐색, dict보다 작음)
+        # 같은 값이 여러 번 나오면 가장 앞의 레코드
+        arena_ids = columns[ID_FIELD]
+        valid = [position for position, arena_id in enumerate(arena_ids) if type(arena_id) is int]
+        for position in sorted(valid, key=arena_ids.__getitem__):
+            if not attributes.arena_id_keys or attributes.arena_id_keys[-1] != arena_ids[position]:
+                attributes.arena_id_keys.append(arena_ids[position])
+                attributes.arena_id_positions.append(position)
+
+        attributes.build_seconds = time.perf_counter() - started
+        return attributes
+
+    def to_bytes(self):
+        """스냅샷에 넣을 속성 인덱스 영역. 설명 JSON의 오프셋은 설명 JSON 바로 뒤부터 센다."""
+        data = bytearray()
+        fields = {}
+        for field, postings in self.postings.items():
+            entries = fields[field] = []
+            for key, value in postings.items():
+                if isinstance(value, int):
+                    kind, encoded = "bitmap", value.to_bytes(self._bitmap_bytes, "little")
+                else:
+                    kind, encoded = "positions", array_bytes(value)
+                label = key if field == NUMBER_FIELD else self.labels[field][key]
+                entries.append([key, label, kind, len(data), len(encoded)])
+                data += encoded
+        arena_id_at = len(data)
+        data += array_bytes(self.arena_id_keys)
+        data += array_bytes(self.arena_id_positions)
+        descriptor = json.dumps({
+            "record_count": self.record_count,
+            "fields": fields,
+            "arena_id": [arena_id_at, len(self.arena_id_keys)],
+        }, ensure_ascii=False).encode("utf-8")
+        return SECTION_HEADER.pack(len(descriptor)) + descriptor + bytes(data)
+
+    @classmethod
+    def from_buffer(cls, buffer, at):
+        """to_bytes로 쓴 영역(스냅샷 mmap의 at 위치)을 읽는다. 값마다 바이트를 복사할 뿐 레코드는 읽지 않는다."""
+        started = time.perf_counter()
+        (length,) = SECTION_HEADER.unpack_from(buffer, at)
+        descriptor = json.loads(buffer[at + SECTION_HEADER.size:at + SECTION_HEADER.size + length])
+        data_at = at + SECTION_HEADER.size + length
+
+        attributes = cls(descriptor["record_count"])
+        for field, entries in descriptor["fields"].items():
+            postings = attributes.postings[field] = {}
+            labels = attributes.labels[field] = {}
+            for key, label, kind, offset, size in entries:
+                encoded = buffer[data_at + offset:data_at + offset + size]
+                postings[key] = int.from_bytes(encoded, "little") if kind == "bitmap" else read_array("I", encoded)
+                if field != NUMBER_FIELD:
+                    labels[key] = label
+        attributes.mana_values = sorted(attributes.postings.get(NUMBER_FIELD, ()))
+
+        arena_id_at, count = descriptor["arena_id"]
+        keys_at = data_at + arena_id_at
+        attributes.arena_id_keys = read_array("q", buffer[keys_at:keys_at + 8 * count])
+        attributes.arena_id_positions = read_array("I", buffer[keys_at + 8 * count:keys_at + 12 * count])
+        attributes.build_seconds = time.perf_counter() - started
+        return attributes
+
+    def _compact(self, postings):
+        if len(postings) * DENSE_FRACTION >= self.record_count:
+            return self._union([postings])
+        return postings
+
+    def _union(self, postings_list):
+        """비트맵·위치 목록 여러 개의 합집합 비트맵."""
+        bitmap = 0
+        bits = None
+        for postings in postings_list:
+            if isinstance(postings, int):
+                bitmap |= postings
+                continue
+            if bits is None:
+                bits = bytearray(self._bitmap_bytes)
+            for position in postings:
+                bits[position >> 3] |= 1 << (position & 7)
+        if bits is not None:
+            bitmap |= int.from_bytes(bits, "little")
+        return bitmap
+
+    def distinct(self, field):
+        """필드에 나오는 값 목록 (레코드에 적힌 그대로)."""
+        if field == NUMBER_FIELD:
+            return list(self.mana_values)
+        return list(self.labels.get(field, {}).values())
+
+    def equal(self, field, values):
+        postings = self.postings.get(field, {})
+        return self._union([postings[key] for key in map(normalize_key, values) if key in postings])
+
+    def contains(self, field, text):
+        text = normalize_key(text)
+        return self._union([postings for key, postings in self.postings.get(field, {}).items() if text in key])
+
+    def mana_value_range(self, values=None, minimum=None, maximum=None):
+        postings = self.postings.get(NUMBER_FIELD, {})
+        selected = [
+            postings[value] for value in self.mana_values
+            if (values is None or value in values)
+            and (minimum is None or value >= minimum)
+            and (maximum is None or value <= maximum)
+        ]
+        return self._union(selected)
+
+    def find_arena_id(self, arena_id):
+        at = bisect.bisect_left(self.arena_id_keys, arena_id)
+        if at < len(self.arena_id_keys) and self.arena_id_keys[at] == arena_id:
+            return self.arena_id_positions[at]
+        return None
+
+    def arena_ids(self, arena_ids):
+        positions = (self.find_arena_id(arena_id) for arena_id in arena_ids)
+        return self._union([array("I", (position for position in positions if position is not None))])
+
+    def select(self, filters):
+        """
+        filters: {"color": [...], "rarity": [...], "type": "...", "sub_type": "...",
+                  "mana_value": [...], "mana_value_min": n, "mana_value_max": n, "arena_id": [...]} (없는 필터는 빼거나 None)
+        모든 필터를 만족하는 레코드의 비트맵. 필터가 없으면 전체.
+        """
+        bitmap = self.all_bitmap
+        for field in EQUAL_FIELDS:
+            if filters.get(field) is not None:
+                bitmap &= self.equal(field, filters[field])
+        for field in CONTAINS_FIELDS:
+            if filters.get(field) is not None:
+                bitmap &= self.contains(field, filters[field])
+        if any(filters.get(name) is not None for name in ("mana_value", "mana_value_min", "mana_value_max")):
+            bitmap &= self.mana_value_range(filters.get("mana_value"), filters.get("mana_value_min"), filters.get("mana_value_max"))
+        if filters.get(ID_FIELD) is not None:
+            bitmap &= self.arena_ids(filters[ID_FIELD])
+        return bitmap
+
+    def memory_bytes(self):
+        """비트맵·위치 목록과 arena_id 배열의 대략적인 바이트 수."""
+        total = sys.getsizeof(self.arena_id_keys) + sys.getsizeof(self.arena_id_positions)
+        for postings in self.postings.values():
+            total += sys.getsizeof(postings)
+            total += sum(sys.getsizeof(value) for value in postings.values())
+        return total
+
+
+class AttributeColumns:
+    """
+    스냅샷을 쓰는 동안 레코드의 속성 값만 모아 둔다 (SnapshotWriter용).
+    필드마다 값 번호 array('I')와 중복 없는 값 목록만 보관하고, arena_id는 array('q')로 둔다.
+    """
+
+    def __init__(self):
+        self._ids = {field: array("I") for field in INDEXED_FIELDS if field != ID_FIELD}
+        self._values = {field: [None] for field in self._ids}
+        self._lookup = {field: {} for field in self._ids}
+        self._arena_ids = array("q")
+        self._has_arena_id = bytearray()
+
+    def add(self, record):
+        for field, ids in self._ids.items():
+            value = record.get(field)
+            value_id = 0
+            if isinstance(value, (str, int, float)):
+                lookup = self._lookup[field]
+                value_id = lookup.get((type(value), value))
+                if value_id is None:
+                    value_id = lookup[(type(value), value)] = len(self._values[field])
+                    self._values[field].append(value)
+            ids.append(value_id)
+        arena_id = record.get(ID_FIELD)
+        valid = type(arena_id) is int and -(1 << 63) <= arena_id < (1 << 63)
+        self._arena_ids.append(arena_id if valid else 0)
+        self._has_arena_id.append(valid)
+
+    def __len__(self):
+        return len(self._arena_ids)
+
+    def columns(self):
+        columns = {field: [self._values[field][value_id] for value_id in ids] for field, ids in self._ids.items()}
+        columns[ID_FIELD] = [
+            arena_id if valid else None for arena_id, valid in zip(self._arena_ids, self._has_arena_id)
+        ]
+        return columns
+
+    def build(self):
+        return AttributeIndex.from_columns(self.columns(), len(self))
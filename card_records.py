@@ -0,0 +1,137 @@
+import sys
+from array import array
+
+# JSON(cached_translations.json)으로 읽은 카드 레코드를 dict 목록 대신 열(column) 단위로 보관한다.
+# - 값 테이블: 모든 값(문자열, 숫자, 목록)을 한 번만 보관 (rarity·color·type처럼 반복되는 값과
+#   text와 같은 annotationed_text, 재판 카드의 같은 문구 등은 같은 객체 하나를 공유)
+# - 열: 키마다 레코드 순서대로 값 테이블 위치를 담은 array('I') (레코드당 4바이트)
+# - 모양: 레코드마다 가진 키와 그 순서 (응답 본문이 원래 dict와 같은 바이트가 되도록)
+# dict는 응답을 만들 때(record)만 잠깐 만든다.
+
+_ABSENT = object()
+
+
+class CompactRecords:
+    """
+    레코드를 append_pairs로 하나씩 받는다. json.load(f, object_pairs_hook=records.append_pairs)로 넘기면
+    파싱하는 동안 레코드 dict를 만들지 않고 바로 열에 넣는다 (레코드 안에 객체가 중첩되어 있으면 쓸 수 없음).
+    """
+
+    def __init__(self):
+        self.shapes = []
+        self.shape_ids = array("I")
+        self.columns = {}
+        self.values = [_ABSENT]
+        self._shape_lookup = {}
+        # 문자열은 문자열 자체를 키로 (값마다 조회용 튜플을 만들면 seal() 뒤에도 그 자리가 메모리를 붙잡음)
+        self._string_lookup = {}
+        self._value_lookup = {}
+
+    @classmethod
+    def from_records(cls, records):
+        compact = cls()
+        for record in records:
+            compact.append_pairs(record.items())
+        compact.seal()
+        return compact
+
+    def append_pairs(self, pairs):
+        """레코드 하나((키, 값) 쌍 목록)를 더하고 그 위치를 돌려준다."""
+        if not isinstance(pairs, list):
+            pairs = list(pairs)
+        keys = tuple(key for key, _ in pairs)
+        if len(set(keys)) != len(keys):
+            # 같은 키가 두 번 나오면 dict처럼 첫 위치에 마지막 값
+            pairs = list(dict(pairs).items())
+            keys = tuple(key for key, _ in pairs)
+
+        position = len(self.shape_ids)
+        shape_id = self._shape_lookup.get(keys)
+        if shape_id is None:
+            shape_id = self._shape_lookup[keys] = len(self.shapes)
+            self.shapes.append(keys)
+        self.shape_ids.append(shape_id)
+
+        for key, value in pairs:
+            column = self.columns.get(key)
+            if column is None:
+                column = self.columns[key] = array("I", bytes(4 * position))
+            column.append(self._value_id(value))
+        for column in self.columns.values():
+            if len(column) == position:
+                column.append(0)
+        return position
+
+    def _value_id(self, value):
+        if type(value) is str:
+            value_id = self._string_lookup.get(value)
+            if value_id is None:
+                value_id = self._string_lookup[value] = len(self.values)
+                self.values.append(value)
+            return value_id
+        if isinstance(value, list):
+            # 목록은 튜플로 (record에서 다시 list로). 안의 문자열도 같은 값 테이블의 객체를 씀
+            value = tuple(self.values[self._value_id(item)] if isinstance(item, str) else item for item in value)
+        try:
+            lookup_key = (type(value), value)
+            value_id = self._value_lookup.get(lookup_key)
+        except TypeError:
+            # dict처럼 해시할 수 없는 값은 중복 제거 없이 그대로 보관
+            self.values.append(value)
+            return len(self.values) - 1
+        if value_id is None:
+            value_id = self._value_lookup[lookup_key] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+    def seal(self):
+        """더 추가하지 않을 때 중복 제거용 조회 테이블을 버린다."""
+        self._shape_lookup = None
+        self._string_lookup = None
+        self._value_lookup = None
+
+    def __len__(self):
+        return len(self.shape_ids)
+
+    def get(self, position, key, default=None):
+        """레코드 하나의 값 하나 (dict를 만들지 않음)."""
+        column = self.columns.get(key)
+        if column is None:
+            return default
+        value = self.values[column[position]]
+        if value is _ABSENT:
+            return default
+        return list(value) if isinstance(value, tuple) else value
+
+    def field(self, key):
+        """모든 레코드의 key 값 (없으면 None)을 레코드 순서대로."""
+        column = self.columns.get(key)
+        if column is None:
+            return [None] * len(self)
+        values = self.values
+        return [None if values[value_id] is _ABSENT else values[value_id] for value_id in column]
+
+    def __getitem__(self, position):
+        """레코드 하나를 원래 키 순서의 dict로 만든다."""
+        if position < 0:
+            position += len(self)
+        values = self.values
+        record = {}
+        for key in self.shapes[self.shape_ids[position]]:
+            value = values[self.columns[key][position]]
+            record[key] = list(value) if isinstance(value, tuple) else value
+        return record
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    def memory_bytes(self):
+        """열 배열과 값 테이블(값 객체 포함)의 대략적인 바이트 수."""
+        total = sys.getsizeof(self.shape_ids) + sys.getsizeof(self.values)
+        total += sum(sys.getsizeof(column) for column in self.columns.values())
+        for value in self.values:
+            total += sys.getsizeof(value)
+            if isinstance(value, tuple):
+                total += sum(sys.getsizeof(item) for item in value)
+        return total
@@ -0,0 +1,242 @@
+import bisect
+import heapq
+import re
+import sys
+import time
+from array import array
+from collections import Counter
+
+# /search용 보조 인덱스: 접두어(정렬된 키 + 이분 탐색), 토큰(역색인), 오타(3-gram 후보 + 편집 거리)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# 3-gram 겹침이 많은 후보 중 편집 거리를 실제로 계산할 최대 개수
+FUZZY_CANDIDATES = 20
+# 오타 후보를 셀 때 훑는 3-gram 목록 길이의 합 상한 (드문 3-gram부터, 흔한 3-gram은 건너뜀)
+GRAM_BUDGET = 6000
+# GRAM_BUDGET 안에서 센 겹침으로 먼저 고르는 후보 수 (이 안에서 3-gram 전체 겹침으로 FUZZY_CANDIDATES개를 다시 고름)
+FUZZY_POOL = 100
+# 토큰 일치 후보로 모으는 최대 term 수 (드문 토큰부터)
+TOKEN_POOL = 400
+FIELD_CODES = {"search_value": 0, "card_name": 1}
+
+
+def normalize_key(text):
+    """비교용 정규화: 소문자화 + 공백 정리 (한글 card_name에는 영향 없음)."""
+    return " ".join(text.lower().split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """
+    Levenshtein 거리. limit을 넘는 것이 확실해지면 limit + 1을 돌려준다.
+    앞뒤의 같은 부분을 잘라 낸 뒤 limit 안에 끝에 닿을 수 있는 대각선 띠의 칸만 계산하고,
+    한 줄의 모든 칸이 (그 칸까지의 거리 + 남은 길이 차)로 limit을 넘으면 바로 멈춘다.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    # 앞뒤의 같은 부분은 거리에 영향이 없으므로 잘라 낸다
+    start = 0
+    while start < len(a) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not a:
+        return len(b) if len(b) <= limit else limit + 1
+    over = limit + 1
+    size = len(b)
+    delta = size - len(a)
+    # 칸 (i, j)를 지나는 경로는 |j - i| + |j - i - delta| 이상이므로 그 값이 limit 이하인 띠만 본다
+    slack = (limit - delta) // 2
+    previous = [j if j <= limit else over for j in range(size + 1)]
+    for i, ch_a in enumerate(a, 1):
+        current = [over] * (size + 1)
+        if i <= limit:
+            current[0] = i
+        low = max(1, i - slack)
+        left = current[low - 1]
+        diagonal = previous[low - 1]
+        row_min = left + abs(low - 1 - i - delta) if low == 1 else over
+        for j in range(low, min(size, i + delta + slack) + 1):
+            up = previous[j]
+            cost = diagonal if ch_a == b[j - 1] else diagonal + 1
+            if up + 1 < cost:
+                cost = up + 1
+            if left + 1 < cost:
+                cost = left + 1
+            if cost > over:
+                cost = over
+            current[j] = left = cost
+            diagonal = up
+            bound = cost + abs(j - i - delta)
+            if bound < row_min:
+                row_min = bound
+        if row_min > limit:
+            return over
+        previous = current
+    return previous[-1]
+
+
+class SearchIndex:
+    """
+    TranslationIndex/SnapshotIndex의 키(search_value, card_name) 위에 만드는 검색 인덱스.
+    terms[i] = (정규화한 키, 원래 키, 필드, 레코드 위치)
+    토큰·3-gram 역색인은 term 번호를 오름차순 array('I')로 보관한다.
+    """
+
+    def __init__(self, index):
+        started = time.perf_counter()
+        self.terms = []
+        self._fields = bytearray()
+        self._lengths = array("I")
+        for field, key, position in index.keys():
+            normalized = normalize_key(key)
+            self.terms.append((normalized, key, field, position))
+            self._fields.append(FIELD_CODES[field])
+            self._lengths.append(len(normalized))
+
+        self._sorted = sorted(range(len(self.terms)), key=lambda term_id: self.terms[term_id][0])
+        self._sorted_keys = [self.terms[term_id][0] for term_id in self._sorted]
+        self._tokens = {}
+        self._grams = {}
+        for term_id, (normalized, _, _, _) in enumerate(self.terms):
+            for token in set(TOKEN_PATTERN.findall(normalized)):
+                postings = self._tokens.get(token)
+                if postings is None:
+                    postings = self._tokens[token] = array("I")
+                postings.append(term_id)
+            for gram in trigrams(normalized):
+                postings = self._grams.get(gram)
+                if postings is None:
+                    postings = self._grams[gram] = array("I")
+                postings.append(term_id)
+
+        self.build_seconds = time.perf_counter() - started
+
+    def memory_bytes(self):
+        """terms와 정렬 목록, 역색인이 차지하는 대략적인 바이트 수."""
+        total = sys.getsizeof(self.terms) + sys.getsizeof(self._fields) + sys.getsizeof(self._lengths)
+        total += sys.getsizeof(self._sorted) + sys.getsizeof(self._sorted_keys)
+        for normalized, key, field, position in self.terms:
+            total += sys.getsizeof((normalized, key, field, position)) + sys.getsizeof(position)
+            total += sys.getsizeof(normalized) + (sys.getsizeof(key) if key is not normalized else 0)
+        for table in (self._tokens, self._grams):
+            total += sys.getsizeof(table)
+            for key, postings in table.items():
+                total += sys.getsizeof(key) + sys.getsizeof(postings)
+        return total
+
+    def _prefix_matches(self, query, limit, field_code):
+        count = 0
+        for offset in range(bisect.bisect_left(self._sorted_keys, query), len(self._sorted_keys)):
+            if count >= limit or not self._sorted_keys[offset].startswith(query):
+                break
+            term_id = self._sorted[offset]
+            if field_code is None or self._fields[term_id] == field_code:
+                count += 1
+                yield term_id
+
+    def _token_matches(self, query_tokens, limit, field_code):
+        """
+        query 토큰을 많이 가진 term 최대 limit개 (겹친 토큰 수, term 번호).
+        드문 토큰부터 후보를 모으고(TOKEN_POOL개까지) 흔한 토큰의 목록은 훑지 않는다.
+        후보마다 겹친 토큰 수는 term의 토큰으로 직접 센다.
+        """
+        postings_list = sorted(
+            (self._tokens[token] for token in query_tokens if token in self._tokens), key=len
+        )
+        pool = set()
+        for postings in postings_list:
+            if pool and len(pool) + len(postings) > TOKEN_POOL:
+                break
+            for term_id in postings:
+                if field_code is None or self._fields[term_id] == field_code:
+                    pool.add(term_id)
+                    if len(pool) >= TOKEN_POOL:
+                        break
+        hits = [
+            (len(query_tokens.intersection(TOKEN_PATTERN.findall(self.terms[term_id][0]))), term_id)
+            for term_id in pool
+        ]
+        return heapq.nsmallest(limit, hits, key=lambda item: (-item[0], item[1]))
+
+    def _fuzzy_candidates(self, query, max_distance, field_code):
+        """
+        3-gram이 많이 겹치는 term 최대 FUZZY_CANDIDATES개.
+        드문 3-gram부터 목록 길이 합이 GRAM_BUDGET을 넘지 않을 만큼만 세어 필드와 길이가 맞는 term FUZZY_POOL개를 고르고,
+        그 안에서 query의 3-gram 전체와 겹치는 수로 다시 순위를 매긴다.
+        """
+        query_grams = trigrams(query)
+        postings_list = sorted(
+            (self._grams[gram] for gram in query_grams if gram in self._grams), key=len
+        )
+        gram_hits = Counter()
+        counted = 0
+        for postings in postings_list:
+            if counted + len(postings) > GRAM_BUDGET:
+                break
+            gram_hits.update(postings)
+            counted += len(postings)
+        shortest, longest = len(query) - max_distance, len(query) + max_distance
+        pool = []
+        for term_id, _ in gram_hits.most_common():
+            if (field_code is None or self._fields[term_id] == field_code) and shortest <= self._lengths[term_id] <= longest:
+                pool.append(term_id)
+                if len(pool) >= FUZZY_POOL:
+                    break
+        overlaps = [(len(query_grams & trigrams(self.terms[term_id][0])), term_id) for term_id in pool]
+        return [term_id for _, term_id in heapq.nsmallest(FUZZY_CANDIDATES, overlaps, key=lambda item: (-item[0], item[1]))]
+
+    def search(self, query, limit=10, field=None):
+        """
+        query와 비슷한 키를 점수 순으로 최대 limit개 돌려준다. 같은 레코드는 가장 높은 점수 하나만 남긴다.
+        점수: 정확히 일치 1.0 > 접두어 0.9~0.99 > 토큰 일치·오타 허용 (0.8 이하)
+        field가 주어지면 후보를 고를 때부터 그 필드의 키만 본다.
+        """
+        query = normalize_key(query)
+        if not query:
+            return []
+        field_code = FIELD_CODES[field] if field else None
+
+        scores = {}
+
+        def consider(term_id, score, match):
+            normalized, key, term_field, position = self.terms[term_id]
+            if position not in scores or scores[position][0] < score:
+                scores[position] = (score, match, key, term_field)
+
+        for term_id in self._prefix_matches(query, limit * 4, field_code):
+            normalized = self.terms[term_id][0]
+            if normalized == query:
+                consider(term_id, 1.0, "exact")
+            else:
+                consider(term_id, 0.9 + 0.09 * len(query) / len(normalized), "prefix")
+
+        # 접두어로 이미 limit개 레코드를 채웠으면 점수가 0.8 이하인 토큰·오타 후보는 순위에 들 수 없다
+        if len(scores) < limit:
+            query_tokens = set(TOKEN_PATTERN.findall(query))
+            if query_tokens:
+                for hits, term_id in self._token_matches(query_tokens, limit * 4, field_code):
+                    consider(term_id, 0.8 * hits / len(query_tokens), "token")
+
+            max_distance = max(1, len(query) // 3)
+            for term_id in self._fuzzy_candidates(query, max_distance, field_code):
+                normalized = self.terms[term_id][0]
+                distance = edit_distance(query, normalized, max_distance)
+                if distance <= max_distance:
+                    consider(term_id, 0.8 * (1 - distance / max(len(query), len(normalized))), "fuzzy")
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+        return [
+            {"position": position, "score": round(score, 4), "match": match, "matched": key, "field": term_field}
+            for position, (score, match, key, term_field) in ranked
+        ]
@@ -0,0 +1,202 @@
+import json
+import mmap
+import os
+import shutil
+import struct
+
+from card_attributes import AttributeColumns, AttributeIndex
+
+# 스냅샷 파일 구조 (모든 정수는 little-endian u32)
+# - 헤더: MAGIC(8바이트), 버전, 레코드 수, search_value 키 수, card_name 키 수, 속성 인덱스 오프셋(버전 2부터)
+# - 레코드 테이블: 레코드마다 (본문 오프셋, 본문 길이)
+# - search_value 키 테이블: (키 오프셋, 키 길이, 레코드 번호) — 소문자 키의 UTF-8 바이트 순 정렬
+# - card_name 키 테이블: 위와 같은 구조, card_name 그대로 정렬
+# - 문자열 테이블: 레코드 본문(/translate 응답과 같은 압축 JSON)과 키 문자열을 이어 붙인 영역
+# - 속성 인덱스: /cards용 AttributeIndex (card_attributes.AttributeIndex.to_bytes 참고)
+# 버전 1 파일(속성 인덱스 없음)도 읽는다. 그때 attributes()는 None이다.
+MAGIC = b"MTGKOSNP"
+VERSION = 2
+HEADER_V1 = struct.Struct("<8sIIII")
+HEADER = struct.Struct("<8sIIIII")
+RECORD_ENTRY = struct.Struct("<II")
+KEY_ENTRY = struct.Struct("<III")
+
+
+def encode_record(record):
+    """레코드를 /translate 응답 본문과 같은 바이트로 직렬화한다."""
+    return json.dumps(record, ensure_ascii=False).encode("utf-8")
+
+
+class SnapshotWriter:
+    """
+    레코드를 하나씩 받아 스냅샷 파일을 만든다. 본문은 만들어지는 대로 임시 파일에 쓰고,
+    메모리에는 레코드 테이블과 키, 속성 인덱스에 들어갈 값만 남긴다. close()에서 헤더·키 테이블을 앞에 붙이고
+    속성 인덱스를 뒤에 붙여 완성한 뒤 교체한다. 문자열 테이블에는 본문들이 먼저, 키 문자열이 그 뒤에 온다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._temp_path = f"{path}.tmp"
+        self._bodies_path = f"{path}.bodies.tmp"
+        self._bodies = open(self._bodies_path, "wb")
+        self._bodies_size = 0
+        self._records = []
+        self._search_keys = {}
+        self._name_keys = {}
+        self._attributes = AttributeColumns()
+
+    def add(self, record):
+        """레코드를 추가하고 그 본문 바이트(/translate 응답과 같은 압축 JSON)를 돌려준다."""
+        body = encode_record(record)
+        number = len(self._records)
+        self._records.append((self._bodies_size, len(body)))
+        self._bodies.write(body)
+        self._bodies_size += len(body)
+        self._attributes.add(record)
+
+        # 첫 번째 레코드가 이기는 규칙
+        search_value = record.get("search_value")
+        card_name = record.get("card_name")
+        if search_value:
+            self._search_keys.setdefault(search_value.lower().encode("utf-8"), number)
+        if card_name:
+            self._name_keys.setdefault(card_name.encode("utf-8"), number)
+        return body
+
+    def close(self):
+        self._bodies.close()
+        search_keys = sorted(self._search_keys.items())
+        name_keys = sorted(self._name_keys.items())
+        data_start = (
+            HEADER.size
+            + RECORD_ENTRY.size * len(self._records)
+            + KEY_ENTRY.size * (len(search_keys) + len(name_keys))
+        )
+
+        record_table = bytearray()
+        for offset, length in self._records:
+            record_table += RECORD_ENTRY.pack(data_start + offset, length)
+
+        key_strings = bytearray()
+        key_tables = []
+        for keys in (search_keys, name_keys):
+            table = bytearray()
+            for key, number in keys:
+                table += KEY_ENTRY.pack(data_start + self._bodies_size + len(key_strings), len(key), number)
+                key_strings += key
+            key_tables.append(table)
+
+        attributes = self._attributes.build().to_bytes()
+        self._attributes = None
+        attributes_at = data_start + self._bodies_size + len(key_strings)
+
+        with open(self._temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self._records), len(search_keys), len(name_keys), attributes_at))
+            f.write(record_table)
+            f.write(key_tables[0])
+            f.write(key_tables[1])
+            with open(self._bodies_path, "rb") as bodies:
+                shutil.copyfileobj(bodies, f, 1024 * 1024)
+            f.write(key_strings)
+            f.write(attributes)
+        os.remove(self._bodies_path)
+        os.replace(self._temp_path, self.path)
+
+    def abort(self):
+        self._bodies.close()
+        for path in (self._bodies_path, self._temp_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def write_snapshot(records, path):
+    """records를 스냅샷 파일로 쓴다. 임시 파일에 쓴 뒤 교체하므로 읽는 쪽이 반쯤 쓰인 파일을 보지 않는다."""
+    writer = SnapshotWriter(path)
+    try:
+        for record in records:
+            writer.add(record)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+
+class CardSnapshot:
+    """
+    스냅샷 파일을 mmap으로 열어 필요한 레코드만 읽는다.
+    파일 내용은 페이지 캐시에 올라가므로 여러 워커가 같은 메모리를 공유한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version = HEADER_V1.unpack_from(self._buffer, 0)[:2]
+        if magic != MAGIC or version not in (1, VERSION):
+            self._buffer.close()
+            raise ValueError(f"지원하지 않는 스냅샷 파일입니다: {path}")
+        self.version = version
+        if version == 1:
+            header = HEADER_V1
+            _, _, self.record_count, self.search_count, self.name_count = header.unpack_from(self._buffer, 0)
+            self._attributes_at = 0
+        else:
+            header = HEADER
+            _, _, self.record_count, self.search_count, self.name_count, self._attributes_at = header.unpack_from(
+                self._buffer, 0
+            )
+
+        self._records_at = header.size
+        self._search_at = self._records_at + RECORD_ENTRY.size * self.record_count
+        self._names_at = self._search_at + KEY_ENTRY.size * self.search_count
+
+    def __len__(self):
+        return self.record_count
+
+    def close(self):
+        self._buffer.close()
+
+    def _bisect(self, table_at, count, key):
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, key_length, number = KEY_ENTRY.unpack_from(self._buffer, table_at + KEY_ENTRY.size * middle)
+            candidate = self._buffer[key_offset:key_offset + key_length]
+            if candidate == key:
+                return number
+            if candidate < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def find_search_value(self, search_value):
+        return self._bisect(self._search_at, self.search_count, search_value.lower().encode("utf-8"))
+
+    def find_card_name(self, card_name):
+        return self._bisect(self._names_at, self.name_count, card_name.encode("utf-8"))
+
+    def iter_keys(self):
+        """("search_value" 또는 "card_name", 키 문자열, 레코드 번호)를 키 테이블 순서대로 돌려준다."""
+        for field, table_at, count in (
+            ("search_value", self._search_at, self.search_count),
+            ("card_name", self._names_at, self.name_count),
+        ):
+            for entry in range(count):
+                key_offset, key_length, number = KEY_ENTRY.unpack_from(self._buffer, table_at + KEY_ENTRY.size * entry)
+                yield field, self._buffer[key_offset:key_offset + key_length].decode("utf-8"), number
+
+    def record_body(self, number):
+        """number번째 레코드의 압축 JSON 본문 바이트."""
+        offset, length = RECORD_ENTRY.unpack_from(self._buffer, self._records_at + RECORD_ENTRY.size * number)
+        return self._buffer[offset:offset + length]
+
+    def record(self, number):
+        return json.loads(self.record_body(number))
+
+    def attributes(self):
+        """빌드할 때 넣어 둔 AttributeIndex. 버전 1 파일이면 None."""
+        if not self._attributes_at:
+            return None
+        return AttributeIndex.from_buffer(self._buffer, self._attributes_at)
@@ -1,10 +1,94 @@
+import argparse
+import cProfile
+import hashlib
+import itertools
+import multiprocessing
+import os
 import sqlite3
 import glob
 import json
+import pstats
+import random
 import re
 import sys
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from pathlib import Path
+
+from card_snapshot import SnapshotWriter, encode_record
+
+try:
+    import resource
+except ImportError:  # Windows에는 resource 모듈이 없음 (최대 RSS는 기록하지 않음)
+    resource = None
 
 ANNOTATION_DATA_DETAILED = {}
+ANNOTATION_MATCHER = None
+# 주석 고르기 결과를 (언어, 결과)별로 집계: hit(주석 찾음), duplicate(이미 쓴 core라 생략), miss(일치하는 title 없음)
+ANNOTATION_STATS = Counter()
+# --profile일 때 BuildProfile (단계별 SQL 수·행 수·최대 RSS 기록)
+BUILD_PROFILE = None
+
+OUTPUT_FILE = 'cards_data_for_api.json'
+SNAPSHOT_OUTPUT_FILE = 'cards_data_for_api.bin'
+NDJSON_OUTPUT_FILE = 'cards_data_for_api.ndjson'
+# 증분 빌드용: GrpId별 입력 해시 목록과 이전 빌드 대비 변경 내역
+MANIFEST_FILE = 'cards_manifest.json'
+DIFF_FILE = 'cards_data_diff.json'
+# build_card_record의 출력 형식이 바뀌면 올려서 증분 빌드가 전체 재빌드로 돌아가게 한다
+BUILD_FORMAT_VERSION = 2
+PROFILE_OUTPUT_FILE = 'build_profile.json'
+# --stream 병렬 빌드에서 워커에 한 번에 넘기는 행 수
+STREAM_SHARD_SIZE = 512
+# 기존 파일 이름으로 출력하는 기본 언어와, 검색 키(search_value)·주석 매칭에 쓰는 언어
+DEFAULT_LOCALE = 'koKR'
+KEY_LOCALE = 'enUS'
+
+# 텍스트 정리와 레코드에 들어가는 언어별 낱말 (탭 기호, 스프라이트 이름, 희귀도, 색)
+# 여기 없는 언어는 영어 낱말(DEFAULT_LOCALE_WORDS)을 쓴다
+LOCALE_WORDS = {
+    'koKR': {
+        'tap': "탭",
+        'cost': "비용",
+        'or': "또는",
+        'mana_left': "좌측 배경색의 유색마나",
+        'mana_right': "우측 배경색의 유색마나",
+        'mana_combined': "혼합 피렉시아 마나",
+        'phyrexian_color': "유색 피렉시아 마나",
+        'mana_color': "유색마나",
+        'rarity': ("미식레어", "레어", "언커먼", "커먼"),
+        'multicolor': "다색",
+        'colors': {"1": "백색", "2": "청색", "3": "흑색", "4": "적색", "5": "녹색"},
+        'colorless': "무색",
+    },
+}
+DEFAULT_LOCALE_WORDS = {
+    'tap': "T",
+    'cost': "cost",
+    'or': "or",
+    'mana_left': "mana of the left background color",
+    'mana_right': "mana of the right background color",
+    'mana_combined': "hybrid Phyrexian mana",
+    'phyrexian_color': "colored Phyrexian mana",
+    'mana_color': "colored mana",
+    'rarity': ("Mythic Rare", "Rare", "Uncommon", "Common"),
+    'multicolor': "Multicolor",
+    'colors': {"1": "White", "2": "Blue", "3": "Black", "4": "Red", "5": "Green"},
+    'colorless': "Colorless",
+}
+
+
+def locale_words(locale):
+    return LOCALE_WORDS.get(locale, DEFAULT_LOCALE_WORDS)
+
+
+def locale_output_path(path, locale):
+    """기본 언어는 기존 파일 이름 그대로, 다른 언어는 확장자 앞에 언어 코드를 붙인다 (cards_data_for_api.jaJP.json)."""
+    if locale == DEFAULT_LOCALE:
+        return path
+    stem, extension = os.path.splitext(path)
+    return f"{stem}.{locale}{extension}"
 
 # 디버깅용 코드
 def dump_annotation_data(filename="annotation_detailed_dump.txt"):
@@ -27,13 +111,25 @@ def clean_hash_prefix(text):
     """Remove the leading '#' from any word starting with '#'."""
     return re.sub(r'\b#(\S+)', r'\1', text)
 
-def clean_localizations_koKR(cursor, koKR, loc_id):
-    """Clean and update the koKR field in the Localizations table."""
+def connect_read_only(file):
+    """원본 .mtga 파일은 게임 데이터이므로 읽기 전용으로 연다."""
+    conn = sqlite3.connect(f"{Path(file).resolve().as_uri()}?mode=ro", uri=True)
+    if BUILD_PROFILE is not None:
+        conn.set_trace_callback(BUILD_PROFILE.count_sql)
+    return conn
+
+def clean_localizations_koKR(koKR, words=None):
+    """
+    Return the cleaned koKR text (applied in memory while loading Localizations_koKR).
+    다른 언어도 같은 방식으로 정리하며, words로 그 언어의 낱말(LOCALE_WORDS)을 넘긴다.
+    """
+    tap = (words or LOCALE_WORDS[DEFAULT_LOCALE])['tap']
+
     # 1. 중괄호 내 o제거 및 T → 탭 치환
     def replace_brace_costs(match):
         inside = match.group(1)  # 예: o1oB, oT
         if inside == "oT":
-            return "탭"
+            return tap
         return inside.replace("o", "")
 
     cleaned_koKR = re.sub(r'\{([^}]+)\}', replace_brace_costs, koKR)
@@ -42,20 +138,10 @@ def clean_localizations_koKR(cursor, koKR, loc_id):
     cleaned_koKR = replace_html_tags_with_brackets(cleaned_koKR)
 
     # 3. # 해시 prefix 제거
-    cleaned_koKR = clean_hash_prefix(cleaned_koKR)
-    cursor.execute('''
-        UPDATE Localizations_koKR
-        SET Loc = ?
-        WHERE LocId = ?
-    ''', (cleaned_koKR, loc_id))
+    return clean_hash_prefix(cleaned_koKR)
 
-def delete_wrong_value(cursor):
-    """Delete rows where Formatted = 2 from the Localizations table."""
-    cursor.execute('''
-        DELETE FROM Localizations_koKR
-        WHERE Formatted = 2 or Loc LIKE '#%'
-    ''')
-    print("Deleted wrong rows")
+# Localizations_koKR에서 버리는 행 (Formatted = 2 이거나 '#'으로 시작하는 값)
+WRONG_VALUE_CONDITION = "Formatted = 2 or Loc LIKE '#%'"
 
 def process_kokr_text(text):
     """Process koKR text to replace patterns as specified."""
@@ -74,36 +160,38 @@ def clean_ability_name_for_matching(ability_name):
     text = re.sub(r'\{[^}]*\}', '', ability_name)  # {o2} 등 제거
     return re.sub(r'\s+', '', text.lower())        # 공백 제거 + 소문자화
 
-def replace_sprite_tags(text):
+def replace_sprite_tags(text, words=None):
+    words = words or LOCALE_WORDS[DEFAULT_LOCALE]
+
     def sprite_replacer(match):
         name = match.group(1)
 
         # 배경색 유색마나
         if name in {"{manaType0}"}:
-            return "좌측 배경색의 유색마나"
+            return words['mana_left']
 
         if name in {"{manaType1}"}:
-            return "우측 배경색의 유색마나"
+            return words['mana_right']
         
         # 혼합 피렉시아 마나
         if name == "{manaCombined}":
-            return "혼합 피렉시아 마나"
+            return words['mana_combined']
 
         # 유색 피렉시아 마나: xP + WUBRG
         if re.fullmatch(r"xP{color}", name):
-            return "유색 피렉시아 마나"
+            return words['phyrexian_color']
 
         # 유색마나: x + WUBRG
         if re.fullmatch(r"x{color}", name):
-            return "유색마나"
+            return words['mana_color']
 
         # 탭: xT
         if re.fullmatch(r"x[0-9A-Z]+", name):
             value = name[1:]
             if value == "T":
-                return "탭"
+                return words['tap']
             elif re.fullmatch(r"[WUBRG]{2}", value):
-                return f"{value[0]} 또는 {value[1]}"
+                return f"{value[0]} {words['or']} {value[1]}"
             else:
                 return value
 
@@ -112,7 +200,7 @@ def replace_sprite_tags(text):
 
     return re.sub(r'<sprite="[^"]+"\s+name="([^"]+)".*?>', sprite_replacer, text)
 
-def normalize_braced_costs_for_card_text(text):
+def normalize_braced_costs_for_card_text(text, words=None):
     """
     카드 텍스트에서 마나 비용 표현을 정제:
     - {oT} → 탭
@@ -120,23 +208,26 @@ def normalize_braced_costs_for_card_text(text):
     - {3} → 3
     - 중괄호는 제거
     """
+    tap = (words or LOCALE_WORDS[DEFAULT_LOCALE])['tap']
+
     def replacer(match):
         content = match.group(1)  # 예: oU, 3, oWB 등
         if content.startswith('o'):
             value = content[1:]
             if value == 'T':
-                return '탭'
+                return tap
             return value
         return content  # 그냥 숫자 등
 
     return re.sub(r'\{([^}]+)\}', replacer, text)
 
 
-def replace_ability_cost_token(text):
+def replace_ability_cost_token(text, words=None):
     """
     어노테이션용 텍스트에서 {abilityCost} → 비용 치환
     """
-    return re.sub(r'\s*,?\s*\{abilityCost\}\s*,?\s*', ' 비용 ', text)
+    cost = (words or LOCALE_WORDS[DEFAULT_LOCALE])['cost']
+    return re.sub(r'\s*,?\s*\{abilityCost\}\s*,?\s*', f' {cost} ', text)
 
 def clean_enus_text(text):
     if not text:
@@ -147,6 +238,210 @@ def clean_enus_text(text):
     return text
 
 
+def clean_annotation_kokr(kokr, words=None):
+    """주석 사전의 koKR 텍스트 정리 (기존 단계별 방식, TextNormalizer.annotation_kokr의 기준)."""
+    kokr = replace_sprite_tags(kokr, words)
+    kokr = replace_ability_cost_token(kokr, words)
+    kokr = normalize_braced_costs_for_card_text(kokr, words)
+    return re.sub(r'\bo(\d)(?![\dA-Z])', r'\1', kokr)
+
+
+# TextNormalizer용 미리 컴파일한 패턴
+# 지역화 텍스트: 중괄호 비용 | HTML 태그 | '#'
+LOCALIZATION_TOKEN_PATTERN = re.compile(r'\{([^}]+)\}|(<[^>]*>)|#')
+# 주석 텍스트: 스프라이트 태그 | {abilityCost} | 중괄호 비용 | 단독 o+숫자
+ANNOTATION_TOKEN_PATTERN = re.compile(
+    r'<sprite="[^"]+"\s+name="([^"]+)".*?>'
+    r'|(\s*,?\s*\{abilityCost\}\s*,?\s*)'
+    r'|\{([^}]+)\}'
+    r'|\bo(\d)(?![\dA-Z])'
+)
+BRACE_PATTERN = re.compile(r'\{([^}]+)\}')
+WORD_CHAR_PATTERN = re.compile(r'\w')
+SPACE_PATTERN = re.compile(r'\s')
+SPRITE_VALUE_PATTERN = re.compile(r'x[0-9A-Z]+')
+HYBRID_MANA_PATTERN = re.compile(r'[WUBRG]{2}')
+
+NORMALIZER_CACHE_SIZE = 100_000
+
+
+def sprite_names(words):
+    """replace_sprite_tags의 고정 이름 (xP{color}, x{color}의 {color}는 정규식에서도 글자 그대로)."""
+    return {
+        "{manaType0}": words['mana_left'],
+        "{manaType1}": words['mana_right'],
+        "{manaCombined}": words['mana_combined'],
+        "xP{color}": words['phyrexian_color'],
+        "x{color}": words['mana_color'],
+        "xT": words['tap'],
+    }
+
+
+class TextNormalizer:
+    """
+    지역화 문자열 정리를 한 번 훑기로 처리한다. 패턴은 모두 미리 컴파일되어 있고,
+    결과는 문자열별로 기억해 같은 문자열(재판 카드의 이름·능력 등)은 다시 계산하지 않는다.
+    - clean_localization: clean_localizations_koKR (중괄호 비용 → HTML 태그 → '#' 접두 제거)
+    - annotation_kokr: clean_annotation_kokr (스프라이트 태그 → {abilityCost} → 중괄호 비용 → 단독 o+숫자)
+    여러 단계가 서로의 결과에 걸리는 드문 입력(중괄호 안의 태그 문자, 태그에 붙은 '#' 등)은
+    한 번 훑기로는 같은 결과를 보장할 수 없어 기존 함수로 처리한다 (fallbacks에 개수 기록).
+    결과가 기존 함수와 같은지는 data_modifier.py --check-normalizer로 확인한다.
+    words는 그 언어의 낱말(LOCALE_WORDS, 기본 koKR)이다.
+    """
+
+    def __init__(self, cache_size=NORMALIZER_CACHE_SIZE, words=None):
+        self.cache_size = cache_size
+        self.words = words or LOCALE_WORDS[DEFAULT_LOCALE]
+        self._sprite_names = sprite_names(self.words)
+        self._cost_text = f" {self.words['cost']} "
+        self.fallbacks = 0
+        self._localization_cache = {}
+        self._annotation_cache = {}
+
+    def _remember(self, cache, text, result):
+        if len(cache) < self.cache_size:
+            cache[text] = result
+        return result
+
+    def clean_localization(self, text):
+        if '{' not in text and '<' not in text and '#' not in text:
+            return text
+        cached = self._localization_cache.get(text)
+        if cached is not None:
+            return cached
+        result = self._clean_localization(text)
+        if result is None:
+            self.fallbacks += 1
+            result = clean_localizations_koKR(text, self.words)
+        return self._remember(self._localization_cache, text, result)
+
+    def _clean_localization(self, text):
+        parts = []
+        last = ''  # 지금까지 만든 결과의 마지막 글자 ('#' 앞의 \b 판정용)
+        hash_run = False  # 지운 '#' 뒤로 공백 전까지는 clean_hash_prefix의 \S+가 먹으므로 '#'를 남긴다
+        position = 0
+        for match in LOCALIZATION_TOKEN_PATTERN.finditer(text):
+            start, end = match.span()
+            if start > position:
+                plain = text[position:start]
+                parts.append(plain)
+                last = plain[-1]
+                if hash_run and SPACE_PATTERN.search(plain):
+                    hash_run = False
+            position = end
+
+            brace, tag = match.groups()
+            if brace is not None:
+                if '<' in brace or '>' in brace or '#' in brace:
+                    return None
+                piece = self.words['tap'] if brace == "oT" else brace.replace("o", "")
+            elif tag is not None:
+                if '#' in tag:
+                    return None
+                if '{' in tag:
+                    # 태그 안의 중괄호는 먼저 정리된다. 태그 밖까지 이어지는 중괄호면 포기
+                    if '{' in BRACE_PATTERN.sub('', tag):
+                        return None
+                    tag = BRACE_PATTERN.sub(self._localization_brace, tag)
+                piece = f"[{tag}]"
+            elif hash_run or not last or not WORD_CHAR_PATTERN.match(last) or end == len(text):
+                piece = '#'
+            elif text[end] in '{<':
+                return None
+            elif SPACE_PATTERN.match(text[end]):
+                piece = '#'
+            else:
+                piece = ''
+                hash_run = True
+
+            if piece:
+                parts.append(piece)
+                last = piece[-1]
+                if hash_run and SPACE_PATTERN.search(piece):
+                    hash_run = False
+        parts.append(text[position:])
+        return ''.join(parts)
+
+    def annotation_kokr(self, text):
+        cached = self._annotation_cache.get(text)
+        if cached is not None:
+            return cached
+        result = self._annotation_kokr(text)
+        if result is None:
+            self.fallbacks += 1
+            result = clean_annotation_kokr(text, self.words)
+        return self._remember(self._annotation_cache, text, result)
+
+    def _annotation_kokr(self, text):
+        parts = []
+        last = ''
+        position = 0
+        for match in ANNOTATION_TOKEN_PATTERN.finditer(text):
+            start, end = match.span()
+            if start > position:
+                parts.append(text[position:start])
+                last = text[start - 1]
+            position = end
+
+            name, cost, brace, digit = match.groups()
+            if digit is not None:
+                # \b는 앞 토큰이 바뀐 뒤의 글자로 판정하고, 뒤가 토큰이면 그 결과를 미리 알 수 없다
+                if end < len(text) and text[end] in '{<':
+                    return None
+                piece = match.group(0) if last and WORD_CHAR_PATTERN.match(last) else digit
+            elif cost is not None:
+                piece = self._cost_text
+            else:
+                if last == 'o':
+                    return None
+                if name is not None:
+                    piece = self._sprite_text(name)
+                    if piece is None:
+                        return None
+                elif '{' in brace or '<' in brace:
+                    return None
+                elif brace.startswith('o'):
+                    piece = self.words['tap'] if brace == "oT" else brace[1:]
+                else:
+                    piece = brace
+                if 'o' in piece:
+                    return None
+
+            if piece:
+                parts.append(piece)
+                last = piece[-1]
+        parts.append(text[position:])
+        return ''.join(parts)
+
+    def _localization_brace(self, match):
+        inside = match.group(1)
+        return self.words['tap'] if inside == "oT" else inside.replace("o", "")
+
+    def _sprite_text(self, name):
+        """replace_sprite_tags의 이름별 치환. 이름을 그대로 남기는 경우는 None (뒤 단계에 걸릴 수 있음)."""
+        text = self._sprite_names.get(name)
+        if text is not None:
+            return text
+        if SPRITE_VALUE_PATTERN.fullmatch(name):
+            value = name[1:]
+            if HYBRID_MANA_PATTERN.fullmatch(value):
+                return f"{value[0]} {self.words['or']} {value[1]}"
+            return value
+        return None
+
+
+TEXT_NORMALIZER = TextNormalizer()
+# 기본 언어 외의 언어별 TextNormalizer (text_normalizer()가 처음 쓸 때 만듦)
+LOCALE_NORMALIZERS = {DEFAULT_LOCALE: TEXT_NORMALIZER}
+
+
+def text_normalizer(locale):
+    normalizer = LOCALE_NORMALIZERS.get(locale)
+    if normalizer is None:
+        normalizer = LOCALE_NORMALIZERS[locale] = TextNormalizer(words=locale_words(locale))
+    return normalizer
+
+
 def extract_core_key_and_type(key: str):
     """
     주어진 key 문자열에서 core 키워드와 type(body/title)을 추출한다.
@@ -179,11 +474,15 @@ def extract_core_key_and_type(key: str):
 
 
 # 새로 만든 로직
-def build_annotation_dictionary_from_file():
+def build_annotation_dictionary_from_file(locales=(DEFAULT_LOCALE,)):
     """
     SQLite 파일에서 AbilityHanger/Keyword 관련 localization 데이터를 추출해 주석 사전 구조로 구성합니다
+    variant에는 enUS·koKR와 함께 locales 중 loc 테이블에 열이 있는 다른 언어의 텍스트도 담는다.
     """
-    global ANNOTATION_DATA_DETAILED
+    global ANNOTATION_DATA_DETAILED, ANNOTATION_MATCHER
+
+    # 지역화 파일이 없거나 읽다 실패해도 주석 없이 빌드가 계속되도록 빈 매처부터 둔다
+    ANNOTATION_MATCHER = AnnotationMatcher(ANNOTATION_DATA_DETAILED)
 
     localization_files = glob.glob('Raw_ClientLocalization_*.mtga')
     if not localization_files:
@@ -192,28 +491,34 @@ def build_annotation_dictionary_from_file():
     
     file_path = localization_files[0]  # Use the first localization file found
 
+    conn = None
     try:
-        conn = sqlite3.connect(file_path)
+        conn = connect_read_only(file_path)
         cursor = conn.cursor()
 
-        cursor.execute('''
-            SELECT Key, enUS, koKR 
+        cursor.execute("PRAGMA table_info(loc)")
+        loc_columns = {column[1] for column in cursor.fetchall()}
+        extra_locales = [
+            locale for locale in locales
+            if locale not in (DEFAULT_LOCALE, KEY_LOCALE) and locale in loc_columns
+        ]
+        extra_columns = ''.join(f', {locale}' for locale in extra_locales)
+
+        cursor.execute(f'''
+            SELECT Key, enUS, koKR{extra_columns}
             FROM loc
             WHERE Key LIKE 'AbilityHanger/%'
         ''')
         rows = cursor.fetchall()
 
-        for key, enus, kokr in rows:
+        for key, enus, kokr, *extra_texts in rows:
             # flavor나 reminder 키는 아예 무시
             if not key.startswith("AbilityHanger/Keyword/") and not key.startswith("AbilityHanger/AbilityWord/"):
                 continue  #
 
             core, key_type = extract_core_key_and_type(key)
             last_segment = key.split('/')[-1]
-            kokr = replace_sprite_tags(kokr)
-            kokr = replace_ability_cost_token(kokr)
-            kokr = normalize_braced_costs_for_card_text(kokr)
-            kokr = re.sub(r'\bo(\d)(?![\dA-Z])', r'\1', kokr)
+            kokr = TEXT_NORMALIZER.annotation_kokr(kokr)
             enus_cleaned = clean_enus_text(enus)
             entry = {
                 "key": key,
@@ -221,6 +526,11 @@ def build_annotation_dictionary_from_file():
                 "enUS": enus_cleaned if enus else "",
                 "koKR": kokr.strip() if kokr else ""
             }
+            extra = {
+                locale: text_normalizer(locale).annotation_kokr(text).strip() if text else ""
+                for locale, text in zip(extra_locales, extra_texts)
+            }
+            entry.update(extra)
             if core not in ANNOTATION_DATA_DETAILED:
                 ANNOTATION_DATA_DETAILED[core] = {"variants": []}
             ANNOTATION_DATA_DETAILED[core]["variants"].append(entry)
@@ -230,7 +540,8 @@ def build_annotation_dictionary_from_file():
                     "key": key,
                     "type": "title", 
                     "enUS": last_segment,  # crew1, amassorcs2 등
-                    "koKR": kokr.strip() if kokr else ""
+                    "koKR": kokr.strip() if kokr else "",
+                    **extra,
                 }
                 ANNOTATION_DATA_DETAILED[core]["variants"].append(title_entry)
 
@@ -248,19 +559,144 @@ def build_annotation_dictionary_from_file():
                     "key": body_candidate["key"],
                     "type": "title",
                     "enUS": inferred_title,
-                    "koKR": ""  # 자동 생성 title은 koKR 없음
+                    "koKR": "",  # 자동 생성 title은 koKR 없음
+                    **{locale: "" for locale in extra_locales},
                 }
                 data["variants"].append(title_entry)
 
+        # title 정규화와 자동자 구성은 여기서 한 번만
+        ANNOTATION_MATCHER = AnnotationMatcher(ANNOTATION_DATA_DETAILED)
 
     except sqlite3.Error as e:
         print(f"Error reading localization data: {e}")
+        # 선형 탐색(get_ability_annotation_linear)과 같게, 그때까지 읽은 항목으로 매처를 만든다
+        ANNOTATION_MATCHER = AnnotationMatcher(ANNOTATION_DATA_DETAILED)
     finally:
         if conn:
             conn.close()
-    
 
-def get_ability_annotation(ability_name, used_cores: set):
+
+def annotation_locales(annotation_data):
+    """주석 사전 variant에 텍스트가 들어있는 언어 (enUS는 매칭용이라 제외)."""
+    locales = {DEFAULT_LOCALE}
+    for data in annotation_data.values():
+        for variant in data["variants"]:
+            locales.update(name for name in variant if name not in ("key", "type", "enUS"))
+    return sorted(locales)
+
+
+def normalize_annotation_title(title):
+    """title 비교용 정규화: 소문자화 + 공백 제거 (clean_ability_name_for_matching과 같은 방식)."""
+    return re.sub(r'\s+', '', title.strip().lower())
+
+
+class AnnotationMatcher:
+    """
+    ANNOTATION_DATA_DETAILED의 모든 title을 하나의 Aho–Corasick 자동자로 묶은 매처.
+    능력 텍스트를 한 번만 훑어서 포함된 title을 모두 찾고,
+    기존 선형 탐색과 같은 우선순위(core 순서 → variant 순서)로 결과를 돌려준다.
+    """
+
+    def __init__(self, annotation_data):
+        # entries[i] = (core, {언어: 붙일 주석 또는 None}), i가 작을수록 우선순위가 높음
+        self.entries = []
+        locales = annotation_locales(annotation_data)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for core, data in annotation_data.items():
+            variants = data["variants"]
+            for idx, variant in enumerate(variants):
+                if variant["type"] != "title":
+                    continue
+                title = normalize_annotation_title(variant["enUS"])
+                if not title:
+                    continue
+                self._add_pattern(title, len(self.entries))
+                self.entries.append((core, {
+                    locale: self._annotation_for_title(variants, idx, locale) for locale in locales
+                }))
+
+        self._build_failure_links()
+
+    @staticmethod
+    def _annotation_for_title(variants, idx, locale):
+        # 바로 앞 variant가 body면 그 언어 텍스트, 아니면 core 안의 첫 번째 텍스트 있는 body
+        if idx > 0 and variants[idx - 1]["type"] == "body" and variants[idx - 1].get(locale):
+            return variants[idx - 1][locale]
+        for variant in variants:
+            if variant["type"] == "body" and variant.get(locale):
+                return variant[locale]
+        return None
+
+    def _add_pattern(self, pattern, entry_id):
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(entry_id)
+
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def matches(self, text):
+        """text 안에 들어있는 title들의 (core, {언어: 주석})을 우선순위 순으로 돌려준다."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+        return [self.entries[entry_id] for entry_id in sorted(found)]
+
+
+def get_ability_annotation(ability_name, used_cores: set, locale=DEFAULT_LOCALE):
+    return pick_ability_annotation(ability_annotation_matches(ability_name), used_cores, locale)
+
+
+def ability_annotation_matches(ability_name):
+    """능력 이름(enUS)에 들어있는 title 후보. 언어와 상관없으므로 카드마다 한 번만 구한다."""
+    return ANNOTATION_MATCHER.matches(clean_ability_name_for_matching(ability_name))
+
+
+def pick_ability_annotation(matches, used_cores: set, locale=DEFAULT_LOCALE):
+    # title 매칭 - 자동자로 한 번에 찾고, 우선순위가 가장 높은 것부터 기존 규칙 적용
+    for core, annotations in matches:
+        annotation = annotations.get(locale)
+        if core in used_cores:
+            ANNOTATION_STATS[locale, 'duplicate'] += 1
+            return None
+        if annotation:
+            used_cores.add(core)
+            ANNOTATION_STATS[locale, 'hit'] += 1
+            return annotation
+
+    ANNOTATION_STATS[locale, 'miss'] += 1
+    return None
+
+
+# 디버그용 - 자동자 도입 전 선형 탐색 버전 (check_annotation_matcher에서 비교 기준으로 사용)
+def get_ability_annotation_linear(ability_name, used_cores: set):
     cleaned_name = clean_ability_name_for_matching(ability_name)
 
     # Step 1: title 매칭 - 공백 제거 방식 통일
@@ -365,249 +801,985 @@ def debug_get_ability_annotation(ability_name, used_cores: set):
 
 
 
+def check_annotation_matcher(file):
+    """
+    카드 DB의 모든 카드에 대해 get_ability_annotation(자동자)과
+    get_ability_annotation_linear(기존 방식)를 같은 순서로 돌려 결과를 비교한다. 불일치 수를 돌려준다.
+    """
+    build_annotation_dictionary_from_file()
+    conn = connect_read_only(file)
+    try:
+        cursor = conn.cursor()
+        tables = preload_card_tables(cursor)
+        cursor.execute('SELECT GrpId, abilityIds FROM Cards WHERE GrpId > 10')
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    checked = 0
+    mismatches = 0
+    for arena_id, ability_ids in rows:
+        if not ability_ids:
+            continue
+        used_fast, used_linear = set(), set()
+        for ability_id in ability_ids.split(','):
+            enUS_value = get_localization_value(tables, ability_id.split(':')[-1], 'enUS')
+            if not enUS_value:
+                continue
+            fast = get_ability_annotation(enUS_value, used_fast)
+            linear = get_ability_annotation_linear(enUS_value, used_linear)
+            checked += 1
+            if fast != linear or used_fast != used_linear:
+                mismatches += 1
+                print(f"Annotation mismatch (GrpId {arena_id}): {enUS_value!r}: {fast!r} != {linear!r}")
+
+    print(f"Annotation check: {checked} abilities, {mismatches} mismatches")
+    return mismatches
+
+
+# --check-normalizer에서 DB 문자열과 함께 돌리는 무작위 조합용 조각 (단계끼리 걸리는 경계 사례 위주)
+NORMALIZER_FUZZ_FRAGMENTS = [
+    "{oT}", "{o2}", "{oWB}", "{3}", "{o}", "{abilityCost}", ", {abilityCost}, ", "{", "}", "{{oT}", "{a<b}",
+    "<b>", "</i>", "<", ">", "<a {oT}>", "<a #b>", '<sprite="SpriteSheet_MiscIcons" name="xT">',
+    '<sprite="s" name="xWU">', '<sprite="s" name="x3">', '<sprite="s" name="xP{color}">',
+    '<sprite="s" name="{manaType0}">', '<sprite="s" name="xo">', "#", "#토큰", "a#b", "o5", "o2A", "O1",
+    "a", "탭", "생물", "_", " ", "  ", "\n", ",", "!", "o", "5",
+]
+
+
+def normalizer_fuzz_inputs(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(NORMALIZER_FUZZ_FRAGMENTS) for _ in range(rng.randint(1, 8)))
+        for _ in range(count)
+    ]
+
+
+def check_text_normalizer(file, fuzz_count=50000):
+    """
+    카드 DB의 모든 koKR 지역화 문자열, 클라이언트 지역화의 AbilityHanger koKR 문자열, 무작위 조합 문자열에 대해
+    TextNormalizer 결과가 기존 함수(clean_localizations_koKR, clean_annotation_kokr)와 같은지 비교한다.
+    불일치 수를 돌려준다.
+    """
+    conn = connect_read_only(file)
+    try:
+        texts = [loc for (loc,) in conn.execute('SELECT Loc FROM Localizations_koKR WHERE Loc IS NOT NULL')]
+    finally:
+        conn.close()
+    localization_files = glob.glob('Raw_ClientLocalization_*.mtga')
+    if localization_files:
+        conn = connect_read_only(localization_files[0])
+        try:
+            texts += [kokr for (kokr,) in conn.execute(
+                "SELECT koKR FROM loc WHERE Key LIKE 'AbilityHanger/%' AND koKR IS NOT NULL"
+            )]
+        finally:
+            conn.close()
+    texts += normalizer_fuzz_inputs(fuzz_count)
+
+    mismatches = 0
+    # 기본 언어 낱말과, LOCALE_WORDS에 없는 언어가 쓰는 영어 낱말 둘 다 확인
+    for words_name, words in ((DEFAULT_LOCALE, LOCALE_WORDS[DEFAULT_LOCALE]), ('default', DEFAULT_LOCALE_WORDS)):
+        normalizer = TextNormalizer(words=words)
+        for text in texts:
+            for name, fast, reference in (
+                ('clean_localization', normalizer.clean_localization, clean_localizations_koKR),
+                ('annotation_kokr', normalizer.annotation_kokr, clean_annotation_kokr),
+            ):
+                expected = reference(text, words)
+                actual = fast(text)
+                if actual != expected:
+                    mismatches += 1
+                    if mismatches <= 20:
+                        print(f"Normalizer mismatch ({name}, {words_name}): {text!r}: {actual!r} != {expected!r}")
+        print(f"Normalizer check ({words_name} words): {len(texts)} strings ({fuzz_count} random), "
+              f"{normalizer.fallbacks} fallbacks")
+
+    print(f"Normalizer check: {mismatches} mismatches")
+    return mismatches
+
+
 # 카드 데이터 베이스 처리 존
 
-def get_localization_value(cursor, loc_id, lang_col):
+def peak_rss_mb():
+    """이 프로세스와 (끝난) 자식 프로세스의 최대 RSS(MB). resource가 없으면 (None, None)."""
+    if resource is None:
+        return None, None
+    # ru_maxrss 단위: Linux는 KB, macOS는 바이트
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return (
+        round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    )
+
+
+def annotation_summary():
+    """언어별 주석 hit/duplicate/miss. 능력마다 언어별로 한 번씩 고르므로 언어를 섞어 더하지 않는다."""
+    summary = {}
+    for locale in sorted({locale for locale, _ in ANNOTATION_STATS}):
+        counts = {outcome: ANNOTATION_STATS[locale, outcome] for outcome in ('hit', 'duplicate', 'miss')}
+        calls = sum(counts.values())
+        summary[locale] = {
+            'calls': calls,
+            **counts,
+            'hit_rate': round(counts['hit'] / calls, 4) if calls else None,
+        }
+    return summary
+
+
+class BuildProfile:
     """
-    Retrieve the localization value from the Localizations table.
-    First prioritize the row where Formatted = 0.
-    If no row exists with Formatted = 0, then prioritize Formatted = 1.
+    --profile 실행의 측정값. 단계마다 실행 시간, SQL 문 수(connect_read_only의 trace callback),
+    단계에서 다룬 행 수, 단계가 끝난 시점의 최대 RSS를 남기고 JSON 보고서로 쓴다.
     """
 
-    if lang_col == "koKR":
+    def __init__(self):
+        self.sql_queries = 0
+        self.builds = []
+        self._stages = []
+
+    def count_sql(self, statement):
+        self.sql_queries += 1
+
+    def add_stage(self, name, seconds, sql_queries, rows):
+        rss, children_rss = peak_rss_mb()
+        self._stages.append({
+            'name': name,
+            'seconds': round(seconds, 4),
+            'sql_queries': sql_queries,
+            'rows': rows,
+            'peak_rss_mb': rss,
+            'peak_children_rss_mb': children_rss,
+        })
+
+    def finish_build(self, file):
+        self.builds.append({
+            'file': file,
+            'total_seconds': round(sum(stage['seconds'] for stage in self._stages), 4),
+            'sql_queries': sum(stage['sql_queries'] for stage in self._stages),
+            'stages': self._stages,
+            'annotation': annotation_summary(),
+        })
+        self._stages = []
+
+    def write_report(self, path, **extra):
+        rss, children_rss = peak_rss_mb()
+        report = {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            **extra,
+            'peak_rss_mb': rss,
+            'peak_children_rss_mb': children_rss,
+            'builds': self.builds,
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+
+
+@contextmanager
+def timed_phase(phase_times, name):
+    """
+    with 블록의 실행 시간을 phase_times[name]에 기록한다.
+    블록 안에서 받은 사전에 처리한 행 수 등을 넣으면 --profile 보고서에 함께 남는다.
+    """
+    rows = {}
+    sql_started = BUILD_PROFILE.sql_queries if BUILD_PROFILE is not None else 0
+    started = time.perf_counter()
+    try:
+        yield rows
+    finally:
+        phase_times[name] = time.perf_counter() - started
+        if BUILD_PROFILE is not None:
+            BUILD_PROFILE.add_stage(name, phase_times[name], BUILD_PROFILE.sql_queries - sql_started, rows)
+
+
+def print_phase_times(phase_times):
+    total = sum(phase_times.values())
+    print("Timing breakdown:")
+    for name, seconds in phase_times.items():
+        print(f"  {name:<24} {seconds:8.3f}s")
+    print(f"  {'total':<24} {total:8.3f}s")
+
+
+def load_localization_table(cursor, lang_col, skip_wrong_values=False, clean=None):
+    """
+    Localizations_<lang_col> 전체를 한 번에 읽어 {LocId: Loc} 사전으로 만든다.
+    기본은 LocId마다 Formatted가 가장 낮은 행만 남긴다 (Formatted = 0 우선, 없으면 1).
+    skip_wrong_values면 WRONG_VALUE_CONDITION에 걸리는 행을 제외하고, clean이 주어지면 남긴 값에 그 정리 함수를 적용한다.
+    이때는 기존 빌드(잘못된 행을 DELETE한 뒤 행마다 UPDATE ... WHERE LocId = ?로 정리한 값을 덮어씀)와 같게
+    테이블을 훑는 순서로 LocId의 마지막 행 값을 남긴다. 원본 DB는 수정하지 않는다.
+    """
+    if not skip_wrong_values:
         cursor.execute(f'''
-            SELECT Loc
-            FROM Localizations_koKR
-            WHERE LocId = ?
+            SELECT LocId, Loc
+            FROM Localizations_{lang_col}
             ORDER BY Formatted ASC
-            LIMIT 1
-        ''', (loc_id,))
-        
-        result = cursor.fetchone()
+        ''')
+        table = {}
+        for loc_id, loc in cursor:
+            table.setdefault(loc_id, loc)
     else:
         cursor.execute(f'''
-            SELECT Loc
-            FROM Localizations_enUS
-            WHERE LocId = ?
-            ORDER BY Formatted ASC
-            LIMIT 1
-        ''', (loc_id,))
-        
-        result = cursor.fetchone()
-    
-    return result[0] if result else None
+            SELECT LocId, Loc
+            FROM Localizations_{lang_col}
+            WHERE ({WRONG_VALUE_CONDITION}) IS NOT 1
+        ''')
+        table = dict(cursor.fetchall())
+    if clean:
+        for loc_id, loc in table.items():
+            if loc is not None:
+                table[loc_id] = clean(loc)
+    return table
 
 
-def process_ability_ids(cursor, ability_ids, subtypes):
+def load_loyalty_costs(cursor):
+    """Abilities 테이블에서 TextId → LoyaltyCost 사전을 만든다."""
+    cursor.execute('''
+        SELECT TextId, LoyaltyCost
+        FROM Abilities
+    ''')
+    loyalty_costs = {}
+    for text_id, loyalty_cost in cursor:
+        loyalty_costs.setdefault(text_id, loyalty_cost)
+    return loyalty_costs
 
-    text_parts = []
-    annotationed_parts = []
+
+def load_card_title_ids(cursor):
+    """Cards 테이블 전체의 GrpId → TitleId (연결된 면의 이름을 찾을 때 사용)."""
+    cursor.execute('''
+        SELECT GrpId, TitleId
+        FROM Cards
+    ''')
+    return dict(cursor.fetchall())
+
+
+def preload_card_tables(cursor, locales=(DEFAULT_LOCALE,)):
+    """
+    카드 레코드를 만들 때 필요한 조회 테이블을 미리 메모리에 올린다.
+    locales의 지역화 테이블은 잘못된 행을 빼고 그 언어의 TextNormalizer로 정리해 둔다.
+    """
+    tables = {KEY_LOCALE: load_localization_table(cursor, KEY_LOCALE)}
+    for locale in locales:
+        tables[locale] = load_localization_table(
+            cursor, locale, skip_wrong_values=True, clean=text_normalizer(locale).clean_localization
+        )
+    tables['loyalty_costs'] = load_loyalty_costs(cursor)
+    tables['card_title_ids'] = load_card_title_ids(cursor)
+    return tables
+
+
+def discover_locales(cursor):
+    """카드 DB에 Localizations_<언어> 테이블이 있는 언어 (검색 키 언어 enUS 제외, 기본 언어가 맨 앞)."""
+    cursor.execute(r"""
+        SELECT name
+        FROM sqlite_master
+        WHERE type = 'table' AND name LIKE 'Localizations\_%' ESCAPE '\'
+    """)
+    locales = {name[len('Localizations_'):] for (name,) in cursor}
+    locales.discard(KEY_LOCALE)
+    return sorted(locales, key=lambda locale: (locale != DEFAULT_LOCALE, locale))
+
+
+def get_linked_face_names(tables, linked_face_ids):
+    """
+    LinkedFaceGrpIds(쉼표 구분 GrpId 목록)를 연결된 면들의 search_value(enUS 이름) 목록으로 바꾼다.
+    양면·분할·모험 카드의 다른 면을 서버가 한 번에 찾아 줄 수 있도록 레코드에 넣는다.
+    """
+    if not linked_face_ids:
+        return []
+    names = []
+    for grp_id in str(linked_face_ids).split(','):
+        title_id = tables['card_title_ids'].get(to_loc_id(grp_id.strip()))
+        name = get_localization_value(tables, title_id, KEY_LOCALE) if title_id else None
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def to_loc_id(loc_id):
+    """abilityIds에서 잘라낸 문자열 id도 테이블 키(정수)와 맞춘다."""
+    try:
+        return int(loc_id)
+    except (TypeError, ValueError):
+        return loc_id
+
+
+def get_localization_value(tables, loc_id, lang_col):
+    """
+    Retrieve the localization value from the preloaded Localizations table.
+    The row with the lowest Formatted value was kept when the table was loaded.
+    """
+    return tables[lang_col].get(to_loc_id(loc_id))
+
+
+def resolve_abilities(tables, ability_ids, subtypes):
+    """
+    능력 목록에서 언어와 상관없는 부분을 한 번만 구한다.
+    능력마다 (LocId, 텍스트 앞에 붙일 서사시 번호·충성도 비용, 주석을 붙일지, enUS 이름의 주석 후보).
+    """
+    abilities = []
     ability_id_list = ability_ids.split(',')
-    used_cores = set()
     is_saga = subtypes and '347' in subtypes.split(',')
 
     # Check if 260 is in the list 미리읽기일 경우 
     is_prelude_first = ability_id_list and ability_id_list[0].split(':')[-1] == '614628'
-    
-    # Create a list of ability parts
-    for idx, ability_id in enumerate(ability_id_list):
 
-        parts = ability_id.split(':')
-        loyalty_cost = None
-        loc_id = parts[-1]  # The part after the last ':'
-        
-        cursor.execute('''
-            SELECT LoyaltyCost
-            FROM Abilities 
-            WHERE textId = ?
-        ''', (loc_id,))
-        result = cursor.fetchone()
-        loyalty_cost = result[0] if result else None
-        
-        enUS_value = get_localization_value(cursor, loc_id, 'enUS')
-        koKR_value = get_localization_value(cursor, loc_id, 'koKR')
-        annotation = get_ability_annotation(enUS_value, used_cores) if enUS_value else None
-        
-        if koKR_value:
-            if is_saga:  # 서사시
-                if loc_id == '614628':
-                    text_parts.append(koKR_value)
-                    annotationed_parts.append(koKR_value)
-                else:
-                    base_index = ability_id_list.index(ability_id)
-                    if is_prelude_first:
-                        base_index -= 1
-                    index = base_index + 1
-                    numbered_text = f"{index} — {koKR_value}"
-
-                    annotated_text = numbered_text
-                    if annotation and annotation != "X":
-                        annotated_text += f" [sup][{annotation}][/sup]"
-
-                    text_parts.append(numbered_text)
-                    annotationed_parts.append(annotated_text)
-            elif loyalty_cost is not None:
-                formatted_text = f"{loyalty_cost} : {koKR_value}"
-                annotated_text = formatted_text
-                if annotation and annotation != "X":
-                    annotated_text += f" [sup][{annotation}][/sup]"
-                text_parts.append(formatted_text)
-                annotationed_parts.append(annotated_text)
-            else:  # 그 이외 능력일시
-                plain_text = koKR_value
-                annotationed_text = koKR_value
-                if annotation and annotation != "X":
-                    annotationed_text += f" [sup][{annotation}][/sup]"
-                annotationed_parts.append(annotationed_text)
-
-                text_parts.append(plain_text)
-                
-                
+    for ability_id in ability_id_list:
+        loc_id = ability_id.split(':')[-1]  # The part after the last ':'
+        loyalty_cost = tables['loyalty_costs'].get(to_loc_id(loc_id))
+        enUS_value = get_localization_value(tables, loc_id, KEY_LOCALE)
+        matches = ability_annotation_matches(enUS_value) if enUS_value else None
+
+        prefix = ''
+        annotate = True
+        if is_saga:  # 서사시
+            if loc_id == '614628':
+                annotate = False
+            else:
+                base_index = ability_id_list.index(ability_id)
+                if is_prelude_first:
+                    base_index -= 1
+                prefix = f"{base_index + 1} — "
+        elif loyalty_cost is not None:
+            prefix = f"{loyalty_cost} : "
+        abilities.append((loc_id, prefix, annotate, matches))
+    return abilities
+
+
+def localize_abilities(abilities, tables, locale=DEFAULT_LOCALE):
+    """resolve_abilities 결과로 locale의 (능력 텍스트, 주석 붙은 능력 텍스트)를 만든다."""
+    text_parts = []
+    annotationed_parts = []
+    used_cores = set()
+
+    for loc_id, prefix, annotate, matches in abilities:
+        value = get_localization_value(tables, loc_id, locale)
+        # 텍스트가 없는 능력도 주석 후보는 소모한다 (used_cores)
+        annotation = pick_ability_annotation(matches, used_cores, locale) if matches is not None else None
+
+        if value:
+            plain_text = prefix + value
+            annotationed_text = plain_text
+            if annotate and annotation and annotation != "X":
+                annotationed_text += f" [sup][{annotation}][/sup]"
+            text_parts.append(plain_text)
+            annotationed_parts.append(annotationed_text)
 
     plain_text = '\n'.join(text_parts)
     annotationed_text = '\n'.join(annotationed_parts)
     return plain_text, annotationed_text
 
-def fetch_data_and_create_json(file):
-    """Fetch data from the database and create a JSON file."""
-    print(f"Processing file: {file}")
-    
+
+def process_ability_ids(tables, ability_ids, subtypes, locale=DEFAULT_LOCALE):
+    return localize_abilities(resolve_abilities(tables, ability_ids, subtypes), tables, locale)
+
+
+def resolve_card(row, tables):
+    """
+    Cards 한 행에서 언어와 상관없는 부분(search_value, 능력 구성과 주석 후보, 연결된 면)을 한 번만 구한다.
+    언어별 레코드는 localize_card로 만든다.
+    """
+    title_id, ability_ids, subtypes, linked_face_ids = row[1], row[8], row[9], row[12]
+    search_value = get_localization_value(tables, title_id, KEY_LOCALE) if title_id else None
+    abilities = resolve_abilities(tables, ability_ids, subtypes) if ability_ids else None
+    linked_faces = [name for name in get_linked_face_names(tables, linked_face_ids) if name != search_value]
+    return row, search_value, abilities, linked_faces
+
+
+def localize_card(card, tables, locale=DEFAULT_LOCALE):
+    """resolve_card 결과로 locale의 카드 레코드를 만든다."""
+    row, search_value, abilities, linked_faces = card
+    (arena_id, title_id, type_id, subtype_id, mana_value, power, toughness, flavor_text_id, ability_ids, subtypes, rarity_number, colors, linked_face_ids) = row
+    words = locale_words(locale)
+
+    # Find card_name using TitleId
+    card_name = get_localization_value(tables, title_id, locale) if title_id else None
+    type_name = get_localization_value(tables, type_id, locale) if type_id else None
+    subtype_name = get_localization_value(tables, subtype_id, locale) if subtype_id else None
+    flavor_text = get_localization_value(tables, flavor_text_id, locale) if flavor_text_id and flavor_text_id != '1' else None
+    rarity = None
+    color = None
+
+    mythic, rare, uncommon, common = words['rarity']
+    if rarity_number is not None:
+        if rarity_number == 0:
+            rarity = mythic
+        elif rarity_number == 1:
+            rarity = rare
+        elif rarity_number == 2:
+            rarity = uncommon
+        elif rarity_number >= 3:
+            rarity = common
+    else:
+        rarity = common
+
+    if colors is not None:
+        color_list = colors.split(',')
+        if len(color_list) > 1:
+            color = words['multicolor']
+        elif len(color_list) == 1:
+            # 1~5 = 백·청·흑·적·녹, 그 밖의 값은 색 없음(None)
+            color = words['colors'].get(color_list[0])
+        else:
+            color = words['colorless']
+    else: 
+        color = words['colorless']
+
+    # Process ability text
+    if abilities:
+        plain_text, annotationed_text = localize_abilities(abilities, tables, locale)
+    else:
+        plain_text = annotationed_text = None
+
+    # Create record
+    record = {
+        'arena_id': arena_id,
+        'search_value': search_value,
+        'card_name': card_name,
+        'rarity': rarity,
+        'color': color
+    }
+    if mana_value is not None:
+        record['mana_value'] = mana_value
+    if type_name:
+        record['type'] = type_name
+    if subtype_name:
+        record['sub_type'] = subtype_name
+    if power:
+        record['power'] = power
+    if toughness:
+        record['toughness'] = toughness
+    if flavor_text:
+        record['flavor_text'] = flavor_text
+    if plain_text:
+        record['text'] = plain_text
+    if annotationed_text:
+        record['annotationed_text'] = annotationed_text
+    if linked_faces:
+        record['linked_faces'] = linked_faces
+
+    return record
+
+
+def build_card_record(row, tables, locale=DEFAULT_LOCALE):
+    """Cards 테이블 한 행으로 카드 레코드 하나를 만든다 (search_value 중복 제거는 호출하는 쪽에서)."""
+    return localize_card(resolve_card(row, tables), tables, locale)
+
+
+def build_localized_records(row, tables, locales):
+    """카드 구조는 한 번만 풀고 언어마다 레코드를 만든다. {언어: 레코드}"""
+    card = resolve_card(row, tables)
+    return {locale: localize_card(card, tables, locale) for locale in locales}
+
+
+def card_search_value(row, tables):
+    """build_card_record와 같은 방식으로 행의 search_value만 구한다 (중복 제거용)."""
+    title_id = row[1]
+    return get_localization_value(tables, title_id, KEY_LOCALE) if title_id else None
+
+
+# 증분 빌드 존
+
+def hash_json(value):
+    return hashlib.blake2b(json.dumps(value, ensure_ascii=False, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def card_input_hash(row, tables, locale=DEFAULT_LOCALE):
+    """
+    locale 카드 레코드에 영향을 주는 입력 전체의 해시:
+    Cards 행 값, title/type/subtype/flavor LocId의 enUS·locale 텍스트, 능력 목록과 각 능력의 텍스트·충성도 비용,
+    연결된 면들의 이름.
+    """
+    (arena_id, title_id, type_id, subtype_id, mana_value, power, toughness, flavor_text_id, ability_ids, subtypes, rarity_number, colors, linked_face_ids) = row
+
+    texts = {}
+    for loc_id in (title_id, type_id, subtype_id, flavor_text_id):
+        if loc_id:
+            texts[str(loc_id)] = [get_localization_value(tables, loc_id, KEY_LOCALE), get_localization_value(tables, loc_id, locale)]
+
+    abilities = []
+    if ability_ids:
+        for ability_id in ability_ids.split(','):
+            loc_id = ability_id.split(':')[-1]
+            abilities.append([
+                ability_id,
+                get_localization_value(tables, loc_id, KEY_LOCALE),
+                get_localization_value(tables, loc_id, locale),
+                tables['loyalty_costs'].get(to_loc_id(loc_id)),
+            ])
+
+    return hash_json([list(row), texts, abilities, get_linked_face_names(tables, linked_face_ids)])
+
+
+def annotation_data_hash(locale=DEFAULT_LOCALE):
+    """
+    주석 사전이나 빌드 형식이 바뀌면 모든 카드를 다시 만들어야 하므로 함께 해시한다.
+    variant에서는 locale의 텍스트만 보므로 다른 언어를 함께 빌드해도 이 언어의 해시는 그대로다.
+    """
+    annotation_data = {
+        core: {
+            **data,
+            "variants": [
+                {name: value for name, value in variant.items() if name in ("key", "type", KEY_LOCALE, locale)}
+                for variant in data["variants"]
+            ],
+        }
+        for core, data in ANNOTATION_DATA_DETAILED.items()
+    }
+    return hash_json([BUILD_FORMAT_VERSION, annotation_data])
+
+
+def load_json_file(path):
     try:
-        # Connect to the database
-        conn = sqlite3.connect(file)
-        cursor = conn.cursor()
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
 
-        build_annotation_dictionary_from_file()
-        # 디버깅용
-        dump_annotation_data(filename="annotation_detailed_dump.txt") 
-        # Delete all rows where Formatted = 2
-        delete_wrong_value(cursor)
-        conn.commit()  # Commit the delete changes to the database
 
-        # Clean the koKR field in the Localizations table
-        cursor.execute('SELECT LocId, Loc FROM Localizations_koKR')
-        rows = cursor.fetchall()
-        for loc_id, Loc in rows:
-            clean_localizations_koKR(cursor, Loc, loc_id)
-        
-        # Fetch data from the Cards table
-        cursor.execute('''
-            SELECT 
-                c.GrpId AS arena_id,
-                c.TitleId AS title_id,
-                c.TypeTextId AS type_id,
-                c.SubtypeTextId AS subtype_id,
-                c.Order_CMCWithXLast AS mana_value,
-                c.Power AS power,
-                c.Toughness AS toughness,
-                c.FlavorTextId AS flavor_text_id,
-                c.abilityIds AS ability_ids,
-                c.Subtypes AS subtypes,
-                c.Order_MythicToCommon AS rarity_number,
-                c.Colors AS colors
-            FROM Cards c
-            WHERE c.GrpId > 10
-        ''')
+# 병렬 빌드용 워커 상태 (워커 프로세스마다 _init_card_worker에서 채움)
+_WORKER_TABLES = None
 
-        rows = cursor.fetchall()
 
-        # Create JSON data
-        data = []
-        seen_search_values = set()
+def _init_card_worker(tables, annotation_matcher):
+    global _WORKER_TABLES, ANNOTATION_MATCHER
+    _WORKER_TABLES = tables
+    ANNOTATION_MATCHER = annotation_matcher
+
+
+def _build_card_shard(jobs):
+    """
+    샤드의 (행, 만들 언어 목록)마다 {언어: 레코드}와, 그 샤드에서 집계한 주석 hit/miss 수
+    (부모 프로세스의 ANNOTATION_STATS에 더함).
+    """
+    ANNOTATION_STATS.clear()
+    records = [build_localized_records(row, _WORKER_TABLES, locales) for row, locales in jobs]
+    return records, dict(ANNOTATION_STATS)
+
+
+def iter_chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def missing_locales(row, locales, reusable):
+    """증분 빌드에서 이전 레코드를 쓸 수 없어 새로 만들어야 하는 언어."""
+    return [locale for locale in locales if row[0] not in reusable.get(locale, ())]
+
 
+def merge_localized_records(row, locales, reusable, built):
+    return {locale: built[locale] if locale in built else reusable[locale][row[0]] for locale in locales}
+
+
+def build_card_records(rows, tables, workers=1, reusable=None, locales=(DEFAULT_LOCALE,)):
+    """
+    rows 순서 그대로 행마다 {언어: 카드 레코드}를 돌려준다. rows는 리스트든 커서 같은 이터레이터든 된다.
+    카드 구조(능력 구성, 주석 후보, 연결된 면)는 행마다 한 번만 풀고 언어별 텍스트만 따로 채운다.
+    reusable({언어: {arena_id: 레코드}})에 있는 카드는 그 언어만 다시 만들지 않고 그 레코드를 그대로 쓴다 (증분 빌드).
+    workers > 1이면 rows를 연속된 구간(샤드)으로 나눠 프로세스 풀에서 만들고, 샤드 순서대로 합친다.
+    풀에는 한 번에 workers * 2개 샤드만 넘기므로 이터레이터를 미리 다 읽지 않는다.
+    """
+    reusable = reusable or {}
+    if workers <= 1 or (isinstance(rows, list) and len(rows) < 2):
         for row in rows:
-            (arena_id, title_id, type_id, subtype_id, mana_value, power, toughness, flavor_text_id, ability_ids, subtypes, rarity_number, colors) = row
-
-            # Find card_name using TitleId
-            card_name = get_localization_value(cursor, title_id, 'koKR') if title_id else None
-            search_value = get_localization_value(cursor, title_id, 'enUS') if title_id else None
-            type_name = get_localization_value(cursor, type_id, 'koKR') if type_id else None
-            subtype_name = get_localization_value(cursor, subtype_id, 'koKR') if subtype_id else None
-            flavor_text = get_localization_value(cursor, flavor_text_id, 'koKR') if flavor_text_id and flavor_text_id != '1' else None
-            rarity = None
-            color = None
-
-            if rarity_number is not None:
-                if rarity_number == 0:
-                    rarity = "미식레어"
-                elif rarity_number == 1:
-                    rarity = "레어"
-                elif rarity_number == 2:
-                    rarity = "언커먼"
-                elif rarity_number >= 3:
-                    rarity = "커먼"
-            else:
-                rarity = "커먼"
-
-            if colors is not None:
-                color_list = colors.split(',')
-                if len(color_list) > 1:
-                    color = "다색"
-                elif len(color_list) == 1:
-                    color_number = color_list[0]
-                    if color_number == "1":
-                        color = "백색"
-                    elif color_number == "2":
-                        color = "청색"
-                    elif color_number == "3":
-                        color = "흑색"
-                    elif color_number == "4":
-                        color = "적색"
-                    elif color_number == "5":
-                        color = "녹색"
-                else:
-                    color = "무색"
-            else: 
-                color = "무색"
+            missing = missing_locales(row, locales, reusable)
+            built = build_localized_records(row, tables, missing) if missing else {}
+            yield merge_localized_records(row, locales, reusable, built)
+        return
+
+    shard_size = -(-len(rows) // (workers * 4)) if isinstance(rows, list) else STREAM_SHARD_SIZE
+    shards = iter_chunks(rows, shard_size)
+    with multiprocessing.Pool(workers, initializer=_init_card_worker, initargs=(tables, ANNOTATION_MATCHER)) as pool:
+        pending = deque()
+
+        def submit_next_shard():
+            shard = next(shards, None)
+            if shard is not None:
+                jobs = [(row, missing_locales(row, locales, reusable)) for row in shard]
+                jobs_to_build = [job for job in jobs if job[1]]
+                pending.append((jobs, pool.apply_async(_build_card_shard, (jobs_to_build,))))
+
+        for _ in range(workers * 2):
+            submit_next_shard()
+        while pending:
+            jobs, result = pending.popleft()
+            records, annotation_stats = result.get()
+            ANNOTATION_STATS.update(annotation_stats)
+            submit_next_shard()
+            built = iter(records)
+            for row, missing in jobs:
+                yield merge_localized_records(row, locales, reusable, next(built) if missing else {})
+
+
+class CardJsonWriter:
+    """
+    카드 레코드를 만들어지는 대로 파일에 쓴다. 임시 파일에 쓰고 close()에서 교체한다.
+    - array: json.dump(data, f, ensure_ascii=False, indent=4)와 같은 바이트
+    - ndjson: 한 줄에 레코드 하나 (압축 JSON)
+    """
+
+    def __init__(self, path, output_format='array'):
+        self.path = path
+        self.output_format = output_format
+        self.count = 0
+        self._temp_path = f"{path}.tmp"
+        self._file = open(self._temp_path, 'w', encoding='utf-8')
+
+    def write(self, record):
+        if self.output_format == 'ndjson':
+            self._file.write(json.dumps(record, ensure_ascii=False))
+            self._file.write('\n')
+        else:
+            # 배열 원소는 한 단계 들여쓰기 (JSON 문자열 안의 줄바꿈은 \n으로 이스케이프되므로 안전)
+            self._file.write('[\n    ' if self.count == 0 else ',\n    ')
+            self._file.write(json.dumps(record, ensure_ascii=False, indent=4).replace('\n', '\n    '))
+        self.count += 1
+
+    def close(self):
+        if self.output_format != 'ndjson':
+            self._file.write('\n]' if self.count else '[]')
+        self._file.close()
+        os.replace(self._temp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+
+def load_records_file(path):
+    """이전 출력 (JSON 배열 또는 NDJSON). 없거나 읽을 수 없으면 None."""
+    if not path.endswith('.ndjson'):
+        return load_json_file(path)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def record_hash(body):
+    """레코드 본문(스냅샷/응답과 같은 압축 JSON 바이트)의 해시. 변경 내역 비교에 사용."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class RecordDiff:
+    """
+    이전 출력의 레코드 해시(search_value → 해시)와 비교해 추가·변경·삭제 내역을 레코드가 나오는 대로 모은다.
+    이전 출력 전체를 메모리에 올리지 않아도 된다.
+    """
+
+    def __init__(self, previous_hashes):
+        self.previous_hashes = previous_hashes
+        self.added = []
+        self.changed = []
+        self.seen = set()
+
+    def add(self, record, body_hash):
+        key = record.get('search_value')
+        self.seen.add(key)
+        previous_hash = self.previous_hashes.get(key)
+        if previous_hash is None:
+            self.added.append(record)
+        elif previous_hash != body_hash:
+            self.changed.append(record)
+
+    def result(self):
+        removed = [key for key in self.previous_hashes if key not in self.seen]
+        return {'added': self.added, 'changed': self.changed, 'removed': removed}
+
+
+def previous_record_hashes(previous_manifest, previous_data):
+    """이전 빌드의 search_value → 레코드 해시. 매니페스트에 없으면(이전 형식) 이전 출력에서 계산한다."""
+    if previous_manifest and 'records' in previous_manifest:
+        return {search_value: body_hash for search_value, body_hash in previous_manifest['records']}
+    if previous_data is None:
+        return None
+    return {record.get('search_value'): record_hash(encode_record(record)) for record in previous_data}
 
-            # Process ability text
-            if ability_ids:
-                plain_text, annotationed_text = process_ability_ids(cursor, ability_ids, subtypes)
+
+class LocaleBuild:
+    """
+    한 언어의 빌드 출력(JSON 또는 NDJSON, 스냅샷, 매니페스트, 변경 내역)과 이전 빌드 상태.
+    기본 언어는 기존 파일 이름을 쓰고, 다른 언어는 locale_output_path로 파일 이름에 언어 코드를 붙인다.
+    """
+
+    def __init__(self, locale, output_format='array'):
+        self.locale = locale
+        self.output_format = output_format
+        self.output_file = locale_output_path(NDJSON_OUTPUT_FILE if output_format == 'ndjson' else OUTPUT_FILE, locale)
+        self.snapshot_file = locale_output_path(SNAPSHOT_OUTPUT_FILE, locale)
+        self.manifest_file = locale_output_path(MANIFEST_FILE, locale)
+        self.diff_file = locale_output_path(DIFF_FILE, locale)
+        self.annotation_hash = annotation_data_hash(locale)
+        self.previous_manifest = None
+        self.previous_hashes = None
+        self.previous_input_hashes = {}
+        self.previous_records = {}
+        self.input_hashes = {}
+        self.reusable = {}
+        self.record_count = 0
+        self.record_hashes = []
+        self.diff = None
+
+    def load_previous(self, incremental):
+        """
+        이전 빌드 결과 (변경 내역 계산 및 증분 빌드용)
+        변경 내역은 매니페스트의 레코드 해시로 계산하므로, 이전 출력 자체는 증분 빌드일 때만 읽는다
+        """
+        self.previous_manifest = load_json_file(self.manifest_file)
+        previous_exists = os.path.exists(self.output_file)
+        previous_data = None
+        if incremental:
+            if (not previous_exists or self.previous_manifest is None
+                    or self.previous_manifest.get('annotation_hash') != self.annotation_hash):
+                print(f"Incremental build ({self.locale}): no compatible previous build, rebuilding everything")
             else:
-                plain_text = annotationed_text = None
+                previous_data = load_records_file(self.output_file)
+        if previous_exists and previous_data is None and not (self.previous_manifest and 'records' in self.previous_manifest):
+            previous_data = load_records_file(self.output_file)
+        self.previous_hashes = previous_record_hashes(self.previous_manifest, previous_data) if previous_exists else None
+
+        if incremental and self.previous_manifest:
+            self.previous_input_hashes = self.previous_manifest.get('cards', {})
+        if incremental and previous_data is not None:
+            self.previous_records = {record['arena_id']: record for record in previous_data if 'arena_id' in record}
+
+    def check_card(self, row, tables):
+        """입력 해시를 계산하고, 증분 빌드면 이전 레코드를 그대로 쓸 수 있는지 정한다."""
+        input_hash = card_input_hash(row, tables, self.locale)
+        self.input_hashes[row[0]] = input_hash
+        record = self.previous_records.get(row[0])
+        if record is not None and self.previous_input_hashes.get(str(row[0])) == input_hash:
+            self.reusable[row[0]] = record
+
+    def open_outputs(self):
+        self._json_writer = CardJsonWriter(self.output_file, self.output_format)
+        self._snapshot_writer = SnapshotWriter(self.snapshot_file)
+        self.diff = RecordDiff(self.previous_hashes) if self.previous_hashes is not None else None
+        self.record_hashes = []
+
+    def write(self, record):
+        body_hash = record_hash(self._snapshot_writer.add(record))
+        self._json_writer.write(record)
+        self.record_hashes.append([record.get('search_value'), body_hash])
+        if self.diff is not None:
+            self.diff.add(record, body_hash)
+
+    def close_outputs(self):
+        self._json_writer.close()
+        self._snapshot_writer.close()
+        self.record_count = self._json_writer.count
+        print(f"Data has been written to {self.output_file}")
+        print(f"Snapshot has been written to {self.snapshot_file}")
+
+    def abort_outputs(self):
+        self._json_writer.abort()
+        self._snapshot_writer.abort()
+
+    def write_manifest(self):
+        data_version = hash_json([self.annotation_hash, list(self.input_hashes.items())])
+        manifest = {
+            'format': BUILD_FORMAT_VERSION,
+            'data_version': data_version,
+            'annotation_hash': self.annotation_hash,
+            'cards': {str(arena_id): input_hash for arena_id, input_hash in self.input_hashes.items()},
+            'records': self.record_hashes,
+        }
+        with open(self.manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+
+        # 서버가 적용할 수 있는 변경 내역 (이전 출력이 있을 때만)
+        if self.diff is not None:
+            diff = self.diff.result()
+            diff['from_version'] = self.previous_manifest.get('data_version') if self.previous_manifest else None
+            diff['to_version'] = data_version
+            with open(self.diff_file, 'w', encoding='utf-8') as f:
+                json.dump(diff, f, ensure_ascii=False, indent=4)
+            print(f"Diff has been written to {self.diff_file}: "
+                  f"{len(diff['added'])} added, {len(diff['changed'])} changed, {len(diff['removed'])} removed")
+        return len(manifest['cards'])
+
+
+def write_card_outputs(records, builds):
+    """
+    행마다 {언어: 레코드}를 받아 언어별 JSON(또는 NDJSON)과 스냅샷에 바로 쓰고, 레코드 해시와 변경 내역을 모은다.
+    records가 제너레이터면 전체 목록을 메모리에 만들지 않는다.
+    """
+    for build in builds:
+        build.open_outputs()
+    try:
+        for localized in records:
+            for build in builds:
+                build.write(localized[build.locale])
+    except BaseException:
+        for build in builds:
+            build.abort_outputs()
+        raise
+    for build in builds:
+        build.close_outputs()
+
+
+# 카드 레코드를 만드는 Cards 조회 (build_card_record가 이 순서의 행을 받음)
+CARD_QUERY = '''
+    SELECT 
+        c.GrpId AS arena_id,
+        c.TitleId AS title_id,
+        c.TypeTextId AS type_id,
+        c.SubtypeTextId AS subtype_id,
+        c.Order_CMCWithXLast AS mana_value,
+        c.Power AS power,
+        c.Toughness AS toughness,
+        c.FlavorTextId AS flavor_text_id,
+        c.abilityIds AS ability_ids,
+        c.Subtypes AS subtypes,
+        c.Order_MythicToCommon AS rarity_number,
+        c.Colors AS colors,
+        c.LinkedFaceGrpIds AS linked_face_ids
+    FROM Cards c
+    WHERE c.GrpId > 10
+'''
+
+
+def fetch_data_and_create_json(file, workers=1, incremental=False, stream=False, output_format='array',
+                               locales=(DEFAULT_LOCALE,)):
+    """
+    Fetch data from the database and create a JSON file.
+    단계별 소요 시간(초) 사전을 돌려준다 (DB 오류면 None).
+    incremental이면 이전 매니페스트와 입력 해시가 같은 카드는 이전 출력의 레코드를 그대로 쓰고,
+    바뀐 카드만 다시 만든다.
+    stream이면 Cards 커서를 한 행씩 읽어 레코드를 만드는 대로 파일에 쓴다 (행·레코드 목록을 메모리에 두지 않음).
+    output_format은 "array"(기존과 같은 들여쓴 JSON 배열) 또는 "ndjson".
+    locales의 언어마다 출력 파일을 따로 만들되 DB는 한 번만 훑는다 (None이면 DB에 있는 모든 언어).
+    """
+    print(f"Processing file: {file}")
+    phase_times = {}
+    conn = None
+    ANNOTATION_STATS.clear()
 
-            if search_value in seen_search_values:
-                continue
-            seen_search_values.add(search_value)
-            
-            # Create record
-            record = {
-                'arena_id': arena_id,
-                'search_value': search_value,
-                'card_name': card_name,
-                'rarity': rarity,
-                'color': color
-            }
-            if mana_value is not None:
-                record['mana_value'] = mana_value
-            if type_name:
-                record['type'] = type_name
-            if subtype_name:
-                record['sub_type'] = subtype_name
-            if power:
-                record['power'] = power
-            if toughness:
-                record['toughness'] = toughness
-            if flavor_text:
-                record['flavor_text'] = flavor_text
-            if plain_text:
-                record['text'] = plain_text
-            if annotationed_text:
-                record['annotationed_text'] = annotationed_text
-            
-            data.append(record)
+    try:
+        # Connect to the database
+        conn = connect_read_only(file)
+        cursor = conn.cursor()
+
+        available_locales = discover_locales(cursor)
+        if locales is None:
+            locales = available_locales
+        else:
+            for locale in locales:
+                if locale not in available_locales:
+                    print(f"Skipping locale {locale}: no Localizations_{locale} table")
+            locales = [locale for locale in locales if locale in available_locales]
+        if not locales:
+            print("No locales to build.")
+            return phase_times
+        print(f"Locales: {', '.join(locales)}")
+
+        with timed_phase(phase_times, 'annotation dictionary') as stage_rows:
+            build_annotation_dictionary_from_file(locales)
+            # 디버깅용
+            dump_annotation_data(filename="annotation_detailed_dump.txt")
+            stage_rows.update(
+                cores=len(ANNOTATION_DATA_DETAILED),
+                variants=sum(len(data['variants']) for data in ANNOTATION_DATA_DETAILED.values()),
+            )
+
+        with timed_phase(phase_times, 'preload tables') as stage_rows:
+            # Localizations / Abilities를 한 번에 읽어 카드마다 개별 쿼리를 날리지 않도록 함
+            # (언어별 잘못된 행 제외와 텍스트 정리도 여기서 메모리 안에서 처리)
+            tables = preload_card_tables(cursor, locales)
+            stage_rows.update({name: len(table) for name, table in tables.items()})
+
+        builds = [LocaleBuild(locale, output_format) for locale in locales]
+        with timed_phase(phase_times, 'load previous build') as stage_rows:
+            for build in builds:
+                build.load_previous(incremental)
+            stage_rows.update(
+                previous_records=sum(len(build.previous_records) for build in builds),
+                previous_hashes=sum(len(build.previous_hashes or {}) for build in builds),
+            )
+
+        seen_search_values = set()
+        reusable = {build.locale: build.reusable for build in builds}
+
+        def unique_card_rows(rows):
+            # search_value 중복 제거를 먼저 해서 실제로 출력될 행(첫 GrpId)만 레코드를 만듦
+            # 언어마다 입력 해시를 계산하고, 증분 빌드면 이전 레코드를 그대로 쓸 수 있는지도 여기서 정함
+            for row in rows:
+                search_value = card_search_value(row, tables)
+                if search_value in seen_search_values:
+                    continue
+                seen_search_values.add(search_value)
+                for build in builds:
+                    build.check_card(row, tables)
+                yield row
 
         ping_record = {
             'search_value': 'ping',
             'text': '성공'
         }
+        ping_records = {locale: ping_record for locale in locales}
 
-        data.append(ping_record)
+        # Fetch data from the Cards table
+        cursor.execute(CARD_QUERY)
+        if stream:
+            with timed_phase(phase_times, 'stream cards') as stage_rows:
+                records = build_card_records(unique_card_rows(cursor), tables, workers, reusable, locales)
+                write_card_outputs(itertools.chain(records, [ping_records]), builds)
+                stage_rows.update(
+                    cards=len(seen_search_values),
+                    reused=sum(len(build.reusable) for build in builds),
+                    records=sum(build.record_count for build in builds),
+                )
+        else:
+            with timed_phase(phase_times, 'card query') as stage_rows:
+                rows = cursor.fetchall()
+                stage_rows.update(rows=len(rows))
+
+            with timed_phase(phase_times, 'input hashes') as stage_rows:
+                card_rows = list(unique_card_rows(rows))
+                stage_rows.update(cards=len(card_rows), reused=sum(len(build.reusable) for build in builds))
+
+            with timed_phase(phase_times, 'build records') as stage_rows:
+                # Create JSON data
+                data = list(build_card_records(card_rows, tables, workers, reusable, locales))
+                data.append(ping_records)
+                stage_rows.update(
+                    built=sum(len(card_rows) - len(build.reusable) for build in builds),
+                    records=len(data) * len(builds),
+                )
+
+            with timed_phase(phase_times, 'write output') as stage_rows:
+                # Write data to JSON file (+ 서버가 mmap으로 바로 여는 바이너리 스냅샷)
+                write_card_outputs(data, builds)
+                stage_rows.update(
+                    records=sum(build.record_count for build in builds),
+                    bytes=sum(Path(build.output_file).stat().st_size for build in builds),
+                )
 
-        # Write data to JSON file
-        with open('cards_data_for_api.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-        print(f"Data has been written to cards_data.json")
+        if incremental:
+            for build in builds:
+                print(f"Incremental build ({build.locale}): {len(build.reusable)} cards reused, "
+                      f"{len(build.input_hashes) - len(build.reusable)} cards rebuilt")
+
+        with timed_phase(phase_times, 'write manifest') as stage_rows:
+            stage_rows.update(cards=sum(build.write_manifest() for build in builds))
+
+        print_phase_times(phase_times)
+        rss, children_rss = peak_rss_mb()
+        if rss is not None:
+            print(f"Peak RSS: {rss:.1f}MB" + (f" (workers {children_rss:.1f}MB)" if children_rss else ""))
+        if BUILD_PROFILE is not None:
+            BUILD_PROFILE.finish_build(file)
+            for locale, summary in annotation_summary().items():
+                print(f"Annotation lookups ({locale}): {summary['calls']} calls, {summary['hit']} hit, "
+                      f"{summary['duplicate']} duplicate, {summary['miss']} miss")
+        return phase_times
 
     except sqlite3.Error as e:
         print(f"Error occurred: {e}")
@@ -616,14 +1788,90 @@ def fetch_data_and_create_json(file):
         if conn:
             conn.close()
 
-# Main logic
-files = glob.glob('Raw_CardDatabase_*.mtga')
-
-if not files:
-    print("No files found. Please ensure that you are running this script in the correct directory.")
-    sys.exit()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build cards_data_for_api.json from the MTG Arena card database.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="카드 레코드를 만들 프로세스 수 (기본 1, 단일 프로세스)")
+    parser.add_argument('--incremental', action='store_true',
+                        help=f"{MANIFEST_FILE}와 이전 {OUTPUT_FILE}를 이용해 바뀐 카드만 다시 만듦")
+    parser.add_argument('--stream', action='store_true',
+                        help="Cards를 한 행씩 읽어 레코드를 만드는 대로 출력 파일에 씀 (전체 목록을 메모리에 두지 않음)")
+    parser.add_argument('--output-format', choices=['array', 'ndjson'], default='array',
+                        help=f"array: {OUTPUT_FILE} (들여쓴 JSON 배열, 기본), ndjson: {NDJSON_OUTPUT_FILE} (한 줄에 레코드 하나)")
+    parser.add_argument('--locales', nargs='+', default=[DEFAULT_LOCALE], metavar='LOCALE',
+                        help=f"출력할 언어 (기본 {DEFAULT_LOCALE}, all이면 DB에 있는 모든 언어). "
+                             f"{DEFAULT_LOCALE} 외의 언어는 파일 이름에 언어 코드가 붙음 (cards_data_for_api.jaJP.json)")
+    parser.add_argument('--check-annotations', action='store_true',
+                        help="자동자 매처와 기존 선형 탐색의 주석 결과가 같은지 카드 DB 전체로 확인만 하고 종료")
+    parser.add_argument('--check-normalizer', action='store_true',
+                        help="TextNormalizer와 기존 텍스트 정리 함수의 결과가 같은지 DB 문자열과 무작위 조합으로 확인만 하고 종료")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"단계별 실행 시간·행 수·SQL 수·최대 RSS와 언어별 주석 hit/miss를 {PROFILE_OUTPUT_FILE}에 기록")
+    parser.add_argument('--cprofile', metavar='FILE',
+                        help="--profile과 함께 전체 실행을 cProfile로 감싸 FILE(pstats 형식)에 저장하고 상위 함수를 보고서에 포함")
+    parser.add_argument('--profile-output', default=PROFILE_OUTPUT_FILE, help="--profile 보고서 경로")
+    args = parser.parse_args(argv)
+
+    # Main logic
+    files = glob.glob('Raw_CardDatabase_*.mtga')
+
+    if not files:
+        print("No files found. Please ensure that you are running this script in the correct directory.")
+        sys.exit()
+
+    if args.check_annotations:
+        mismatches = sum(check_annotation_matcher(file) for file in files)
+        sys.exit(1 if mismatches else 0)
+
+    if args.check_normalizer:
+        mismatches = sum(check_text_normalizer(file) for file in files)
+        sys.exit(1 if mismatches else 0)
+
+    global BUILD_PROFILE
+    if args.profile or args.cprofile:
+        BUILD_PROFILE = BuildProfile()
+    profiler = cProfile.Profile() if args.cprofile else None
+
+    if profiler:
+        profiler.enable()
+    locales = None if 'all' in args.locales else args.locales
+    for file in files:
+        fetch_data_and_create_json(
+            file, workers=args.workers, incremental=args.incremental,
+            stream=args.stream, output_format=args.output_format, locales=locales,
+        )
+    if profiler:
+        profiler.disable()
+
+    if BUILD_PROFILE is not None:
+        extra = {
+            'workers': args.workers, 'incremental': args.incremental,
+            'stream': args.stream, 'output_format': args.output_format, 'locales': args.locales,
+        }
+        if profiler:
+            profiler.dump_stats(args.cprofile)
+            extra['cprofile_file'] = args.cprofile
+            extra['cprofile_top'] = cprofile_top(profiler)
+        BUILD_PROFILE.write_report(args.profile_output, **extra)
+        print(f"Profile report has been written to {args.profile_output}")
+
+    print("All files processed.")
+
+
+def cprofile_top(profiler, limit=25):
+    """누적 시간 기준 상위 함수 목록 (보고서용)."""
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            'function': f"{filename}:{line}({name})",
+            'calls': calls,
+            'tottime': round(tottime, 4),
+            'cumtime': round(cumtime, 4),
+        }
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in rows
+    ]
 
-for file in files:
-    fetch_data_and_create_json(file)
 
-print("All files processed.")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+# 운영용 gunicorn 설정 (gunicorn은 현재 디렉터리의 이 파일을 자동으로 읽음)
+#   gunicorn -w 4 -b 0.0.0.0:8080 MTGAPI_ko:api
+#   gunicorn -k uvicorn.workers.UvicornWorker -w 4 -b 0.0.0.0:8080 MTGAPI_ko_asgi:app
+#
+# 번역 데이터와 인덱스를 마스터에서 한 번만 읽고(preload_app) 워커는 fork로 그 메모리를 공유한다.
+# - 마스터는 로드하는 동안 GC를 끄고, 로드와 검색 인덱스 생성이 끝나면(when_ready) gc.freeze()로 로드한 객체를
+#   영구 세대로 옮긴 뒤 GC를 다시 켠다. 워커는 켜진 GC를 물려받고, 그 GC가 이 객체들을 훑으며 헤더를 고쳐 쓰지 않으므로
+#   공유 페이지가 워커마다 복사되지 않는다.
+# - 스냅샷(cards_data_for_api.bin)은 mmap이라 preload와 상관없이 페이지 캐시로 공유된다.
+# - 검색 인덱스는 원래 처음 쓸 때 만들지만, 여기서는 워커를 띄우기 전에(when_ready) 마스터에서 미리 만들어 함께 공유한다.
+# - 리로더 스레드는 fork를 넘어가지 않으므로 워커마다 post_fork에서 시작한다.
+#   리로드한 워커의 새 데이터는 그 워커에만 있다. 데이터를 다시 공유하려면 USR2로 새 마스터를 띄운다
+#   (preload에서는 HUP으로 다시 띄운 워커도 마스터가 처음 읽은 데이터로 시작함).
+import gc
+import os
+
+preload_app = True
+
+os.environ.setdefault("MTGAPI_RELOADER_AUTOSTART", "0")
+gc.disable()
+
+
+def when_ready(server):
+    import MTGAPI_ko
+
+    for data in (MTGAPI_ko.translation_data, *MTGAPI_ko.locale_data.values()):
+        data.search  # 처음 읽을 때 만들어진다
+    # 워커를 띄우기 전에 한 번만: 지금까지 만든 객체를 얼리고 마스터의 GC도 다시 켠다
+    gc.freeze()
+    gc.enable()
+
+
+def post_fork(server, worker):
+    import MTGAPI_ko
+
+    MTGAPI_ko.reloader.start()
+
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, "bench"))
+
+import fixture
+
+# 테스트용 합성 카드 수 (bench/fixture.py, 같은 seed면 같은 DB)
+FIXTURE_CARDS = 1000
+
+
+@pytest.fixture(scope="session")
+def fixture_dir(tmp_path_factory):
+    """bench/fixture.py로 만든 작은 Raw_CardDatabase / Raw_ClientLocalization 파일이 있는 디렉터리."""
+    output = tmp_path_factory.mktemp("fixture")
+    fixture.generate(str(output), FIXTURE_CARDS, seed=1)
+    return output
+
+
+@pytest.fixture
+def fixture_cwd(fixture_dir, monkeypatch):
+    """data_modifier는 현재 디렉터리에서 Raw_*.mtga를 찾으므로 fixture 디렉터리로 옮겨 둔다."""
+    monkeypatch.chdir(fixture_dir)
+    return fixture_dir
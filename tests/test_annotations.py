@@ -0,0 +1,62 @@
+import json
+import shutil
+
+import data_modifier
+
+
+def card_ability_texts(database):
+    """카드마다 (GrpId, 능력들의 enUS 텍스트 목록). check_annotation_matcher와 같은 순서."""
+    conn = data_modifier.connect_read_only(database)
+    try:
+        cursor = conn.cursor()
+        tables = data_modifier.preload_card_tables(cursor)
+        cursor.execute('SELECT GrpId, abilityIds FROM Cards WHERE GrpId > 10')
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    for arena_id, ability_ids in rows:
+        if not ability_ids:
+            continue
+        texts = []
+        for ability_id in ability_ids.split(','):
+            enUS_value = data_modifier.get_localization_value(tables, ability_id.split(':')[-1], 'enUS')
+            if enUS_value:
+                texts.append(enUS_value)
+        yield arena_id, texts
+
+
+def test_annotation_matcher_matches_linear(fixture_cwd, monkeypatch):
+    monkeypatch.setattr(data_modifier, "ANNOTATION_DATA_DETAILED", {})
+    data_modifier.build_annotation_dictionary_from_file()
+    assert data_modifier.ANNOTATION_MATCHER is not None
+
+    checked = 0
+    annotated = 0
+    for arena_id, texts in card_ability_texts("Raw_CardDatabase_bench.mtga"):
+        # 카드 안에서 이미 쓴 주석은 건너뛰므로 카드마다 같은 순서로 두 방식을 돌린다
+        used_fast, used_linear = set(), set()
+        for text in texts:
+            fast = data_modifier.get_ability_annotation(text, used_fast)
+            linear = data_modifier.get_ability_annotation_linear(text, used_linear)
+            assert fast == linear, (arena_id, text)
+            assert used_fast == used_linear, (arena_id, text)
+            checked += 1
+            annotated += bool(fast)
+
+    assert checked > 0
+    assert annotated > 0
+
+
+def test_build_without_localization_file(fixture_dir, tmp_path, monkeypatch):
+    # 카드 DB만 있는 디렉터리: 주석 없이 빌드가 끝나야 한다
+    shutil.copy(fixture_dir / "Raw_CardDatabase_bench.mtga", tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(data_modifier, "ANNOTATION_DATA_DETAILED", {})
+    monkeypatch.setattr(data_modifier, "ANNOTATION_MATCHER", None)
+
+    assert data_modifier.fetch_data_and_create_json("Raw_CardDatabase_bench.mtga") is not None
+    with open(data_modifier.OUTPUT_FILE, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    assert records
+    assert not any("[sup]" in (record.get("annotationed_text") or "") for record in records)
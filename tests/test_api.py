@@ -0,0 +1,213 @@
+import gzip
+import importlib
+import json
+import random
+import shutil
+
+import pytest
+
+import data_modifier
+from card_search import normalize_key
+from card_snapshot import write_snapshot
+
+
+@pytest.fixture(scope="module")
+def built_dir(fixture_dir, tmp_path_factory):
+    """fixture DB로 data_modifier를 돌려 cards_data_for_api.json / .bin을 만든 디렉터리."""
+    output = tmp_path_factory.mktemp("built")
+    for name in ("Raw_CardDatabase_bench.mtga", "Raw_ClientLocalization_bench.mtga"):
+        shutil.copy(fixture_dir / name, output)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(output)
+        patch.setattr(data_modifier, "ANNOTATION_DATA_DETAILED", {})
+        data_modifier.build_annotation_dictionary_from_file()
+        assert data_modifier.fetch_data_and_create_json("Raw_CardDatabase_bench.mtga") is not None
+    return output
+
+
+@pytest.fixture(scope="module")
+def records(built_dir):
+    with open(built_dir / data_modifier.OUTPUT_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def core(built_dir):
+    """built_dir의 스냅샷을 읽은 MTGAPI_ko (import할 때 현재 디렉터리의 데이터를 읽는다)."""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(built_dir)
+        patch.setenv("MTGAPI_RELOADER_AUTOSTART", "0")
+        patch.delenv("MTGAPI_ADMIN_TOKEN", raising=False)
+        return importlib.import_module("MTGAPI_ko")
+
+
+@pytest.fixture
+def client(core):
+    return core.api.test_client()
+
+
+def linear_find(records, search_value=None, card_name=None):
+    """기존 선형 탐색: search_value(대소문자 무시)나 card_name이 맞는 첫 레코드의 위치."""
+    for position, record in enumerate(records):
+        if search_value and (record.get("search_value") or "").lower() == search_value.lower():
+            return position
+        if card_name and record.get("card_name") == card_name:
+            return position
+    return None
+
+
+def with_duplicates(records, seed=0):
+    """레코드 일부를 대소문자만 바꾼 search_value와 같은 card_name으로 복제해 임의 위치에 끼운다."""
+    rng = random.Random(seed)
+    duplicated = list(records)
+    for record in rng.sample(records, len(records) // 4):
+        copy = dict(record, arena_id=-record["arena_id"], search_value=record["search_value"].upper())
+        duplicated.insert(rng.randrange(len(duplicated) + 1), copy)
+    return duplicated
+
+
+def test_index_find_matches_linear_scan(core, records, tmp_path):
+    duplicated = with_duplicates(records)
+    write_snapshot(duplicated, str(tmp_path / "duplicated.bin"))
+    indexes = [core.TranslationIndex(duplicated), core.SnapshotIndex(str(tmp_path / "duplicated.bin"))]
+
+    rng = random.Random(1)
+    queries = [("없는 카드", None), (None, "없는 카드")]
+    for record in duplicated:
+        queries.append((record["search_value"], None))
+        queries.append((record["search_value"].swapcase(), None))
+        queries.append((None, record.get("card_name")))
+        # 서로 다른 레코드의 search_value와 card_name: 더 앞의 레코드가 이긴다
+        queries.append((record["search_value"], rng.choice(duplicated).get("card_name")))
+
+    for search_value, card_name in queries:
+        expected = linear_find(duplicated, search_value, card_name)
+        for index in indexes:
+            assert index.find(search_value, card_name) == expected, (type(index).__name__, search_value, card_name)
+
+
+def largest_record(records):
+    """압축되는(COMPRESS_MIN_SIZE 이상) 응답을 보려고 가장 긴 레코드를 고른다."""
+    return max(records, key=lambda record: len(json.dumps(record, ensure_ascii=False).encode("utf-8")))
+
+
+def test_translate_not_modified(client, records):
+    query = {"search_value": largest_record(records)["search_value"]}
+    response = client.get("/translate", query_string=query)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.get("/translate", query_string=query, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+    response = client.get("/translate", query_string=query, headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+def test_translate_not_modified_compressed(client, records):
+    query = {"search_value": largest_record(records)["search_value"]}
+    identity = client.get("/translate", query_string=query)
+    compressed = client.get("/translate", query_string=query, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.data) == identity.data
+    assert compressed.headers["ETag"] != identity.headers["ETag"]
+
+    # 304에는 요청이 보낸(맞은) ETag를 돌려준다
+    for etag in (compressed.headers["ETag"], identity.headers["ETag"]):
+        response = client.get(
+            "/translate", query_string=query, headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+
+
+def test_translate_batch_matches_single_requests(client, records):
+    with_name = [record for record in records if record.get("card_name")]
+    with_faces = [record for record in records if record.get("linked_faces")]
+    payload = {
+        "search_value": [record["search_value"] for record in records[:5]] + ["없는 카드"],
+        "card_name": [record["card_name"] for record in with_name[:3]],
+        "faces": [record["search_value"] for record in with_faces[:2]],
+    }
+    response = client.post("/translate/batch", json=payload)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["data_version"] == client.get("/version").get_json()["data_version"]
+
+    for field, keys in payload.items():
+        assert list(body[field]) == keys
+        for key in keys:
+            query = {"search_value": key, "faces": "1"} if field == "faces" else {field: key}
+            assert body[field][key] == client.get("/translate", query_string=query).get_json(), (field, key)
+    assert "error" in body["search_value"]["없는 카드"]
+
+
+def test_translate_batch_rejects_bad_requests(core, client):
+    assert client.post("/translate/batch", json={}).status_code == 400
+    assert client.post("/translate/batch", json={"search_value": "Opt"}).status_code == 400
+    too_many = {"search_value": [f"card {number}" for number in range(core.MAX_BATCH_SIZE + 1)]}
+    assert client.post("/translate/batch", json=too_many).status_code == 400
+    too_large = {"search_value": ["x" * core.MAX_BODY_BYTES]}
+    assert client.post("/translate/batch", json=too_large).status_code == 413
+
+
+def test_translate_faces(client, records):
+    by_search_value = {record["search_value"]: record for record in records}
+    checked = 0
+    for record in records:
+        linked_faces = [name for name in record.get("linked_faces", []) if name in by_search_value]
+        if not linked_faces:
+            continue
+        response = client.get("/translate", query_string={"search_value": record["search_value"], "faces": "1"})
+        faces = response.get_json()["faces"]
+        # 요청한 면이 먼저, 연결된 면이 그 뒤
+        assert [face["arena_id"] for face in faces] == [
+            record["arena_id"], *(by_search_value[name]["arena_id"] for name in linked_faces)
+        ]
+        checked += 1
+    assert checked > 0
+
+
+def linear_cards(records, rarity, colors, mana_value_min, mana_value_max, card_type):
+    matched = []
+    for record in records:
+        mana_value = record.get("mana_value")
+        if normalize_key(str(record.get("rarity"))) != normalize_key(rarity):
+            continue
+        if normalize_key(str(record.get("color"))) not in {normalize_key(color) for color in colors}:
+            continue
+        if not isinstance(mana_value, (int, float)) or not mana_value_min <= mana_value <= mana_value_max:
+            continue
+        if normalize_key(card_type) not in normalize_key(str(record.get("type") or "")):
+            continue
+        matched.append(record["arena_id"])
+    return matched
+
+
+def test_cards_filters_match_linear_scan(client, records):
+    rarity = records[0]["rarity"]
+    colors = sorted({record["color"] for record in records if record.get("color")})[:2]
+    card_type = records[0]["type"]
+    expected = linear_cards(records, rarity, colors, 2, 5, card_type)
+    assert expected
+
+    found = []
+    offset = 0
+    while offset is not None:
+        response = client.get("/cards", query_string={
+            "rarity": rarity, "color": ",".join(colors), "mana_value_min": 2, "mana_value_max": 5,
+            "type": card_type, "limit": 7, "offset": offset,
+        })
+        assert response.status_code == 200
+        page = response.get_json()
+        assert page["total"] == len(expected)
+        found.extend(card["arena_id"] for card in page["cards"])
+        offset = page["next_offset"]
+    assert found == expected
+
+
+def test_cards_rejects_bad_filters(client):
+    assert client.get("/cards", query_string={"mana_value_min": "many"}).status_code == 400
+    assert client.get("/cards", query_string={"arena_id": "x"}).status_code == 400
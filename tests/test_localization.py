@@ -0,0 +1,34 @@
+import gzip
+import json
+import os
+
+import data_modifier
+import fixture
+
+# 기존 빌드(잘못된 행 DELETE 후 행마다 UPDATE로 정리하던 data_modifier.py)가
+# fixture.generate(..., 1000, seed=3)에서 만든 cards_data_for_api.json
+GOLDEN_FILE = os.path.join(os.path.dirname(__file__), "golden", "baseline_cards_1000_seed3.json.gz")
+
+# 기존 빌드 이후에 추가된 필드. 이 필드들은 비교에서 뺀다.
+ADDED_FIELDS = ("linked_faces",)
+
+
+def test_build_matches_baseline_output(tmp_path, monkeypatch):
+    fixture.generate(str(tmp_path), 1000, seed=3)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(data_modifier, "ANNOTATION_DATA_DETAILED", {})
+
+    data_modifier.build_annotation_dictionary_from_file()
+    assert data_modifier.fetch_data_and_create_json("Raw_CardDatabase_bench.mtga") is not None
+    with open(data_modifier.OUTPUT_FILE, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    with gzip.open(GOLDEN_FILE, "rt", encoding="utf-8") as f:
+        golden = json.load(f)
+
+    for record in records:
+        for field in ADDED_FIELDS:
+            record.pop(field, None)
+
+    assert len(records) == len(golden)
+    for index, (record, expected) in enumerate(zip(records, golden)):
+        assert record == expected, index
@@ -0,0 +1,41 @@
+import pytest
+
+import data_modifier
+
+# 고정 seed 무작위 조합 문자열 수 (--check-normalizer 기본값보다 적게)
+FUZZ_COUNT = 5000
+
+
+def fixture_texts():
+    """fixture DB의 koKR 지역화 문자열과 AbilityHanger koKR 문자열 (check_text_normalizer와 같은 입력)."""
+    conn = data_modifier.connect_read_only("Raw_CardDatabase_bench.mtga")
+    try:
+        texts = [loc for (loc,) in conn.execute('SELECT Loc FROM Localizations_koKR WHERE Loc IS NOT NULL')]
+    finally:
+        conn.close()
+    conn = data_modifier.connect_read_only("Raw_ClientLocalization_bench.mtga")
+    try:
+        texts += [kokr for (kokr,) in conn.execute(
+            "SELECT koKR FROM loc WHERE Key LIKE 'AbilityHanger/%' AND koKR IS NOT NULL"
+        )]
+    finally:
+        conn.close()
+    return texts
+
+
+@pytest.mark.parametrize("words", [
+    pytest.param(data_modifier.LOCALE_WORDS[data_modifier.DEFAULT_LOCALE], id="koKR"),
+    pytest.param(data_modifier.DEFAULT_LOCALE_WORDS, id="default"),
+])
+@pytest.mark.parametrize("source", ["fixture", "fuzz"])
+def test_text_normalizer_matches_legacy(fixture_cwd, words, source):
+    if source == "fixture":
+        texts = fixture_texts()
+    else:
+        texts = data_modifier.normalizer_fuzz_inputs(FUZZ_COUNT, seed=0)
+    assert texts
+
+    normalizer = data_modifier.TextNormalizer(words=words)
+    for text in texts:
+        assert normalizer.clean_localization(text) == data_modifier.clean_localizations_koKR(text, words), text
+        assert normalizer.annotation_kokr(text) == data_modifier.clean_annotation_kokr(text, words), text